@@ -15,6 +15,7 @@ st.write("Select a page from the sidebar to begin exploring!")
 # Navigation buttons
 st.markdown("### 🔍 Explore Data")
 st.page_link("./pages/original_chat_logs.py", label="📊 Original Chat Logs", icon="📊")
+st.page_link("./pages/search.py", label="🔎 Search Messages", icon="🔎")
 st.page_link("./pages/crazy_visuals.py", label="🎨 Crazy Visuals", icon="📈")
 st.page_link("./pages/crazier_visual.py", label="🌐 Even Crazier Visual That Takes a Lot to Load", icon="🌍")
 st.page_link("./pages/multimediapalooza.py", label="🎵 MSM Won't Show This", icon="🎵")
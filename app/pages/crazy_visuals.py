@@ -1,64 +1,12 @@
 import streamlit as st
 import pandas as pd
-import psycopg2
-import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-
-# Load Environment Variables
-load_dotenv()
-
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT")
-}
-
-def connect_db():
-    """Establish and return a PostgreSQL database connection."""
-    try:
-        return psycopg2.connect(**DB_CONFIG)
-    except Exception as e:
-        st.error(f"❌ Database connection failed: {e}")
-        return None
-
-# Fetch Messages from Database
-def fetch_messages(start_date=None, end_date=None):
-    """ Fetch messages from PostgreSQL with optional date filtering. """
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
-
-    query = """
-        SELECT 
-            messages.id, 
-            participants.name AS sender_name, 
-            messages.content, 
-            to_timestamp(messages.timestamp_ms / 1000) AT TIME ZONE 'UTC' AS message_timestamp
-        FROM messages
-        JOIN participants ON messages.sender_id = participants.id
-        WHERE messages.content IS NOT NULL
-    """
-
-    params = []
-    if start_date and end_date:
-        query += " AND to_timestamp(messages.timestamp_ms / 1000) AT TIME ZONE 'UTC' BETWEEN %s AND %s"
-        params = [start_date, end_date]
-
-    query += " ORDER BY messages.timestamp_ms ASC;"
 
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-
-    # Ensure message_timestamp is converted properly
-    df["message_timestamp"] = pd.to_datetime(df["message_timestamp"], utc=True)
-
-    return df
+from z_data import fetch_date_bounds, fetch_messages, fetch_rollups
+from z_db import cached_query
+from utils.rollups import daily_counts, heatmap_table
 
 # Streamlit UI Configuration
 st.set_page_config(page_title="🎨 Visualizations", layout="wide")
@@ -67,32 +15,20 @@ st.title("📊 Messenger Chat Visualizations")
 # Sidebar Filters
 st.sidebar.header("📅 Date Filters")
 
-# Fetch all data first (for date selection)
-df_all = fetch_messages()
-
-# Ensure data exists before applying filtering
-if not df_all.empty:
-    min_date = df_all['message_timestamp'].min().date()
-    max_date = df_all['message_timestamp'].max().date()
-else:
-    min_date, max_date = datetime.today().date(), datetime.today().date()
+# Date bounds come from a MIN/MAX query rather than loading every message
+min_date, max_date = fetch_date_bounds()
 
 # Selectable date range (Set valid range)
 date_range = st.sidebar.date_input("Select date range", [min_date, max_date], min_value=min_date, max_value=max_date)
 
-# Convert selected dates to proper datetime format
-start_datetime = datetime.combine(date_range[0], datetime.min.time()).replace(tzinfo=None)
-end_datetime = datetime.combine(date_range[1], datetime.max.time()).replace(tzinfo=None) + timedelta(seconds=1)
+# Fetch filtered messages (whole days, converted to millisecond bounds in the query)
+df_filtered = fetch_messages(date_range[0], date_range[1])
 
-# Fetch filtered messages
-df_filtered = fetch_messages(start_datetime, end_datetime)
+# Fetch pre-aggregated activity for the same days
+df_rollups = fetch_rollups(date_range[0], date_range[1])
 
 def fetch_normalized_reactions():
     """Fetch normalized reaction count per user."""
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
-
     query = """
         SELECT 
             p.name AS sender_name, 
@@ -106,10 +42,7 @@ def fetch_normalized_reactions():
         ORDER BY normalized_reactions DESC;
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
-
-    return df
+    return cached_query(query)
 
 st.title("📊 Bruce Quotient (Anthony Variant) - Reaction Normalization")
 
@@ -133,9 +66,7 @@ else:
 
 # Heatmap of Message Activity
 st.subheader("🔥 Heatmap of Messages Per Day/Hour")
-df_filtered['hour'] = df_filtered['message_timestamp'].dt.hour
-df_filtered['weekday'] = df_filtered['message_timestamp'].dt.day_name()
-heatmap_data = df_filtered.pivot_table(index='weekday', columns='hour', values='content', aggfunc='count').fillna(0)
+heatmap_data = heatmap_table(df_rollups) if not df_rollups.empty else pd.DataFrame()
 
 fig, ax = plt.subplots(figsize=(12, 6))
 sns.heatmap(heatmap_data, cmap="coolwarm", linewidths=0.5, annot=True, fmt=".0f")
@@ -148,30 +79,7 @@ st.pyplot(fig)
 st.subheader("🌀 Reaction Distribution Per User")
 
 def fetch_reactions():
-    """Fetch reactions from the database."""
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
-
-    query = """
-        SELECT 
-            reactions.reaction, 
-            participants.name AS user
-        FROM reactions
-        JOIN participants ON reactions.actor_id = participants.id
-    """
-
-    df = pd.read_sql(query, conn)
-    conn.close()
-
-    return df
-
-def fetch_reactions():
-    """Fetch reactions from the database and fix encoding issues."""
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
-
+    """Fetch reactions from the database (stored as canonical UTF-8 since ingest)."""
     query = """
         SELECT 
             reactions.reaction, 
@@ -180,14 +88,7 @@ def fetch_reactions():
         JOIN participants ON reactions.actor_id = participants.id
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
-
-    # ✅ Fix encoding issues
-    df['reaction'] = df['reaction'].astype(str).apply(lambda x: x.encode('latin1').decode('utf-8', 'ignore'))
-    df['user'] = df['user'].astype(str).apply(lambda x: x.encode('latin1').decode('utf-8', 'ignore'))
-
-    return df
+    return cached_query(query)
 
 df_reactions = fetch_reactions()
 
@@ -207,11 +108,10 @@ if not df_reactions.empty:
 
 # ⚡ Message Length Bubble Chart
 st.subheader("⚡ Message Length vs. Time")
-df_filtered['content'] = df_filtered['content'].astype(str).fillna('')
-df_filtered['msg_length'] = df_filtered['content'].apply(len)
-df_filtered = df_filtered[df_filtered['msg_length'] > 0]
+# Lengths are stored per message at ingest, so nothing is measured here
+df_lengths = df_filtered[df_filtered['char_length'] > 0]
 
-fig = px.scatter(df_filtered, x='message_timestamp', y='msg_length', size='msg_length', color='sender_name',
+fig = px.scatter(df_lengths, x='message_timestamp', y='char_length', size='char_length', color='sender_name',
                  title="⚡ Message Length Over Time", template='plotly_dark', opacity=0.7)
 st.plotly_chart(fig)
 
@@ -219,24 +119,23 @@ st.plotly_chart(fig)
 st.subheader("📊 User Word Count Ranking")
 
 def fetch_word_count():
-    """Fetch word count per user from the database."""
-    conn = connect_db()
-    if not conn:
-        return {}
-
+    """Fetch word count per user from the database (sums the stored per-message counts)."""
     query = """
         SELECT 
             participants.name AS sender_name,
-            SUM(LENGTH(messages.content) - LENGTH(REPLACE(messages.content, ' ', '')) + 1) AS word_count
-        FROM messages
-        JOIN participants ON messages.sender_id = participants.id
-        WHERE messages.content IS NOT NULL
-        GROUP BY participants.name
-        ORDER BY word_count DESC;
+            totals.word_count
+        FROM (
+            SELECT sender_id, COALESCE(SUM(word_count), 0) AS word_count
+            FROM messages
+            GROUP BY sender_id
+        ) totals
+        JOIN participants ON totals.sender_id = participants.id
+        ORDER BY totals.word_count DESC;
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
+    df = cached_query(query)
+    if df.empty:
+        return {}
 
     return dict(zip(df["sender_name"], df["word_count"]))
 
@@ -277,8 +176,7 @@ st.plotly_chart(fig)
 
 # Messages Over Time
 st.subheader("📊 Messages Over Time")
-df_filtered['date'] = df_filtered['message_timestamp'].dt.date
-rolling_avg = df_filtered.groupby('date').size().rolling(7, min_periods=1).mean()
+rolling_avg = daily_counts(df_rollups, 'text_message_count').rolling(7, min_periods=1).mean() if not df_rollups.empty else pd.Series(dtype=float)
 
 fig, ax = plt.subplots()
 rolling_avg.plot(kind='line', ax=ax, color='red', linewidth=3)
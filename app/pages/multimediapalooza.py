@@ -1,5 +1,6 @@
 import streamlit as st
-import requests
+
+from z_media import download_from_cache
 
 # Check if the user is authenticated
 if "authenticated" not in st.session_state or not st.session_state.authenticated:
@@ -21,16 +22,14 @@ st.image(COLLAGE_URL, caption="📷 Group Chat Collage", use_container_width=Tru
 st.subheader("🎵 Listen to Merged Audio")
 st.audio(AUDIO_URL, format="audio/mp4")
 
-# 🔽 **Download Audio File**
-audio_file = requests.get(AUDIO_URL).content
-st.download_button(label="⬇️ Download Merged Audio", data=audio_file, file_name="merged_audio.mp4", mime="audio/mp4")
+# 🔽 **Download Audio File** (fetched into the local media cache only when clicked)
+st.download_button(label="⬇️ Download Merged Audio", data=download_from_cache(AUDIO_URL), file_name="merged_audio.mp4", mime="audio/mp4")
 
 # 🎬 **Video Playback**
 st.subheader("🎬 Watch Merged Video")
 st.video(VIDEO_URL)
 
-# 🔽 **Download Video File**
-video_file = requests.get(VIDEO_URL).content
-st.download_button(label="⬇️ Download Merged Video", data=video_file, file_name="merged_video.mp4", mime="video/mp4")
+# 🔽 **Download Video File** (fetched into the local media cache only when clicked)
+st.download_button(label="⬇️ Download Merged Video", data=download_from_cache(VIDEO_URL), file_name="merged_video.mp4", mime="video/mp4")
 
 st.success("✅ Multimedia Loaded!")
\ No newline at end of file
@@ -1,87 +1,80 @@
 import streamlit as st
 import pandas as pd
 import psycopg2
-import os
-from dotenv import load_dotenv
+
+from z_config import CHAT_LOG_PAGE_SIZES, CHAT_LOG_PREFETCH_PAGES
+from z_data import fetch_date_bounds
+from z_db import connection
+from utils.queries import date_anchor, message_page_query
 
 # Check if the user is authenticated
 if "authenticated" not in st.session_state or not st.session_state.authenticated:
     st.warning("🔒 You must sign in to view this section.")
     st.stop()
 
-# Load environment variables
-load_dotenv()
-
-# Database Configuration
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT")
-}
-
-def connect_db():
-    """Establish and return a PostgreSQL database connection."""
-    try:
-        return psycopg2.connect(**DB_CONFIG)
-    except Exception as e:
-        st.error(f"❌ Database connection failed: {e}")
-        return None
-
 def check_table_exists():
     """Verify if 'messages' table exists before running queries."""
-    conn = connect_db()
-    if not conn:
+    try:
+        with connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT EXISTS (
+                        SELECT FROM information_schema.tables 
+                        WHERE table_schema = 'public' AND table_name = 'messages'
+                    );
+                """)
+                return cur.fetchone()[0]
+
+    except psycopg2.Error as e:
+        st.error(f"❌ Error checking database tables: {e}")
         return False
 
+def fetch_window(anchor=None, direction="older", size=50):
+    """
+    Fetch up to `size` messages next to a (timestamp_ms, id) keyset anchor through a named
+    server-side cursor, so only the requested rows ever leave the database. Rows come back
+    newest first whichever way we paged.
+    """
+    query, params = message_page_query(anchor, direction, size)
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' AND table_name = 'messages'
-                );
-            """)
-            return cur.fetchone()[0]
-
-    except Exception as e:
-        st.error(f"❌ Error checking database tables: {e}")
+        with connection() as conn:
+            with conn.cursor(name="chat_log_browser") as cur:
+                cur.itersize = size
+                cur.execute(query, params)
+                rows = cur.fetchmany(size)
+    except psycopg2.Error as e:
+        st.error(f"❌ Database query failed: {e}")
+        return []
+    return rows if direction == "older" else rows[::-1]
+
+def load_window(anchor=None, direction="older"):
+    """Replace the cached window with the page on screen plus the prefetch pages."""
+    page_size = st.session_state.chat_log_page_size
+    rows = fetch_window(anchor, direction, page_size * (1 + CHAT_LOG_PREFETCH_PAGES))
+    if not rows:
         return False
-    finally:
-        conn.close()
+    st.session_state.chat_log_rows = rows
+    # Paging newer lands on the window's last page, the one right above the old screen
+    st.session_state.chat_log_offset = 0 if direction == "older" else max(len(rows) - page_size, 0)
+    return True
 
-def fetch_all_messages():
-    """Fetch all messages from PostgreSQL without date filtering."""
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
+def page_older():
+    rows, offset, page_size = st.session_state.chat_log_rows, st.session_state.chat_log_offset, st.session_state.chat_log_page_size
+    if offset + 2 * page_size <= len(rows):
+        st.session_state.chat_log_offset = offset + page_size
+    elif rows and not load_window(rows[min(offset + page_size, len(rows)) - 1][:2], "older"):
+        st.session_state.chat_log_notice = "🏁 That was the oldest message."
 
-    try:
-        with conn.cursor() as cur:
-            query = """
-                SELECT 
-                    m.id, 
-                    p.name AS sender_name, 
-                    m.content, 
-                    to_timestamp(m.timestamp_ms / 1000) AS message_timestamp
-                FROM messages m
-                JOIN participants p ON m.sender_id = p.id
-                WHERE m.content IS NOT NULL
-                ORDER BY m.timestamp_ms DESC;
-            """  # Removed the LIMIT to get all data
-
-            cur.execute(query)
-            rows = cur.fetchall()
-            colnames = [desc[0] for desc in cur.description]
-            return pd.DataFrame(rows, columns=colnames)
-
-    except Exception as e:
-        st.error(f"❌ Error fetching messages: {e}")
-        return pd.DataFrame()
-    
-    finally:
-        conn.close()
+def page_newer():
+    rows, offset, page_size = st.session_state.chat_log_rows, st.session_state.chat_log_offset, st.session_state.chat_log_page_size
+    if offset >= page_size:
+        st.session_state.chat_log_offset = offset - page_size
+    elif rows and not load_window(rows[offset][:2], "newer"):
+        st.session_state.chat_log_notice = "🏁 You are at the newest message."
+
+def jump_to_date():
+    if not load_window(date_anchor(st.session_state.chat_log_jump_date), "older"):
+        st.session_state.chat_log_notice = "⚠️ No messages on or before that date."
 
 # Streamlit UI
 st.title("📊 Data Exploration - PostgreSQL (All-Time Data)")
@@ -91,13 +84,38 @@ if not check_table_exists():
     st.error("❌ Database table 'messages' does not exist. Check your database connection.")
     st.stop()
 
-# Fetch all-time messages
-df_all_time = fetch_all_messages()
+# Browser state lives in the session: the fetched window and where the screen sits in it
+st.session_state.setdefault("chat_log_page_size", CHAT_LOG_PAGE_SIZES[1])
+if "chat_log_rows" not in st.session_state:
+    st.session_state.chat_log_rows, st.session_state.chat_log_offset = [], 0
+    load_window()
+
+# Controls: page size, jump-to-date and paging
+min_date, max_date = fetch_date_bounds()
+col_size, col_date, col_jump = st.columns([1, 2, 1])
+col_size.selectbox("Messages per page", CHAT_LOG_PAGE_SIZES, key="chat_log_page_size")
+col_date.date_input("Jump to date", value=max_date, min_value=min_date, max_value=max_date, key="chat_log_jump_date")
+col_jump.button("📅 Jump", on_click=jump_to_date)
+
+col_newer, col_older = st.columns(2)
+col_newer.button("⬅️ Newer", on_click=page_newer, use_container_width=True)
+col_older.button("Older ➡️", on_click=page_older, use_container_width=True)
+
+if "chat_log_notice" in st.session_state:
+    st.info(st.session_state.pop("chat_log_notice"))
 
 # Display Messages
-st.subheader("📝 Messages DataFrame (All Time)")
-if not df_all_time.empty:
-    st.dataframe(df_all_time[['sender_name', 'content', 'message_timestamp']])
-    st.success("✅ All-time data loaded successfully!")
+page_size = st.session_state.chat_log_page_size
+offset = st.session_state.chat_log_offset
+page = pd.DataFrame(
+    st.session_state.chat_log_rows[offset:offset + page_size],
+    columns=["id", "timestamp_ms", "sender_name", "content"]
+)
+
+st.subheader("📝 Messages")
+if not page.empty:
+    page["message_timestamp"] = pd.to_datetime(page["timestamp_ms"], unit="ms")
+    st.dataframe(page[['sender_name', 'content', 'message_timestamp']], use_container_width=True)
+    st.caption(f"{page['message_timestamp'].iloc[-1]:%Y-%m-%d %H:%M} – {page['message_timestamp'].iloc[0]:%Y-%m-%d %H:%M}")
 else:
-    st.warning("⚠️ No messages found in the database.")
\ No newline at end of file
+    st.warning("⚠️ No messages found in the database.")
@@ -0,0 +1,54 @@
+import streamlit as st
+
+from z_data import fetch_date_bounds, fetch_sender_names, search_messages
+
+# Check if the user is authenticated
+if "authenticated" not in st.session_state or not st.session_state.authenticated:
+    st.warning("🔒 You must sign in to view this section.")
+    st.stop()
+
+PAGE_SIZE = 50
+MODES = {"Words (ranked)": "words", "Exact text (substring)": "substring"}
+
+# Streamlit UI
+st.title("🔎 Search Messages")
+
+# Sidebar Filters
+st.sidebar.header("🔎 Search Filters")
+min_date, max_date = fetch_date_bounds()
+date_range = st.sidebar.date_input("Select date range", [min_date, max_date], min_value=min_date, max_value=max_date)
+senders = st.sidebar.multiselect("Senders", fetch_sender_names())
+
+query = st.text_input("Search for", placeholder='e.g. catalina wine mixer, "present it", pizza -pineapple')
+mode = MODES[st.radio("Match", list(MODES), horizontal=True)]
+
+# A new search (or new filters) starts again from the first page
+search_key = (query, mode, tuple(senders), tuple(date_range))
+if st.session_state.get("search_key") != search_key:
+    st.session_state.search_key = search_key
+    st.session_state.search_page = 0
+
+if not query.strip():
+    st.info("ℹ️ Type a word or phrase to search every message.")
+    st.stop()
+
+start_date, end_date = (date_range[0], date_range[1]) if len(date_range) == 2 else (None, None)
+results, has_more = search_messages(query, mode, senders, start_date, end_date,
+                                    page=st.session_state.search_page, page_size=PAGE_SIZE)
+
+# Display Results
+if results.empty:
+    st.warning("⚠️ No messages match that search.")
+    st.stop()
+
+first = st.session_state.search_page * PAGE_SIZE + 1
+st.caption(f"Showing results {first}–{first + len(results) - 1}")
+st.dataframe(results[['sender_name', 'content', 'message_timestamp']], use_container_width=True)
+
+col_prev, col_next = st.columns(2)
+if col_prev.button("⬅️ Previous", disabled=st.session_state.search_page == 0, use_container_width=True):
+    st.session_state.search_page -= 1
+    st.rerun()
+if col_next.button("Next ➡️", disabled=not has_more, use_container_width=True):
+    st.session_state.search_page += 1
+    st.rerun()
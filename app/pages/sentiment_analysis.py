@@ -1,67 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import psycopg2
-import os
 import plotly.express as px
 import seaborn as sns
 from wordcloud import WordCloud
-from datetime import datetime, timedelta
-from textblob import TextBlob
-from collections import defaultdict
-from dotenv import load_dotenv
-
-# Load Environment Variables
-load_dotenv()
-
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT")
-}
-
-def connect_db():
-    """Establish and return a PostgreSQL database connection."""
-    try:
-        return psycopg2.connect(**DB_CONFIG)
-    except Exception as e:
-        st.error(f"❌ Database connection failed: {e}")
-        return None
-
-# Fetch Messages from Database
-def fetch_messages(start_date=None, end_date=None):
-    """ Fetch messages from PostgreSQL with optional date filtering. """
-    conn = connect_db()
-    if not conn:
-        return pd.DataFrame()
-
-    query = """
-        SELECT 
-            messages.id, 
-            participants.name AS sender_name, 
-            messages.content, 
-            to_timestamp(messages.timestamp_ms / 1000) AT TIME ZONE 'UTC' AS message_timestamp
-        FROM messages
-        JOIN participants ON messages.sender_id = participants.id
-        WHERE messages.content IS NOT NULL
-    """
-
-    params = []
-    if start_date and end_date:
-        query += " AND to_timestamp(messages.timestamp_ms / 1000) AT TIME ZONE 'UTC' BETWEEN %s AND %s"
-        params = [start_date, end_date]
-
-    query += " ORDER BY messages.timestamp_ms ASC;"  # ✅ Removed LIMIT to get all-time data
-
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-
-    # Ensure message_timestamp is converted properly
-    df["message_timestamp"] = pd.to_datetime(df["message_timestamp"], utc=True)
-
-    return df
+
+from z_data import fetch_date_bounds, fetch_messages, fetch_word_frequencies
 
 # Streamlit UI Configuration
 st.set_page_config(page_title="🎨 Groupchat Analysis", layout="wide")
@@ -70,25 +13,14 @@ st.title("📊 Groupchat Analysis")
 # Sidebar Filters
 st.sidebar.header("📅 Date Filters")
 
-# Fetch all data first (for date selection)
-df_all = fetch_messages()
-
-# Ensure data exists before applying filtering
-if not df_all.empty:
-    min_date = df_all['message_timestamp'].min().date()
-    max_date = df_all['message_timestamp'].max().date()
-else:
-    min_date, max_date = datetime.today().date(), datetime.today().date()
+# Date bounds come from a MIN/MAX query rather than loading every message
+min_date, max_date = fetch_date_bounds()
 
 # Selectable date range (Set valid range)
 date_range = st.sidebar.date_input("Select date range", [min_date, max_date], min_value=min_date, max_value=max_date)
 
-# Convert selected dates to proper datetime format
-start_datetime = datetime.combine(date_range[0], datetime.min.time()).replace(tzinfo=None)
-end_datetime = datetime.combine(date_range[1], datetime.max.time()).replace(tzinfo=None) + timedelta(seconds=1)
-
-# Fetch filtered messages
-df_filtered = fetch_messages(start_datetime, end_datetime)
+# Fetch filtered messages (whole days, converted to millisecond bounds in the query)
+df_filtered = fetch_messages(date_range[0], date_range[1])
 
 # # Display Messages DataFrame
 # st.subheader("📝 Messages Data")
@@ -100,37 +32,21 @@ df_filtered = fetch_messages(start_datetime, end_datetime)
 # Sentiment Analysis
 st.subheader("📉 Sentiment Analysis Over Time")
 
-df_filtered['sentiment'] = df_filtered['content'].astype(str).apply(lambda x: TextBlob(x).sentiment.polarity)
-fig = px.line(df_filtered, x='message_timestamp', y='sentiment', title="📉 Sentiment Over Time", color='sender_name')
+# Scores are read from message_sentiment; nothing is scored while the page renders
+df_filtered['sentiment'] = df_filtered['polarity'] if 'polarity' in df_filtered else pd.Series(dtype=float)
+scored = df_filtered.dropna(subset=['sentiment'])
+if len(scored) < len(df_filtered):
+    st.info(f"ℹ️ {len(df_filtered) - len(scored)} messages have no stored sentiment yet. Run `scripts/score_sentiment.py` to score them.")
+
+fig = px.line(scored, x='message_timestamp', y='sentiment', title="📉 Sentiment Over Time", color='sender_name')
 st.plotly_chart(fig)
 
 # Sentiment Analysis Per User
 st.subheader("💬 User Sentiment Ranking")
 
-# Compute sentiment for each user
-user_sentiment = defaultdict(list)
-for _, row in df_filtered.iterrows():
-    sender = row.get("sender_name", "Unknown")
-    content = str(row.get("content", ""))
-    if content.strip():
-        sentiment_score = TextBlob(content).sentiment.polarity
-        user_sentiment[sender].append(sentiment_score)
-
-# Compute and sort average sentiment per user
-user_avg_sentiment = {user: np.mean(scores) for user, scores in user_sentiment.items() if scores}
-sorted_sentiment = sorted(user_avg_sentiment.items(), key=lambda x: x[1], reverse=True)
-
-# Compute sentiment for each user
-user_sentiment = defaultdict(list)
-for _, row in df_filtered.iterrows():
-    sender = row.get("sender_name", "Unknown")
-    content = str(row.get("content", ""))
-    if content.strip():
-        sentiment_score = TextBlob(content).sentiment.polarity
-        user_sentiment[sender].append(sentiment_score)
-
-# Compute average sentiment per user, including neutral (0.0)
-user_avg_sentiment = {user: np.mean(scores) if scores else 0.0 for user, scores in user_sentiment.items()}
+# Compute average sentiment per user over non-empty messages, including neutral (0.0)
+has_text = scored['content'].astype(str).str.strip() != ''
+user_avg_sentiment = scored[has_text].groupby('sender_name')['sentiment'].mean().to_dict()
 
 # Ensure all users from the dataset appear, even if they didn't send text
 all_users = df_filtered['sender_name'].unique()
@@ -158,26 +74,21 @@ fig = px.bar(sentiment_df, x="User", y="Average Sentiment", title="Sentiment Ran
              text_auto=True, color="Average Sentiment", color_continuous_scale="RdYlGn")
 st.plotly_chart(fig)
 
-# **Word Cloud**
-st.subheader("☁️ Most Frequent Words")
-if not df_filtered.empty:
-    all_content = ' '.join(df_filtered['content'].dropna())
-    wordcloud = WordCloud(width=800, height=400, background_color='black', colormap='plasma').generate(all_content)
-    st.image(wordcloud.to_array())
-
-    # Generate word cloud for positive & negative words
-    positive_words = ' '.join(df_filtered[df_filtered['sentiment'] > 0]['content'].dropna())
-    negative_words = ' '.join(df_filtered[df_filtered['sentiment'] < 0]['content'].dropna())
+# **Word Cloud** (counts come pre-tokenized from the token index, merged for the selected range)
+def show_word_cloud(frequencies, colormap):
+    if frequencies:
+        wordcloud = WordCloud(width=800, height=400, background_color='black', colormap=colormap).generate_from_frequencies(frequencies)
+        st.image(wordcloud.to_array())
+    else:
+        st.warning("⚠️ Not enough data to generate this word cloud.")
 
-    wordcloud_positive = WordCloud(width=800, height=400, background_color='black', colormap='Greens').generate(positive_words)
-    wordcloud_negative = WordCloud(width=800, height=400, background_color='black', colormap='Reds').generate(negative_words)
+st.subheader("☁️ Most Frequent Words")
+show_word_cloud(fetch_word_frequencies(date_range[0], date_range[1]), 'plasma')
 
-    st.subheader("🌿 Positive Word Cloud")
-    st.image(wordcloud_positive.to_array())
+st.subheader("🌿 Positive Word Cloud")
+show_word_cloud(fetch_word_frequencies(date_range[0], date_range[1], bucket=1), 'Greens')
 
-    st.subheader("🔥 Negative Word Cloud")
-    st.image(wordcloud_negative.to_array())
-else:
-    st.warning("⚠️ Not enough data to generate word clouds.")
+st.subheader("🔥 Negative Word Cloud")
+show_word_cloud(fetch_word_frequencies(date_range[0], date_range[1], bucket=-1), 'Reds')
 
 st.success("✅ Data loaded successfully!")
\ No newline at end of file
@@ -1,84 +1,29 @@
 import streamlit as st
 import psycopg2
-import bcrypt
-from psycopg2 import sql
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
-
-# Database connection function
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            dbname=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT")
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        st.error("Database connection failed. Please check your credentials.")
-        st.error(f"Error Details: {str(e)}")  # Display error details
-        return None  # Avoid stopping the app
-
-# Fetch user credentials from DB
-def fetch_user_credentials():
-    conn = get_db_connection()
-    if not conn:
-        return {}  # If DB fails, return an empty dict to prevent errors
-
-    cursor = conn.cursor()
-    cursor.execute("SELECT username, password, name FROM users")
-    users = cursor.fetchall()
-    conn.close()
-
-    credentials = {"usernames": {}}
-    for username, password, name in users:
-        credentials["usernames"][username] = {
-            "name": name,
-            "password": password  # Hashed password stored
-        }
-    return credentials
-
-# Hash password function
-def hash_password(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+from z_auth import get_auth
 
 # Insert user into database
 def insert_user(username, password, name):
-    conn = get_db_connection()
-    if not conn:
-        return
-
-    cursor = conn.cursor()
-    hashed_password = hash_password(password)
-
     try:
-        cursor.execute(
-            sql.SQL("INSERT INTO users (username, password, name) VALUES (%s, %s, %s)"),
-            (username, hashed_password, name)
-        )
-        conn.commit()
+        get_auth().register(username, password, name)
         st.success("User registered successfully! You can now log in.")
         st.session_state["show_register"] = False  # Hide register form after success
         st.query_params["rerun"] = "true"  # Trigger rerun
     except psycopg2.IntegrityError:
-        conn.rollback()
         st.error("Username already exists. Please choose another one.")
-    finally:
-        conn.close()
+    except psycopg2.OperationalError as e:
+        st.error("Database connection failed. Please check your credentials.")
+        st.error(f"Error Details: {str(e)}")
 
-# Authenticate user
+# Authenticate user (one indexed row lookup; bcrypt runs on the auth service's worker pool)
 def authenticate_user(username, password):
-    credentials = fetch_user_credentials()
-    if username in credentials["usernames"]:
-        stored_password = credentials["usernames"][username]["password"]
-        if bcrypt.checkpw(password.encode(), stored_password.encode()):
-            return True, credentials["usernames"][username]["name"]
-    return False, None
+    try:
+        return get_auth().authenticate(username, password)
+    except psycopg2.OperationalError as e:
+        st.error("Database connection failed. Please check your credentials.")
+        st.error(f"Error Details: {str(e)}")  # Display error details
+        return False, None
 
 # Handle authentication state
 if "authenticated" not in st.session_state:
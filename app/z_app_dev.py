@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import json
 import os
 import numpy as np
 import matplotlib.pyplot as plt
@@ -15,6 +14,10 @@ import streamlit.components.v1 as components
 from collections import Counter
 import emoji
 from collections import defaultdict
+import sys
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..'))
+from utils.stream_reader import iter_messages
 
 # 🔹 Set Streamlit Page Configuration
 st.set_page_config(page_title="🎨 Groupchat Analysis", layout="wide")
@@ -40,10 +43,7 @@ def load_data():
     if os.path.exists(DATA_PATH):
         for filename in os.listdir(DATA_PATH):
             if filename.endswith('.json'):
-                with open(os.path.join(DATA_PATH, filename), 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    if 'messages' in data:
-                        all_messages.extend(data['messages'])
+                all_messages.extend(iter_messages(os.path.join(DATA_PATH, filename)))
     return all_messages
 
 messages = load_data()
@@ -62,8 +62,9 @@ st.write("Listen to the newly merged MP4 file directly from this webpage!")
 
 if os.path.exists(MERGED_VIDEO_FILE):
     st.video(MERGED_VIDEO_FILE)
-    with open(MERGED_VIDEO_FILE, "rb") as file:
-        st.download_button(label="⬇️ Download Merged Audio", data=file, file_name="merged_audio.mp4", mime="video/mp4")
+    # Opened only when the button is clicked, not read on every render
+    st.download_button(label="⬇️ Download Merged Audio", data=lambda: open(MERGED_VIDEO_FILE, "rb"),
+                       file_name="merged_audio.mp4", mime="video/mp4")
 else:
     st.error("🚨 Error: The merged MP4 file was not found! Please ensure the file exists.")
     
@@ -76,14 +77,13 @@ st.write("Watch the newly merged video right here!")
 if os.path.exists(VIDEO_PATH):
     st.video(VIDEO_PATH)
 
-    # Download Button
-    with open(VIDEO_PATH, "rb") as file:
-        st.download_button(
-            label="⬇️ Download Merged Video",
-            data=file,
-            file_name="merged_video.mp4",
-            mime="video/mp4"
-        )
+    # Download Button (opened only when clicked)
+    st.download_button(
+        label="⬇️ Download Merged Video",
+        data=lambda: open(VIDEO_PATH, "rb"),
+        file_name="merged_video.mp4",
+        mime="video/mp4"
+    )
 else:
     st.error("🚨 Error: The merged video file was not found! Please ensure the file exists.")
 
@@ -132,8 +132,7 @@ reaction_data = []
 for _, row in df_filtered.iterrows():
     if isinstance(row.get('reactions'), list):
         for reaction in row['reactions']:
-            emoji_char = reaction['reaction'].encode('latin1').decode('utf-8')  # Fix Unicode Encoding
-            reaction_data.append({"user": reaction['actor'], "reaction": emoji_char})
+            reaction_data.append({"user": reaction['actor'], "reaction": reaction['reaction']})
 
 df_reactions = pd.DataFrame(reaction_data)
 
@@ -1,21 +1,27 @@
 import streamlit as st
 import pandas as pd
-import json
 import os
-import numpy as np
 import matplotlib.pyplot as plt
 import plotly.express as px
 import seaborn as sns
 from wordcloud import WordCloud
 from datetime import datetime
-from textblob import TextBlob
-import networkx as nx
-from pyvis.network import Network
 import streamlit.components.v1 as components
 from collections import Counter
 import emoji
+import sys
 from collections import defaultdict
 
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..'))
+from utils.columnar_store import messages_frame, store_exists
+from utils.queries import date_bounds_ms
+from utils.rollups import daily_counts, heatmap_table, rollup_frame
+from utils.search import InvertedIndex
+from utils.sentiment import SentimentCache, attach_scores, cached_scores
+from utils.stream_reader import batched, iter_messages
+from utils.token_index import TokenIndex
+from z_graph import network_html
+
 # 🔹 Set Streamlit Page Configuration
 st.set_page_config(page_title="🎨 Groupchat Analysis", layout="wide")
 
@@ -33,21 +39,60 @@ st.markdown(
 
 # 🔹 Load Data from `../data/messages/messages_dev/cleaned_messages/`
 DATA_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'data', 'messages', 'messages_dev', 'cleaned_messages')
+# 🔹 Columnar copy built by scripts/build_columnar_store.py (preferred when present)
+STORE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'data', 'messages', 'messages_dev', 'columnar')
 
+@st.cache_data
 def load_data():
-    """Loads all messages from JSON files in the cleaned messages directory."""
-    all_messages = []
+    """Loads all messages, memory-mapping the columnar store if it exists and streaming the JSON files otherwise."""
+    if store_exists(STORE_PATH):
+        return messages_frame(STORE_PATH, nested=True)
+
+    # Messages become DataFrame chunks as they are parsed, so no file is ever held as one JSON tree
+    frames = []
     if os.path.exists(DATA_PATH):
         for filename in os.listdir(DATA_PATH):
             if filename.endswith('.json'):
-                with open(os.path.join(DATA_PATH, filename), 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    if 'messages' in data:
-                        all_messages.extend(data['messages'])
-    return all_messages
-
-messages = load_data()
-df = pd.DataFrame(messages)
+                for batch in batched(iter_messages(os.path.join(DATA_PATH, filename)), 50_000):
+                    frames.append(pd.DataFrame(batch))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+@st.cache_data
+def load_rollups():
+    """Aggregates messages per sender/day/hour once, so the activity charts never touch raw rows."""
+    messages = load_data()
+    return rollup_frame(messages) if not messages.empty else pd.DataFrame()
+
+# 🔹 Sentiment scores persist here between runs, keyed by message text hash
+SENTIMENT_CACHE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'data', 'sentiment_cache.sqlite')
+
+@st.cache_data
+def load_sentiment_scores():
+    """Reads polarity/subjectivity for every message text, scoring only texts the cache has never seen."""
+    os.makedirs(os.path.dirname(SENTIMENT_CACHE_PATH), exist_ok=True)
+    messages = load_data()
+    return cached_scores(messages['content'], SentimentCache(SENTIMENT_CACHE_PATH))
+
+@st.cache_resource
+def load_token_index():
+    """Counts words per sender/day/sentiment once; word clouds merge these counts instead of re-tokenizing."""
+    messages = load_data()
+    if 'content' not in messages.columns:
+        return TokenIndex()
+    return TokenIndex.from_frame(attach_scores(messages, load_sentiment_scores()))
+
+@st.cache_resource
+def load_search_index():
+    """Builds the in-memory search index once; searches then only touch the matching messages."""
+    messages = load_data()
+    if 'content' not in messages.columns:
+        return InvertedIndex()
+    return InvertedIndex.from_frame(messages)
+
+df = load_data()
+if 'content' in df.columns:
+    df = attach_scores(df, load_sentiment_scores())
+df_rollups = load_rollups()
 
 # 🔹 Convert timestamp
 if 'timestamp_ms' in df.columns:
@@ -62,8 +107,9 @@ st.write("Listen to the newly merged MP4 file directly from this webpage!")
 
 if os.path.exists(MERGED_VIDEO_FILE):
     st.video(MERGED_VIDEO_FILE)
-    with open(MERGED_VIDEO_FILE, "rb") as file:
-        st.download_button(label="⬇️ Download Merged Audio", data=file, file_name="merged_audio.mp4", mime="video/mp4")
+    # Opened only when the button is clicked, not read on every render
+    st.download_button(label="⬇️ Download Merged Audio", data=lambda: open(MERGED_VIDEO_FILE, "rb"),
+                       file_name="merged_audio.mp4", mime="video/mp4")
 else:
     st.error("🚨 Error: The merged MP4 file was not found! Please ensure the file exists.")
     
@@ -76,14 +122,13 @@ st.write("Watch the newly merged video right here!")
 if os.path.exists(VIDEO_PATH):
     st.video(VIDEO_PATH)
 
-    # Download Button
-    with open(VIDEO_PATH, "rb") as file:
-        st.download_button(
-            label="⬇️ Download Merged Video",
-            data=file,
-            file_name="merged_video.mp4",
-            mime="video/mp4"
-        )
+    # Download Button (opened only when clicked)
+    st.download_button(
+        label="⬇️ Download Merged Video",
+        data=lambda: open(VIDEO_PATH, "rb"),
+        file_name="merged_video.mp4",
+        mime="video/mp4"
+    )
 else:
     st.error("🚨 Error: The merged video file was not found! Please ensure the file exists.")
 
@@ -96,14 +141,35 @@ date_range = st.sidebar.date_input("Select date range", [start_date, end_date])
 # 🔹 Filter Data
 df_filtered = df[(df['timestamp'] >= pd.to_datetime(date_range[0])) & (df['timestamp'] <= pd.to_datetime(date_range[1]))] if start_date and end_date else df
 
+# 🔹 Rollups for the selected days
+if start_date and end_date and not df_rollups.empty:
+    df_rollups = df_rollups[(df_rollups['day'] >= pd.to_datetime(date_range[0]).date()) & (df_rollups['day'] <= pd.to_datetime(date_range[1]).date())]
+
 # 🔹 Display Messages
 st.subheader("📝 Messages DataFrame")
 st.dataframe(df_filtered[['sender_name', 'content', 'timestamp']])
 
+# 🔎 **Search Messages** (same filters as the Postgres search page, served from an in-memory index)
+st.subheader("🔎 Search Messages")
+search_text = st.text_input("Search for", key="search_text")
+search_mode = "substring" if st.checkbox("Match exact text", key="search_substring") else "words"
+search_senders = st.multiselect("Senders", sorted(df['sender_name'].dropna().unique()) if 'sender_name' in df.columns else [], key="search_senders")
+if search_text.strip():
+    start_ms, end_ms = date_bounds_ms(date_range[0], date_range[1]) if start_date and end_date else (None, None)
+    search_page = st.number_input("Page", min_value=1, value=1, step=1, key="search_page") - 1
+    results, has_more = load_search_index().search(search_text, search_mode, search_senders, start_ms, end_ms, page=search_page)
+    if results:
+        results = pd.DataFrame(results)
+        results['timestamp'] = pd.to_datetime(results['timestamp_ms'], unit='ms')
+        st.dataframe(results[['sender_name', 'content', 'timestamp']])
+        if has_more:
+            st.caption("More results on the next page.")
+    else:
+        st.warning("⚠️ No messages match that search.")
+
 # 📊 **Messages Over Time**
 st.subheader("📊 Messages Over Time")
-df_filtered['date'] = df_filtered['timestamp'].dt.date
-rolling_avg = df_filtered.groupby('date').size().rolling(3).mean()
+rolling_avg = daily_counts(df_rollups).rolling(3).mean() if not df_rollups.empty else pd.Series(dtype=float)
 
 fig, ax = plt.subplots()
 rolling_avg.plot(kind='line', ax=ax, color='red', linewidth=3)
@@ -114,9 +180,7 @@ st.pyplot(fig)
 
 # 🔥 **Heatmap of Message Activity**
 st.subheader("🔥 Heatmap of Messages Per Day/Hour")
-df_filtered['hour'] = df_filtered['timestamp'].dt.hour
-df_filtered['weekday'] = df_filtered['timestamp'].dt.day_name()
-heatmap_data = df_filtered.pivot_table(index='weekday', columns='hour', values='content', aggfunc='count').fillna(0)
+heatmap_data = heatmap_table(df_rollups) if not df_rollups.empty else pd.DataFrame()
 
 fig, ax = plt.subplots(figsize=(12, 6))
 sns.heatmap(heatmap_data, cmap="coolwarm", linewidths=0.5, annot=True, fmt=".0f")
@@ -132,8 +196,7 @@ reaction_data = []
 for _, row in df_filtered.iterrows():
     if isinstance(row.get('reactions'), list):
         for reaction in row['reactions']:
-            emoji_char = reaction['reaction'].encode('latin1').decode('utf-8')  # Fix Unicode Encoding
-            reaction_data.append({"user": reaction['actor'], "reaction": emoji_char})
+            reaction_data.append({"user": reaction['actor'], "reaction": reaction['reaction']})
 
 df_reactions = pd.DataFrame(reaction_data)
 
@@ -154,34 +217,28 @@ st.plotly_chart(fig)
 
 # ☁️ **Word Cloud**
 st.subheader("☁️ Most Frequent Words")
-all_content = ' '.join(df_filtered['content'].dropna())
-wordcloud = WordCloud(width=800, height=400, background_color='black', colormap='plasma').generate(all_content)
-st.image(wordcloud.to_array())
+token_index = load_token_index()
+if start_date and end_date:
+    word_counts = token_index.frequencies(pd.to_datetime(date_range[0]).date(), pd.to_datetime(date_range[1]).date())
+else:
+    word_counts = token_index.frequencies()
+if word_counts:
+    wordcloud = WordCloud(width=800, height=400, background_color='black', colormap='plasma').generate_from_frequencies(word_counts)
+    st.image(wordcloud.to_array())
 
 # 🔥 **Sentiment Analysis**
 st.subheader("📉 Sentiment Analysis Over Time")
 
-df_filtered['sentiment'] = df_filtered['content'].apply(lambda x: TextBlob(x).sentiment.polarity)
+df_filtered['sentiment'] = df_filtered['polarity'].fillna(0.0)
 fig = px.line(df_filtered, x='timestamp', y='sentiment', title="📉 Sentiment Over Time", color='sender_name')
 st.plotly_chart(fig)
 
 # 🎯 **Sentiment Analysis Per User**
 st.subheader("💬 User Sentiment Ranking")
 
-# Initialize sentiment storage
-user_sentiment = defaultdict(list)
-
-# Compute sentiment for each user
-for _, row in df.iterrows():
-    sender = row.get("sender_name", "Unknown")
-    content = str(row.get("content", ""))  # Convert to string and handle NaNs
-
-    if content.strip():  # Ignore empty messages
-        sentiment_score = TextBlob(content).sentiment.polarity
-        user_sentiment[sender].append(sentiment_score)
-
-# Compute average sentiment per user
-user_avg_sentiment = {user: np.mean(scores) for user, scores in user_sentiment.items() if scores}
+# Average stored polarity per user, ignoring empty messages
+has_text = df['content'].astype(str).str.strip() != ''
+user_avg_sentiment = df[has_text].groupby('sender_name')['polarity'].apply(lambda scores: scores.fillna(0.0).mean()).to_dict()
 
 # Sort users by sentiment score (most positive first)
 sorted_sentiment = sorted(user_avg_sentiment.items(), key=lambda x: x[1], reverse=True)
@@ -207,7 +264,8 @@ st.plotly_chart(fig)
 # 🌐 **Messenger Network Graph**
 st.subheader("🌐 Messenger Network Graph")
 
-G = nx.Graph()
+# Undirected sender ↔ reactor edges, weighted by reaction count
+edge_weights = Counter()
 
 for _, row in df_filtered.iterrows():
     sender = row['sender_name']
@@ -215,16 +273,13 @@ for _, row in df_filtered.iterrows():
         for reaction in row['reactions']:
             receiver = reaction['actor']
             if sender != receiver:
-                G.add_edge(sender, receiver)
+                edge_weights[tuple(sorted((sender, receiver)))] += 1
 
-# Save Graph
-net = Network(height="600px", width="100%")
-net.from_nx(G)
-network_html = os.path.join(os.path.abspath(os.path.dirname(__file__)), "network_graph.html")
-net.save_graph(network_html)
+nodes = tuple(sorted({name for edge in edge_weights for name in edge}))
+edges = tuple((source, target, weight) for (source, target), weight in sorted(edge_weights.items()))
 
-# Display in Streamlit
-components.html(open(network_html, "r").read(), height=600)
+# Display in Streamlit (layout cached in memory, no shared HTML file)
+components.html(network_html(nodes, edges), height=600)
 
 # 🎯 Streamlit Page Configuration
 st.subheader("💬 Reaction Normalization Analysis")
@@ -0,0 +1,17 @@
+import streamlit as st
+
+from z_config import AUTH_WORKERS, BCRYPT_ROUNDS, AUTH_NEGATIVE_CACHE_TTL_S, AUTH_NEGATIVE_CACHE_MAX_ENTRIES
+from z_db import connection
+from utils.auth import AuthService
+
+
+@st.cache_resource
+def get_auth():
+    """Create the process-wide auth service (shared bcrypt pool and unknown-user cache)."""
+    return AuthService(
+        connection,
+        workers=AUTH_WORKERS,
+        rounds=BCRYPT_ROUNDS,
+        negative_ttl_s=AUTH_NEGATIVE_CACHE_TTL_S,
+        negative_max_entries=AUTH_NEGATIVE_CACHE_MAX_ENTRIES
+    )
@@ -0,0 +1,57 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load Environment Variables
+load_dotenv()
+
+# 🔹 Make the repo-level utils package importable from the Streamlit app
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+# 🔹 Database Connection Settings
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT")
+}
+
+# 🔹 Connection Pool Settings
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+# Pooled connections idle longer than this are pinged before being handed out
+DB_HEALTHCHECK_AFTER_S = float(os.getenv("DB_HEALTHCHECK_AFTER_S", "30"))
+
+# 🔹 Query Result Cache Settings
+QUERY_CACHE_TTL_S = int(os.getenv("QUERY_CACHE_TTL_S", "3600"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "128"))
+
+# How often the data version stamp written by the loaders is re-read
+DATA_VERSION_TTL_S = int(os.getenv("DATA_VERSION_TTL_S", "10"))
+
+# 🔹 Rendered Network Graph Cache Settings
+GRAPH_CACHE_TTL_S = int(os.getenv("GRAPH_CACHE_TTL_S", "3600"))
+GRAPH_CACHE_MAX_ENTRIES = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "32"))
+
+# 🔹 Chat Log Browser Settings
+CHAT_LOG_PAGE_SIZES = (25, 50, 100, 250)
+# Pages fetched beyond the one on screen, so paging through them needs no query
+CHAT_LOG_PREFETCH_PAGES = int(os.getenv("CHAT_LOG_PREFETCH_PAGES", "2"))
+
+# 🔹 Sign-In Settings
+# Threads bcrypt checks and hashing run on (caps the cores concurrent logins can take)
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "4"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# How long a username that does not exist is remembered without asking the database again
+AUTH_NEGATIVE_CACHE_TTL_S = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL_S", "30"))
+AUTH_NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+
+# 🔹 Media Download Cache Settings
+# Merged audio/video is fetched from the bucket only when a download is requested, then kept here
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", os.path.join(ROOT_DIR, "data", "media_cache"))
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
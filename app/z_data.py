@@ -0,0 +1,120 @@
+import pandas as pd
+from datetime import datetime
+
+from z_db import cached_query
+from utils.queries import date_bounds_ms, timestamp_filter
+from utils.search import search_query
+from utils.token_index import FREQUENCIES_SQL, frequencies_params
+
+# Fetch Messages from Database
+def fetch_messages(start_date=None, end_date=None):
+    """
+    Fetch messages from PostgreSQL with optional date filtering (cached per data version).
+    Polarity and subjectivity come from the stored scores (NULL until scripts/score_sentiment.py has run).
+    Word, character and emoji counts are the columns stored at ingest (utils/message_stats.py).
+    Dates cover whole UTC days; datetimes are exact bounds with the end excluded.
+    """
+    query = """
+        SELECT
+            messages.id,
+            participants.name AS sender_name,
+            messages.content,
+            messages.word_count,
+            messages.char_length,
+            messages.emoji_count,
+            to_timestamp(messages.timestamp_ms / 1000) AT TIME ZONE 'UTC' AS message_timestamp,
+            s.polarity,
+            s.subjectivity
+        FROM messages
+        JOIN participants ON messages.sender_id = participants.id
+        LEFT JOIN message_sentiment s ON s.content_hash = md5(messages.content)
+        WHERE messages.content IS NOT NULL
+    """
+
+    params = []
+    if start_date and end_date:
+        where, params = timestamp_filter(start_date, end_date)
+        query += f" AND {where}"
+
+    query += " ORDER BY messages.timestamp_ms ASC;"
+
+    df = cached_query(query, params)
+    if df.empty:
+        return df
+
+    # Ensure message_timestamp is converted properly
+    df["message_timestamp"] = pd.to_datetime(df["message_timestamp"], utc=True)
+
+    return df
+
+# Fetch the Date Range Covered by Messages
+def fetch_date_bounds():
+    """ Return the first and last message dates (UTC) without loading the messages themselves. """
+    df = cached_query("""
+        SELECT MIN(timestamp_ms) AS min_ms, MAX(timestamp_ms) AS max_ms
+        FROM messages
+        WHERE content IS NOT NULL;
+    """)
+
+    if df.empty or pd.isna(df["min_ms"].iloc[0]):
+        today = datetime.today().date()
+        return today, today
+
+    min_date = pd.to_datetime(int(df["min_ms"].iloc[0]), unit="ms", utc=True).date()
+    max_date = pd.to_datetime(int(df["max_ms"].iloc[0]), unit="ms", utc=True).date()
+    return min_date, max_date
+
+# Fetch Pre-Aggregated Activity Rollups
+def fetch_rollups(start_date=None, end_date=None):
+    """ Fetch per sender/day/hour rollup rows (a few thousand at most) for the activity charts. """
+    query = """
+        SELECT
+            participants.name AS sender_name,
+            r.day, r.weekday, r.hour,
+            r.message_count, r.text_message_count, r.word_count, r.reaction_count,
+            r.sentiment_sum, r.sentiment_count
+        FROM message_rollups r
+        JOIN participants ON r.sender_id = participants.id
+    """
+
+    params = []
+    if start_date and end_date:
+        query += " WHERE r.day BETWEEN %s AND %s"
+        params = [start_date, end_date]
+
+    query += " ORDER BY r.day, r.hour;"
+
+    return cached_query(query, params)
+
+# Fetch Word Frequencies from the Token Index
+def fetch_word_frequencies(start_date, end_date, bucket=None):
+    """
+    Merge per sender/day token counts for a date range (and optional sentiment bucket: -1, 0 or 1)
+    into a {word: count} dict for WordCloud.generate_from_frequencies.
+    """
+    df = cached_query(FREQUENCIES_SQL, frequencies_params(start_date, end_date, bucket))
+    if df.empty:
+        return {}
+    return dict(zip(df["token"], df["count"].astype(int)))
+
+# Fetch Participant Names
+def fetch_sender_names():
+    """ Return every participant name, for sender filters. """
+    df = cached_query("SELECT name FROM participants ORDER BY name;")
+    return df["name"].tolist() if not df.empty else []
+
+# Search Message Content
+def search_messages(query, mode="words", senders=None, start_date=None, end_date=None, page=0, page_size=50):
+    """
+    Search message content through the full-text (mode="words") or trigram (mode="substring")
+    index, one page at a time. Returns (results DataFrame, whether another page exists).
+    """
+    start_ms, end_ms = date_bounds_ms(start_date, end_date) if start_date and end_date else (None, None)
+    sql, params = search_query(query, mode, senders, start_ms, end_ms, page, page_size)
+
+    df = cached_query(sql, params)
+    if df.empty:
+        return df, False
+
+    df["message_timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms", utc=True)
+    return df.head(page_size), len(df) > page_size
@@ -0,0 +1,129 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+import streamlit as st
+from psycopg2 import pool
+
+from z_config import (
+    DB_CONFIG, DB_POOL_MIN, DB_POOL_MAX, DB_STATEMENT_TIMEOUT_MS, DB_HEALTHCHECK_AFTER_S,
+    QUERY_CACHE_TTL_S, QUERY_CACHE_MAX_ENTRIES, DATA_VERSION_TTL_S
+)
+
+logger = logging.getLogger(__name__)
+
+# When each pooled connection was last handed back, keyed by id(conn)
+_last_used = {}
+_last_used_lock = threading.Lock()
+
+
+@st.cache_resource
+def get_pool():
+    """Create the process-wide connection pool (shared by every session and page)."""
+    return pool.ThreadedConnectionPool(
+        DB_POOL_MIN, DB_POOL_MAX,
+        options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+        **DB_CONFIG
+    )
+
+
+def _is_healthy(conn):
+    """Ping a connection that has been idle for a while."""
+    if conn.closed:
+        return False
+    with _last_used_lock:
+        idle_for = time.monotonic() - _last_used.get(id(conn), 0)
+    if idle_for < DB_HEALTHCHECK_AFTER_S:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _checkout(db_pool):
+    """Take a healthy connection from the pool, replacing dead ones."""
+    for _ in range(DB_POOL_MAX + 1):
+        conn = db_pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        logger.warning("Discarding dead pooled connection.")
+        db_pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("No healthy database connection available.")
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection for one unit of work; commits on success, rolls back on error."""
+    db_pool = get_pool()
+    conn = _checkout(db_pool)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        with _last_used_lock:
+            _last_used[id(conn)] = time.monotonic()
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+
+def _execute(query, params=None):
+    """Run a SELECT on a pooled connection and return the rows as a DataFrame (raises on failure)."""
+    started = time.perf_counter()
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            columns = [desc[0] for desc in cur.description]
+            df = pd.DataFrame.from_records(cur.fetchall(), columns=columns, coerce_float=True)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("query took %.1f ms (%d rows): %s", elapsed_ms, len(df), " ".join(query.split())[:120])
+    return df
+
+
+def run_query(query, params=None):
+    """Run a SELECT on a pooled connection and return the rows as a DataFrame."""
+    try:
+        return _execute(query, params)
+    except psycopg2.Error as e:
+        st.error(f"❌ Database query failed: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_S, show_spinner=False)
+def data_version():
+    """Read the version stamp the ingestion scripts bump after every load."""
+    try:
+        df = _execute("SELECT version FROM data_version;")
+    except psycopg2.errors.UndefinedTable:
+        return 0
+    return int(df["version"].iloc[0]) if not df.empty else 0
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL_S, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def _execute_cached(query, params, version):
+    """Cached wrapper around _execute; `version` only takes part in the cache key."""
+    return _execute(query, params)
+
+
+def cached_query(query, params=None):
+    """
+    Like run_query, but results are kept in memory keyed by query, parameters and data version.
+    Entries expire after QUERY_CACHE_TTL_S, at most QUERY_CACHE_MAX_ENTRIES are kept, and a new
+    load bumps the data version so stale results are never served.
+    """
+    try:
+        params = params if isinstance(params, dict) else tuple(params or ())
+        return _execute_cached(query, params, data_version())
+    except psycopg2.Error as e:
+        st.error(f"❌ Database query failed: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,19 @@
+import streamlit as st
+
+from z_config import MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES
+from utils.media_cache import MediaCache
+
+
+@st.cache_resource
+def get_media_cache():
+    """Create the process-wide media cache (one HTTP connection pool and one cache directory)."""
+    return MediaCache(MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_BYTES)
+
+
+def download_from_cache(url):
+    """
+    A download_button data callable: the file is fetched into the cache (or found there) only
+    when the button is clicked, and handed over as an open file rather than bytes.
+    """
+    cache = get_media_cache()
+    return lambda: cache.open(url)
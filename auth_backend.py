@@ -1,9 +1,12 @@
 from flask import Flask, redirect, request, session, jsonify
 from flask_cors import CORS
-import requests
+import jwt
 import os
+import requests
 from dotenv import load_dotenv
-from flask_session import Session  # ✅ Import Flask-Session
+
+from utils.oidc import JWKSCache, make_session, profile_from_claims, verify_id_token
+from utils.session_store import SessionStore, StoreSessionInterface
 
 # Load environment variables
 load_dotenv()
@@ -12,11 +15,15 @@ app = Flask(__name__)
 CORS(app)
 app.secret_key = os.getenv("SECRET_KEY")
 
-# ✅ Configure Flask-Session to Store Sessions Properly
-app.config["SESSION_TYPE"] = "filesystem"  # Store sessions in the local filesystem
+# ✅ Server-side sessions: an in-memory LRU over one SQLite file, expired rows swept in the background
 app.config["SESSION_PERMANENT"] = False
-app.config["SESSION_USE_SIGNER"] = True  # Sign session cookies for security
-Session(app)  # Initialize Flask-Session
+session_store = SessionStore(
+    os.getenv("SESSION_DB_PATH", os.path.join(app.instance_path, "sessions.sqlite3")),
+    ttl_s=float(os.getenv("SESSION_TTL_S", "86400")),
+    cache_size=int(os.getenv("SESSION_CACHE_SIZE", "1024"))
+)
+session_store.start_gc(interval_s=float(os.getenv("SESSION_GC_INTERVAL_S", "300")))
+app.session_interface = StoreSessionInterface(session_store)  # Cookie holds only a signed session id
 
 # Google OAuth Config (now loaded from environment)
 CLIENT_ID = os.getenv("CLIENT_ID")
@@ -25,6 +32,16 @@ REDIRECT_URI = os.getenv("REDIRECT_URI")
 GOOGLE_AUTH_URL = os.getenv("GOOGLE_AUTH_URL")
 TOKEN_URL = os.getenv("TOKEN_URL")
 USER_INFO_URL = os.getenv("USER_INFO_URL")
+JWKS_URL = os.getenv("JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+# Accepted "iss" values for ID tokens (comma separated)
+ID_TOKEN_ISSUERS = os.getenv("ID_TOKEN_ISSUERS", "https://accounts.google.com,accounts.google.com").split(",")
+
+# ✅ One keep-alive connection pool for every call to the provider
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "10"))
+http = make_session(pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "10")))
+
+# ✅ Provider signing keys, cached so ID tokens are verified without a network call
+jwks = JWKSCache(http, JWKS_URL, refresh_s=float(os.getenv("JWKS_REFRESH_S", "3600")), timeout_s=HTTP_TIMEOUT_S)
 
 @app.route("/api/auth/google")
 def google_login():
@@ -54,15 +71,28 @@ def google_callback():
         "redirect_uri": REDIRECT_URI,
         "grant_type": "authorization_code",
     }
-    token_response = requests.post(TOKEN_URL, data=data)
-    token_json = token_response.json()
+    try:
+        token_response = http.post(TOKEN_URL, data=data, timeout=HTTP_TIMEOUT_S)
+        token_json = token_response.json()
+    except (requests.RequestException, ValueError) as e:
+        return f"Failed to reach the token endpoint: {e}", 502
 
     if "access_token" not in token_json:
         error_message = token_json.get("error_description", "Unknown error")
         return f"Failed to get access token: {error_message}", 400
 
-    user_info_response = requests.get(USER_INFO_URL, headers={"Authorization": f"Bearer {token_json['access_token']}"})
-    user_info = user_info_response.json()
+    if "id_token" in token_json:
+        # ✅ Verify the ID token locally instead of asking the userinfo endpoint who this is
+        try:
+            claims = verify_id_token(token_json["id_token"], jwks, CLIENT_ID, ID_TOKEN_ISSUERS)
+        except (jwt.PyJWTError, requests.RequestException) as e:
+            return f"Invalid ID token: {e}", 400
+        user_info = profile_from_claims(claims)
+    else:
+        # Providers that return no ID token still need the userinfo call
+        user_info_response = http.get(USER_INFO_URL, headers={"Authorization": f"Bearer {token_json['access_token']}"},
+                                      timeout=HTTP_TIMEOUT_S)
+        user_info = user_info_response.json()
 
     session["user"] = user_info  # ✅ Store user session persistently
     return redirect("http://localhost:8502")  # ✅ Redirects user back to Streamlit
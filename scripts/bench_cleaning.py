@@ -0,0 +1,79 @@
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.text_cleaning import clean_texts, get_cleaner
+
+# Compares the old one-re.sub-per-rule cleaner against the compiled single-pass engine,
+# serially and across a process pool, on a synthetic corpus of chat messages.
+
+WORDS = ("just present it to the class by six tomorrow thanks for handling that literally "
+         "message reacted catalina wine mixer it's Caroline! 100% 😂 ❤️").split()
+LINKS = ["https://example.com/a?b=c", "http://t.co/xyz"]
+
+
+def build_corpus(message_count, seed=42):
+    """ Build a list of message texts with URLs, punctuation, emoji and reaction notices. """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(message_count):
+        words = rng.choices(WORDS, k=rng.randint(1, 25))
+        if rng.random() < 0.05:
+            words.append(rng.choice(LINKS))
+        if rng.random() < 0.02:
+            words.extend(["reacted", "😆", "to", "your", "message"])
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy_clean(content):
+    """ The per-rule cleaner the engine replaced (utils/json_to_json.py). """
+    if re.search(r'\bto your message\b', content, flags=re.IGNORECASE):
+        return None
+    cleaned_content = re.sub(r'https?://\S+', '', content)
+    cleaned_content = re.sub(r'[^a-zA-Z\s]', '', cleaned_content)
+    cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)
+    cleaned_content = re.sub(r'\bcatalina wine mixer\b', '', cleaned_content, flags=re.IGNORECASE)
+    cleaned_content = re.sub(r'\breacted\b', '', cleaned_content, flags=re.IGNORECASE)
+    return cleaned_content.strip()
+
+
+def best_of(repeat, function):
+    """ Run function repeat times and return the fastest elapsed seconds. """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the legacy cleaner against the single-pass cleaning engine.")
+    parser.add_argument("--messages", type=int, default=200_000, help="synthetic messages per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode (best is reported)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the parallel mode")
+    args = parser.parse_args()
+
+    texts = build_corpus(args.messages)
+    cleaner = get_cleaner("json")
+
+    modes = {
+        "legacy": lambda: [legacy_clean(text) for text in texts],
+        "engine": lambda: cleaner.clean_many(texts),
+        "parallel": lambda: clean_texts(texts, "json", workers=args.workers),
+    }
+    results = {}
+    for mode, function in modes.items():
+        results[mode] = best_of(args.repeat, function)
+        print(f"{mode:>8}: {results[mode]:.2f}s  ({args.messages / results[mode]:,.0f} messages/s)")
+    print(f"speedup: {results['legacy'] / results['engine']:.1f}x serial, "
+          f"{results['legacy'] / results['parallel']:.1f}x with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
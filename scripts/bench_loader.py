@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import psycopg2
+
+from json_to_postgres_2 import DB_CONFIG, process_file, process_file_copy
+
+# Compares the per-row INSERT path against the COPY staging path on a synthetic export.
+# Each run happens inside a transaction that is rolled back, so the database is left untouched.
+
+PARTICIPANTS = [f"Bench Participant {i}" for i in range(12)]
+REACTIONS = ["â\u009d¤", "ð\u009f\u0098\u0086", "ð\u009f\u0098¡", "ð\u009f\u0092¯"]
+WORDS = "just present it to the class by six tomorrow thanks for handling that literally".split()
+
+
+def build_export(message_count, seed=42):
+    """ Build a Messenger-style export dict with reactions and photos. """
+    rng = random.Random(seed)
+    start_ms = 1_600_000_000_000
+    messages = []
+
+    for i in range(message_count):
+        message = {
+            "sender_name": rng.choice(PARTICIPANTS),
+            "timestamp_ms": start_ms + i * 1000 + rng.randint(0, 999),
+            "content": " ".join(rng.choices(WORDS, k=rng.randint(1, 20))),
+            "is_geoblocked_for_viewer": False,
+            "is_unsent_image_by_messenger_kid_parent": False,
+        }
+        if rng.random() < 0.3:
+            message["reactions"] = [
+                {"reaction": rng.choice(REACTIONS), "actor": rng.choice(PARTICIPANTS)}
+                for _ in range(rng.randint(1, 4))
+            ]
+        if rng.random() < 0.05:
+            message["photos"] = [{"uri": f"photos/{i}.jpg", "creation_timestamp": start_ms // 1000 + i}]
+        messages.append(message)
+
+    return {"participants": [{"name": name} for name in PARTICIPANTS], "messages": messages}
+
+
+def time_mode(conn, mode, file_name):
+    """ Load the file once in the given mode and roll it back, returning elapsed seconds. """
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    if mode == "copy":
+        process_file_copy(file_name, cursor)
+    else:
+        process_file(file_name, cursor, {})
+    elapsed = time.perf_counter() - started
+    conn.rollback()
+    cursor.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-row loader against the COPY loader.")
+    parser.add_argument("--messages", type=int, default=20_000, help="synthetic messages per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode (best is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as file:
+        json.dump(build_export(args.messages), file)
+        file_name = file.name
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        results = {}
+        for mode in ("row", "copy"):
+            results[mode] = min(time_mode(conn, mode, file_name) for _ in range(args.repeat))
+            print(f"{mode:>5}: {results[mode]:.2f}s  ({args.messages / results[mode]:,.0f} messages/s)")
+        print(f"speedup: {results['row'] / results['copy']:.1f}x")
+    finally:
+        conn.close()
+        os.remove(file_name)
+
+
+if __name__ == "__main__":
+    main()
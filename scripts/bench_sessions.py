@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from flask import Flask, session, jsonify
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.session_store import SessionStore, StoreSessionInterface
+
+# Measures /api/auth/status latency with many stored sessions, for Flask-Session's filesystem
+# backend (one pickle file per session, what auth_backend.py used before) and for the SQLite
+# session store, both with its LRU warm and with the LRU emptied so every check reads from disk.
+
+
+def build_app(configure):
+    """ A Flask app with the auth backend's status route and a login route that fills a session. """
+    app = Flask(__name__)
+    app.secret_key = "bench"
+    app.config["SESSION_PERMANENT"] = False
+    configure(app)
+
+    @app.route("/login/<int:user_id>")
+    def login(user_id):
+        session["user"] = {"sub": str(user_id), "email": f"user{user_id}@example.test", "name": f"Bench User {user_id}"}
+        return "ok"
+
+    @app.route("/api/auth/status")
+    def auth_status():
+        if "user" in session:
+            return jsonify(session["user"]), 200
+        return jsonify({"error": "Not authenticated"}), 401
+
+    return app
+
+
+def fill_sessions(app, count):
+    """ Logs in count users and returns their session cookies. """
+    cookies = []
+    for user_id in range(count):
+        client = app.test_client()
+        client.get(f"/login/{user_id}")
+        cookies.append(client.get_cookie("session").value)
+    return cookies
+
+
+def time_status(app, cookies, checks, seed=42):
+    """ Status checks for randomly chosen sessions; returns per-request latencies in microseconds. """
+    rng = random.Random(seed)
+    client = app.test_client()
+    latencies = []
+    for _ in range(checks):
+        client.set_cookie("session", rng.choice(cookies))
+        started = time.perf_counter()
+        response = client.get("/api/auth/status")
+        latencies.append((time.perf_counter() - started) * 1e6)
+        assert response.status_code == 200
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:>22}: median {statistics.median(latencies):8.0f} µs   p99 {p99:8.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auth status checks against stored sessions.")
+    parser.add_argument("--sessions", type=int, default=10_000, help="stored sessions")
+    parser.add_argument("--checks", type=int, default=2_000, help="status checks timed per backend")
+    parser.add_argument("--cache-size", type=int, default=1024, help="session store LRU size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            from flask_session import Session
+        except ImportError:
+            print("flask_session is not installed; skipping the filesystem backend.")
+        else:
+            def filesystem(app):
+                app.config.update(SESSION_TYPE="filesystem", SESSION_USE_SIGNER=True,
+                                  SESSION_FILE_DIR=os.path.join(tmp_dir, "flask_session"),
+                                  SESSION_FILE_THRESHOLD=args.sessions * 2)
+                Session(app)
+
+            app = build_app(filesystem)
+            cookies = fill_sessions(app, args.sessions)
+            report("filesystem (pickle)", time_status(app, cookies, args.checks))
+
+        store = SessionStore(os.path.join(tmp_dir, "sessions.sqlite3"), cache_size=args.cache_size)
+        try:
+            app = build_app(lambda app: setattr(app, "session_interface", StoreSessionInterface(store)))
+            cookies = fill_sessions(app, args.sessions)
+            print(f"{len(store):,} sessions stored.")
+
+            # Active users: the same few hundred sessions checked over and over
+            active = cookies[-min(args.cache_size, len(cookies)):]
+            report("store, LRU warm", time_status(app, active, args.checks))
+
+            store._cache.clear()
+            report("store, LRU cold", time_status(app, cookies, args.checks))
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
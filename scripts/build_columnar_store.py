@@ -0,0 +1,39 @@
+import os
+import sys
+import glob
+import logging
+import argparse
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.columnar_store import convert_exports, messages_frame
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "messages", "messages_dev")
+SOURCE_DIR = os.path.join(BASE_DIR, "cleaned_messages")
+STORE_DIR = os.path.join(BASE_DIR, "columnar")
+
+def main():
+    """ Convert the cleaned message_N.json files into the memory-mapped columnar store. """
+    parser = argparse.ArgumentParser(description="Build the Arrow columnar message store from export files.")
+    parser.add_argument("--source", default=SOURCE_DIR, help="directory holding message_N.json files")
+    parser.add_argument("--out", default=STORE_DIR, help="store directory to (re)write")
+    args = parser.parse_args()
+
+    file_names = sorted(glob.glob(os.path.join(args.source, "message_*.json")))
+    if not file_names:
+        logging.error(f"❌ No message_*.json files found in {args.source}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    count = convert_exports(file_names, args.out)
+    logging.info(f"✅ Converted {len(file_names)} files ({count} messages) in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    messages_frame(args.out, nested=True)
+    logging.info(f"⏱️ Cold load from the store takes {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,14 @@
 import json
 import os
-import re
+import sys
 from datetime import datetime
 
-def fix_encoding(text):
-    """
-    Fixes misinterpreted Unicode sequences by decoding them properly.
-    Example: \u00e2\u0080\u0099 → ’
-    """
-    if not isinstance(text, str):
-        return text  # Return unchanged if it's not a string
-    
-    try:
-        return text.encode('latin1').decode('utf-8')  # Fix double encoding issue
-    except UnicodeDecodeError:
-        return text
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.stream_reader import iter_messages, read_header, write_export
+from utils.text_cleaning import get_cleaner
+
+# Repairs the encoding, then drops URLs, the word "message" and astral characters in one pass
+cleaner = get_cleaner("archive")
 
 # Define folder paths
 input_folder = '../data/messages/messages_dev/raw_messages/'
@@ -25,43 +19,34 @@ os.makedirs(output_folder, exist_ok=True)
 file_count = len([file for file in os.listdir(input_folder) if os.path.isfile(os.path.join(input_folder, file))])
 file_names = [f'{input_folder}message_{i}.json' for i in range(1, file_count + 1)]
 
-# Process each file
-for file_name in file_names:
-    try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            print(f"Processing file: {file_name}")
-            data = json.load(file)
-            
-            cleaned_messages = []
 
-            # Clean only the content of messages
-            for message in data.get("messages", []):
-                if "content" in message and message["content"]:
-                    raw_content = message["content"]
-                    raw_content = fix_encoding(raw_content)                    
-                    
-                    if not re.search(r'\bto your message\b', raw_content, flags=re.IGNORECASE):
-                        cleaned_content = re.sub(r'https?://\S+', '', raw_content)  # Remove URLs
-                        cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)  # Remove the word 'message'
-                        # Keep original spacing, emojis, and remove special characters (excluding spaces)
-                        cleaned_content = re.sub(r'[^a-zA-Z0-9\s\u0000-\uFFFF]', '', cleaned_content)
-                        message["content"] = cleaned_content
-                        
-                        cleaned_messages.append(message)
-                        
-                elif not "content" in message:
-                    cleaned_messages.append(message)
+def clean_messages(messages):
+    """ Yields the messages to keep, with their content cleaned. """
+    for message in messages:
+        if "content" in message and message["content"]:
+            cleaned_content = cleaner.clean(message["content"])
+
+            if cleaned_content is not None:
+                message["content"] = cleaned_content
+                yield message
 
-            data["messages"] = cleaned_messages
+        elif not "content" in message:
+            yield message
+
+
+# Process each file, streaming messages from the raw export straight into the cleaned copy
+for file_name in file_names:
+    try:
+        print(f"Processing file: {file_name}")
+        header = read_header(file_name)
 
-            # Save cleaned content as JSON with timestamp
-            timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_file_name = os.path.join(output_folder, f"{os.path.splitext(os.path.basename(file_name))[0]}_{timestamp_str}.json")
-            with open(output_file_name, 'w', encoding='utf-8') as output_file:
-                json.dump(data, output_file, ensure_ascii=True, indent=4)
-            print(f"Cleaned JSON file saved: {output_file_name}")
+        # Save cleaned content as JSON with timestamp
+        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file_name = os.path.join(output_folder, f"{os.path.splitext(os.path.basename(file_name))[0]}_{timestamp_str}.json")
+        write_export(output_file_name, header, clean_messages(iter_messages(file_name)))
+        print(f"Cleaned JSON file saved: {output_file_name}")
 
     except FileNotFoundError:
         print(f"File not found: {file_name}")
     except json.JSONDecodeError:
-        print(f"Error reading JSON in file: {file_name}")
\ No newline at end of file
+        print(f"Error reading JSON in file: {file_name}")
@@ -1,9 +1,20 @@
 import os
+import sys
 import json
 import psycopg2
 import logging
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.copy_loader import ensure_participants, load_messages
+from utils.message_stats import fill_pending_stats, message_stats
+from utils.parallel_ingest import LOAD_BATCH_SIZE, ingest_files
+from utils.rollups import refresh_rollups
+from utils.schema import bump_data_version, ensure_schema
+from utils.sentiment import score_pending
+from utils.stream_reader import batched, iter_messages, read_participants
+from utils.token_index import refresh_token_index
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -19,6 +30,15 @@ DB_CONFIG = {
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# "copy" streams each file through staging tables; "row" keeps the original per-row INSERTs
+LOADER_MODE = os.getenv("LOADER_MODE", "copy")
+
+# Worker processes for the parallel COPY loader (defaults to one per core)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or None
+
+# Set FULL_RELOAD=1 to ignore the ingest manifest and re-stage every file
+FULL_RELOAD = os.getenv("FULL_RELOAD", "0") == "1"
+
 # Folder containing JSON files
 INPUT_FOLDER = "/Users/carolinetwyman/Desktop/apps/puppygirlhackerpolycule_6868692056483270/data/messages/messages_dev/cleaned_messages/"
 
@@ -28,10 +48,8 @@ def connect_db():
         conn = psycopg2.connect(**DB_CONFIG)
         cursor = conn.cursor()
 
-        # Create necessary indexes to speed up queries
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp_ms);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reactions_message_id ON reactions (message_id);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_message_id ON media (message_id);")
+        # Create necessary indexes, the message natural key and the ingest manifest
+        ensure_schema(cursor)
 
         conn.commit()
         cursor.close()
@@ -51,14 +69,16 @@ def load_json_files(folder):
     return [os.path.join(folder, file) for file in files]
 
 def process_file(file_name, cursor, participant_ids):
-    """ Process a single JSON file and insert data into PostgreSQL. """
+    """ Process a single JSON file and insert data into PostgreSQL. Returns the earliest timestamp_ms inserted, if any. """
     try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        # Participants come first in the file, so this stops reading as soon as it has them
+        participants = read_participants(file_name)
+        # Read every message before inserting anything, so a broken file inserts nothing
+        messages = list(iter_messages(file_name)) if participants else []
 
         # Ensure required keys exist
-        if "participants" not in data or "messages" not in data:
-            logging.error(f"❌ Skipping {file_name} (missing required keys).")
+        if not messages:
+            logging.error(f"❌ Skipping {file_name} (missing participants or messages).")
             return
 
     except json.JSONDecodeError as e:
@@ -68,7 +88,7 @@ def process_file(file_name, cursor, participant_ids):
     message_ids = {}
 
     # Insert Participants and retrieve IDs
-    for participant in data["participants"]:
+    for participant in participants:
         cursor.execute(
             """INSERT INTO participants (name) VALUES (%s) 
                ON CONFLICT (name) DO NOTHING RETURNING id;""",
@@ -88,35 +108,41 @@ def process_file(file_name, cursor, participant_ids):
     reactions_data = []
     media_data = []
 
-    for message in data["messages"]:
+    for message in messages:
         sender_id = participant_ids.get(message["sender_name"])
         messages_data.append((
             sender_id, message["timestamp_ms"], message.get("content"),
             message.get("is_geoblocked_for_viewer", False),
-            message.get("is_unsent_image_by_messenger_kid_parent", False)
+            message.get("is_unsent_image_by_messenger_kid_parent", False),
+            *message_stats(message.get("content"))
         ))
 
+        # Messages are identified by (sender_id, timestamp_ms); timestamps alone can collide
+        message_key = (sender_id, message["timestamp_ms"])
+
         if "reactions" in message:
             for reaction in message["reactions"]:
                 actor_id = participant_ids.get(reaction["actor"])
-                reactions_data.append((message["timestamp_ms"], reaction["reaction"], actor_id))
+                reactions_data.append((message_key, reaction["reaction"], actor_id))
 
         if "photos" in message:
             for photo in message["photos"]:
-                media_data.append((message["timestamp_ms"], photo["uri"], photo["creation_timestamp"]))
+                media_data.append((message_key, photo["uri"], photo["creation_timestamp"]))
 
     # Bulk Insert Messages
     try:
         for message in messages_data:
             cursor.execute(
                 """INSERT INTO messages (sender_id, timestamp_ms, content, 
-                                         is_geoblocked_for_viewer, is_unsent_image_by_messenger_kid_parent) 
-                   VALUES (%s, %s, %s, %s, %s) RETURNING id;""",
+                                         is_geoblocked_for_viewer, is_unsent_image_by_messenger_kid_parent,
+                                         word_count, char_length, emoji_count) 
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                   ON CONFLICT (sender_id, timestamp_ms) DO NOTHING RETURNING id;""",
                 message
             )
             inserted_id = cursor.fetchone()
             if inserted_id:
-                message_ids[message[1]] = inserted_id[0]  # message[1] is timestamp_ms
+                message_ids[(message[0], message[1])] = inserted_id[0]  # keyed by (sender_id, timestamp_ms)
 
     except psycopg2.ProgrammingError as e:
         logging.error(f"❌ No messages were inserted for {file_name}: {e}")
@@ -126,34 +152,82 @@ def process_file(file_name, cursor, participant_ids):
     if reactions_data:
         cursor.executemany(
             "INSERT INTO reactions (message_id, reaction, actor_id) VALUES (%s, %s, %s);",
-            [(message_ids.get(timestamp, None), reaction, actor_id) for timestamp, reaction, actor_id in reactions_data if timestamp in message_ids]
+            [(message_ids[key], reaction, actor_id) for key, reaction, actor_id in reactions_data if key in message_ids]
         )
 
     # Bulk Insert Media
     if media_data:
         cursor.executemany(
             "INSERT INTO media (message_id, media_uri, creation_timestamp) VALUES (%s, %s, %s);",
-            [(message_ids.get(timestamp, None), uri, creation_timestamp) for timestamp, uri, creation_timestamp in media_data if timestamp in message_ids]
+            [(message_ids[key], uri, creation_timestamp) for key, uri, creation_timestamp in media_data if key in message_ids]
         )
 
     logging.info(f"✅ Processed file: {file_name}")
+    # Reactions and media only go to messages inserted here, so these are all that changed
+    return min((timestamp_ms for _, timestamp_ms in message_ids), default=None)
+
+def process_file_copy(file_name, cursor):
+    """ Process a single JSON file by streaming it into staging tables with COPY. Returns the earliest timestamp_ms changed, if any. """
+    try:
+        participants = read_participants(file_name)
+        if not participants:
+            logging.error(f"❌ Skipping {file_name} (missing participants).")
+            return
+
+        ensure_participants(cursor, [participant["name"] for participant in participants])
+        message_count = reaction_count = media_count = 0
+        earliest = []
+        # One streaming pass; batches already loaded stay (the natural key makes a re-run safe)
+        for batch in batched(iter_messages(file_name), LOAD_BATCH_SIZE):
+            counts, batch_earliest = load_messages(cursor, batch)
+            message_count, reaction_count, media_count = (
+                message_count + counts[0], reaction_count + counts[1], media_count + counts[2])
+            if batch_earliest is not None:
+                earliest.append(batch_earliest)
+
+    except json.JSONDecodeError as e:
+        logging.error(f"❌ Error decoding {file_name}: {e}")
+        return
+
+    if not message_count:
+        logging.error(f"❌ {file_name} has no messages.")
+
+    logging.info(f"✅ Processed file: {file_name} ({message_count} messages, {reaction_count} reactions, {media_count} media)")
+    return min(earliest, default=None)
 
 def main():
     """ Main function to process all JSON files and insert them into the database. """
     conn = connect_db()
-    cursor = conn.cursor()
 
     # Load all JSON files
     file_names = load_json_files(INPUT_FOLDER)
 
+    if LOADER_MODE == "copy":
+        # Each worker commits its own files; the main connection only ensured indexing
+        conn.close()
+        loaded = ingest_files(file_names, DB_CONFIG, workers=INGEST_WORKERS, full_reload=FULL_RELOAD)
+        logging.info(f"✅ Loaded {loaded}/{len(file_names)} files into PostgreSQL!")
+        return
+
+    cursor = conn.cursor()
+
     # Cache for participant IDs to prevent redundant lookups
     participant_ids = {}
 
-    # Process each JSON file
+    # Process each JSON file, keeping the earliest message inserted so older history gets rolled up too
+    inserted = []
     for file_name in file_names:
-        process_file(file_name, cursor, participant_ids)
-
-    # Commit changes and close connection
+        earliest_ms = process_file(file_name, cursor, participant_ids)
+        if earliest_ms is not None:
+            inserted.append(earliest_ms)
+    earliest_ms = min(inserted, default=None)
+
+    # Update rollups and invalidate cached dashboard queries, then commit changes and close connection
+    score_pending(cursor)
+    fill_pending_stats(cursor)
+    refresh_rollups(cursor, changed_from_ms=earliest_ms)
+    refresh_token_index(cursor, changed_from_ms=earliest_ms)
+    bump_data_version(cursor)
     conn.commit()
     cursor.close()
     conn.close()
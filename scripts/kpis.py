@@ -0,0 +1,34 @@
+import os
+import sys
+import logging
+import argparse
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.kpi_engine import compute_from_source, write_csvs
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SOURCE_DIR = os.path.join(ROOT_DIR, "data", "messages", "messages_dev", "cleaned_messages")
+STORE_DIR = os.path.join(ROOT_DIR, "data", "messages", "messages_dev", "columnar")
+OUTPUT_DIR = os.path.join(ROOT_DIR, "kpis")
+
+def main():
+    """ Refresh every kpis/*.csv from a single pass over the messages. """
+    parser = argparse.ArgumentParser(description="Compute all message KPIs in one pass.")
+    parser.add_argument("--source", default=SOURCE_DIR, help="directory holding message_N.json files")
+    parser.add_argument("--store", default=STORE_DIR, help="columnar store to read instead, if it exists")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="directory for the CSV files")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metrics = compute_from_source(args.source, args.store, workers=args.workers)
+    for path in write_csvs(metrics, args.out):
+        logging.info(f"📄 Wrote {path}")
+    logging.info(f"✅ Computed {len(metrics)} KPIs in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
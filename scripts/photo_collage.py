@@ -1,82 +1,48 @@
-from PIL import Image
 import os
-import math
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.thumbnails import build_collage, list_images
 
 # Define paths
 IMAGE_FOLDER = "../data/photos/"
 OUTPUT_FILE = "../data/photos/collage.png"
-
-# Ensure the output directory exists
-os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-
-# Get all .jpg and .png files
-image_files = [os.path.join(IMAGE_FOLDER, f) for f in os.listdir(IMAGE_FOLDER) if f.lower().endswith((".jpg", ".png"))]
+# Thumbnails keyed by photo content hash and size; re-runs only decode photos that are new
+THUMBNAIL_CACHE = "../data/photos/.thumbnails/"
 
 # Set target collage size (small webpage resolution)
 collage_width = 800  # Width in pixels
 collage_height = 600  # Height in pixels
 
-# Determine grid layout
-num_images = len(image_files)
-if num_images == 0:
-    print("❌ No images found in the folder.")
-    exit()
-
-grid_cols = math.ceil(math.sqrt(num_images))  # Approximate square layout
-grid_rows = math.ceil(num_images / grid_cols)
-
-# Resize images to fit within the collage dimensions
-thumb_width = collage_width // grid_cols
-thumb_height = collage_height // grid_rows
-
-# Create a blank canvas
-collage = Image.new("RGB", (collage_width, collage_height), (255, 255, 255))
-
-print(f"📂 Found {num_images} images. Creating a {grid_cols}x{grid_rows} grid.")
-print(f"📏 Thumbnail size: {thumb_width}x{thumb_height}px")
-print(f"🎨 Collage canvas size: {collage_width}x{collage_height}px")
-
-# Load and paste images
-processed_count = 0
-skipped_count = 0
-
-for index, img_path in enumerate(image_files):
-    try:
-        print(f"📷 Processing image {index+1}/{num_images}: {os.path.basename(img_path)}")
-
-        img = Image.open(img_path)
-
-        # Handle transparent images
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGBA")
-            background = Image.new("RGBA", img.size, (255, 255, 255, 255))  # White background
-            img = Image.alpha_composite(background, img).convert("RGB")
-            print(f"🛠️ Converted {os.path.basename(img_path)} from RGBA to RGB.")
-
-        else:
-            img = img.convert("RGB")
-
-        img = img.resize((thumb_width, thumb_height))  # Resize image to fit grid
-        print(f"📏 Resized {os.path.basename(img_path)} to {thumb_width}x{thumb_height}px.")
-
-        # Calculate placement
-        x = (index % grid_cols) * thumb_width
-        y = (index // grid_cols) * thumb_height
-        print(f"📍 Placing {os.path.basename(img_path)} at ({x}, {y}).")
-
-        collage.paste(img, (x, y))
-        processed_count += 1
-
-    except Exception as e:
-        print(f"⚠️ Skipping {os.path.basename(img_path)} due to error: {e}")
-        skipped_count += 1
-
-# Save the final collage
-collage.save(OUTPUT_FILE)
-collage.show()
-
-# Final summary
-print(f"\n✅ Collage created successfully!")
-print(f"🖼️ Saved as: {OUTPUT_FILE}")
-print(f"📊 Processed images: {processed_count}/{num_images}")
-print(f"⚠️ Skipped images: {skipped_count}/{num_images}")
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Build (or update) the chat photo collage.")
+    parser.add_argument("--width", type=int, default=collage_width, help="collage width in pixels")
+    parser.add_argument("--height", type=int, default=collage_height, help="collage height in pixels (0 = grow to fit)")
+    parser.add_argument("--min-cell", type=int, default=None,
+                        help="smallest cell width; with more photos than fit, the canvas grows taller instead")
+    parser.add_argument("--workers", type=int, default=None, help="thumbnail decoding processes (default: one per core)")
+    args = parser.parse_args()
+
+    # Get all .jpg and .png files, except the collage itself (it is saved in the same folder)
+    image_files = list_images(IMAGE_FOLDER, exclude=[OUTPUT_FILE])
+    if not image_files:
+        print("❌ No images found in the folder.")
+        return
+
+    print(f"📂 Found {len(image_files)} images.")
+    stats = build_collage(image_files, OUTPUT_FILE, THUMBNAIL_CACHE, width=args.width, height=args.height or None,
+                          min_cell=args.min_cell, workers=args.workers)
+
+    cols, rows, cell_width, cell_height, canvas_height = stats["layout"]
+    print(f"📏 {cols}x{rows} grid of {cell_width}x{cell_height}px cells on a {args.width}x{canvas_height}px canvas.")
+
+    # Final summary
+    print(f"\n✅ Collage created successfully!")
+    print(f"🖼️ Saved as: {OUTPUT_FILE}")
+    print(f"📊 Images in collage: {stats['images']}/{len(image_files)}")
+    print(f"🆕 New thumbnails decoded: {stats['thumbnails_made']} (cells drawn: {stats['cells_pasted']})")
+    print(f"⚠️ Skipped images: {stats['skipped']}/{len(image_files)}")
+
+if __name__ == "__main__":
+    main()
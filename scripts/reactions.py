@@ -1,34 +1,18 @@
-import json
-from collections import defaultdict
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.kpi_engine import ReactionsReceived, compute_from_source
 
 folder_path = '../data/messages/messages_dev/cleaned_messages/'
-# Count files
-file_count = len([file for file in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, file))])
-# List of filenames to read
-file_names = [f'{folder_path}message_{i}.json' for i in range(1, file_count + 1)]
-# Dictionary to store reaction counts per sender
-reaction_counts = defaultdict(int)
+store_path = '../data/messages/messages_dev/columnar/'
 
-# Load each file and count reactions
-for file_name in file_names:
-    try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            # Iterate through each message
-            for message in data.get("messages", []):
-                # Check if the message has reactions
-                if "reactions" in message:
-                    # Count the number of reactions and associate them with the sender
-                    reaction_counts[message.get("sender_name", "Unknown")] += len(message["reactions"])
-    except FileNotFoundError:
-        print(f"File not found: {file_name}")
-    except json.JSONDecodeError:
-        print(f"Error reading JSON in file: {file_name}")
+if __name__ == "__main__":
+    reaction_counts = compute_from_source(folder_path, store_path, [ReactionsReceived])[0].received
 
-# Find the sender with the most reactions
-if reaction_counts:
-    top_sender = max(reaction_counts, key=reaction_counts.get)
-    print(f"The sender with the most child reactions is: {top_sender} with {reaction_counts[top_sender]} reactions.")
-else:
-    print("No reactions found in the files.")
\ No newline at end of file
+    # Find the sender with the most reactions
+    if reaction_counts:
+        top_sender = max(reaction_counts, key=reaction_counts.get)
+        print(f"The sender with the most child reactions is: {top_sender} with {reaction_counts[top_sender]} reactions.")
+    else:
+        print("No reactions found in the files.")
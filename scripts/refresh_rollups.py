@@ -0,0 +1,48 @@
+import os
+import sys
+import logging
+import argparse
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.message_stats import fill_pending_stats
+from utils.rollups import refresh_rollups
+from utils.schema import bump_data_version
+from utils.token_index import refresh_token_index
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection settings
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT")
+}
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def main():
+    """ Bring the dashboard rollup and word-frequency tables up to date. """
+    parser = argparse.ArgumentParser(description="Refresh the per sender/day/hour message rollups.")
+    parser.add_argument("--full", action="store_true", help="rebuild every day instead of only the latest ones")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            fill_pending_stats(cursor)
+            refresh_rollups(cursor, full=args.full)
+            refresh_token_index(cursor, full=args.full)
+            bump_data_version(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    logging.info("✅ Rollups refreshed.")
+
+if __name__ == "__main__":
+    main()
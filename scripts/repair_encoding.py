@@ -0,0 +1,59 @@
+import os
+import sys
+import logging
+import argparse
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.encoding import repair_stored_text
+from utils.message_stats import fill_pending_stats
+from utils.rollups import refresh_rollups
+from utils.schema import bump_data_version
+from utils.sentiment import score_pending
+from utils.token_index import refresh_token_index
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection settings
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT")
+}
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def main():
+    """ Rewrite mojibake stored before ingest-time repair as canonical UTF-8, then rebuild what depends on it. """
+    parser = argparse.ArgumentParser(description="Repair Latin-1 mojibake in message content, reactions and names.")
+    parser.add_argument("--dry-run", action="store_true", help="roll back instead of committing")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            # Loaders run this once on their own (utils/schema.py); force a fresh scan here
+            repaired = repair_stored_text(cursor, force=True)
+            if repaired:
+                # Repaired content hashes differently, so score it before rebuilding the rollups
+                score_pending(cursor)
+                # Repaired text also has different character and emoji counts
+                fill_pending_stats(cursor, full=True)
+                refresh_rollups(cursor, full=True)
+                refresh_token_index(cursor, full=True)
+                bump_data_version(cursor)
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    finally:
+        conn.close()
+    logging.info(f"✅ Repaired {repaired} values" + (" (dry run, rolled back)." if args.dry_run else "."))
+
+if __name__ == "__main__":
+    main()
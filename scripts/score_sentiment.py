@@ -0,0 +1,51 @@
+import os
+import sys
+import logging
+import argparse
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.rollups import refresh_rollups
+from utils.schema import bump_data_version
+from utils.sentiment import score_pending
+from utils.token_index import refresh_token_index
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection settings
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT")
+}
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def main():
+    """ Score every message text that has no stored sentiment yet, then fold the scores into the rollups. """
+    parser = argparse.ArgumentParser(description="Backfill message_sentiment for unscored messages.")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            scored = score_pending(cursor, workers=args.workers)
+            if scored:
+                # Scores can land on any day, so the rollups' sentiment sums and the
+                # token index's sentiment buckets need a full rebuild
+                refresh_rollups(cursor, full=True)
+                refresh_token_index(cursor, full=True)
+                bump_data_version(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    logging.info(f"✅ Scored {scored} message texts.")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,14 @@
-import json
 import os
+import sys
 
-folder_path = '../data/messages/messages_dev/cleaned_messages/'
-# Count files
-file_count = len([file for file in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, file))])
-# List of filenames to read
-file_names = [f'{folder_path}message_{i}.json' for i in range(1, file_count + 1)]
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.kpi_engine import UnsentCount, compute_from_source
 
-# Initialize counter
-unsent_image_count = 0
+folder_path = '../data/messages/messages_dev/cleaned_messages/'
+store_path = '../data/messages/messages_dev/columnar/'
 
-# Load each file and count occurrences
-for file_name in file_names:
-    try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            # Count messages with the specific condition
-            unsent_image_count += sum(
-                1 for message in data.get("messages", [])
-                if message.get("is_unsent_image_by_messenger_kid_parent", False) == True
-            )
-    except FileNotFoundError:
-        print(f"File not found: {file_name}")
-    except json.JSONDecodeError:
-        print(f"Error reading JSON in file: {file_name}")
+if __name__ == "__main__":
+    unsent_counts = compute_from_source(folder_path, store_path, [UnsentCount])[0].unsent
+    unsent_image_count = sum(unsent_counts.values())
 
-print(f"Total messages with 'is_unsent_image_by_messenger_kid_parent' = true: {unsent_image_count}")
\ No newline at end of file
+    print(f"Total messages with 'is_unsent_image_by_messenger_kid_parent' = true: {unsent_image_count}")
@@ -2,8 +2,14 @@ import json
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import os
-import re
 import csv
+import sys
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.stream_reader import iter_messages
+from utils.text_cleaning import get_cleaner
+from utils.token_index import tokenize, word_frequencies
 
 folder_path = '../data/messages/messages_dev/cleaned_messages/'
 # Count files
@@ -14,33 +20,25 @@ file_names = [f'{folder_path}message_{i}.json' for i in range(1, file_count + 1)
 # Collect raw and cleaned content from all files
 raw_content_list = []
 cleaned_content_list = []
+cleaner = get_cleaner("wordcloud")
 
 # Load each file and extract content
 for file_name in file_names:
     try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            print(f"Processing file: {file_name}")
-            data = json.load(file)
-
-            # Extract raw content from each message
-            for message in data.get("messages", []):
-                if message.get("content"):
-                    raw_content = message["content"]
-
-                    # ✅ Discard messages that contain "to your message"
-                    if re.search(r'\bto your message\b', raw_content, flags=re.IGNORECASE):
-                        continue
+        print(f"Processing file: {file_name}")
 
-                    raw_content_list.append(raw_content)
+        # Extract raw content from each message as it is parsed
+        for message in iter_messages(file_name):
+            if message.get("content"):
+                raw_content = message["content"]
 
-                    # Clean the content
-                    cleaned_content = re.sub(r'https?://\S+', '', raw_content)  # Remove URLs
-                    cleaned_content = re.sub(r'[^a-zA-Z\s]', '', cleaned_content)  # Remove punctuation
-                    cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)
-                    cleaned_content = re.sub(r'\bcatalina wine mixer\b', '', cleaned_content, flags=re.IGNORECASE)
-                    cleaned_content = re.sub(r'\breacted\b', '', cleaned_content, flags=re.IGNORECASE)
+                # ✅ Clean the content; messages that contain "to your message" come back as None
+                cleaned_content = cleaner.clean(raw_content)
+                if cleaned_content is None:
+                    continue
 
-                    cleaned_content_list.append(cleaned_content)
+                raw_content_list.append(raw_content)
+                cleaned_content_list.append(cleaned_content)
 
     except FileNotFoundError:
         print(f"File not found: {file_name}")
@@ -67,10 +65,11 @@ if cleaned_content_list:
 
 # ✅ Generate word cloud if there is any cleaned content
 if cleaned_content_list:
-    content_text = " ".join(cleaned_content_list).strip()
+    # Count tokens message by message instead of joining everything into one string
+    word_counts = word_frequencies(Counter(token for content in cleaned_content_list for token in tokenize(content)))
 
-    if content_text:
-        wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='viridis').generate(content_text)
+    if word_counts:
+        wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='viridis').generate_from_frequencies(word_counts)
 
         # Display the word cloud
         plt.figure(figsize=(100, 50))
@@ -1,5 +1,12 @@
 import json
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.columnar_store import message_records, store_exists
+from utils.stream_reader import iter_messages
+
+store_path = '../data/messages/messages_dev/columnar/'
 
 folder_path = '../data/messages/messages_dev/cleaned_messages/'
 # Count files
@@ -7,26 +14,25 @@ file_count = len([file for file in os.listdir(folder_path) if os.path.isfile(os.
 # List of filenames to read
 file_names = [f'{folder_path}message_{i}.json' for i in range(1, file_count + 1)]
 
-# Initialize a list to store all messages
-all_messages = []
+# Running total of words across all messages
+total_word_count = 0
 
 # Function to count words in a string
 def count_words(text):
     return len(text.split()) if text else 0
 
-# Load each file and extract messages
-for file_name in file_names:
-    try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            all_messages.extend(data.get("messages", []))
-    except FileNotFoundError:
-        print(f"File not found: {file_name}")
-    except json.JSONDecodeError:
-        print(f"Error reading JSON in file: {file_name}")
-
-# Count total words in the "content" field of each message
-total_word_count = sum(count_words(message.get("content", "")) for message in all_messages)
+# Count total words in the "content" field of each message, from the columnar store if it
+# has been built, otherwise streaming each file one message at a time
+if store_exists(store_path):
+    total_word_count = sum(count_words(message.get("content", "")) for message in message_records(store_path))
+else:
+    for file_name in file_names:
+        try:
+            total_word_count += sum(count_words(message.get("content", "")) for message in iter_messages(file_name))
+        except FileNotFoundError:
+            print(f"File not found: {file_name}")
+        except json.JSONDecodeError:
+            print(f"Error reading JSON in file: {file_name}")
 
 print(total_word_count)
 
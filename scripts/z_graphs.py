@@ -1,23 +1,22 @@
-import json
 import pandas as pd
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 from datetime import datetime
 from datetime import timezone
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.stream_reader import iter_messages
+from utils.token_index import TokenIndex
 
 output_folder = '../graphs/dev/'
 
 # Create the directory for saving graphs if it doesn't exist
 os.makedirs(f'{output_folder}', exist_ok=True)
 
-# Load JSON data from the file (example: message_1.json)
-with open('../data/messages/messages_dev/cleaned_messages/message_1.json', 'r') as file:
-    data = json.load(file)
-
-# Extract message data and participant data
-messages = data["messages"]
-participants = [p["name"] for p in data["participants"]]
+# Stream message data from the file (example: message_1.json)
+messages = iter_messages('../data/messages/messages_dev/cleaned_messages/message_1.json')
 
 # Process message data
 messages_data = []
@@ -29,7 +28,8 @@ for message in messages:
     messages_data.append({
         "sender_name": sender_name,
         "content": content,
-        "timestamp": timestamp
+        "timestamp": timestamp,
+        "timestamp_ms": timestamp_ms
     })
 
 # Create a DataFrame from messages data
@@ -53,8 +53,8 @@ plt.savefig(f'{output_folder}messages_over_time{timestamp_str}.png')
 plt.close()
 
 # Example 2: Word Cloud (Most frequent words in messages)
-all_content = ' '.join(df['content'])
-wordcloud = WordCloud(width=800, height=400, background_color='white').generate(all_content)
+word_counts = TokenIndex.from_frame(df).frequencies()
+wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(word_counts)
 
 # Save the Word Cloud image
 wordcloud.to_file(f'{output_folder}wordcloud{timestamp_str}.png')
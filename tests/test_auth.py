@@ -0,0 +1,85 @@
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+import bcrypt
+from utils.auth import USER_LOOKUP_SQL, AuthService, NegativeCache
+
+
+class TestAuth(unittest.TestCase):
+
+    def setUp(self):
+        """An auth service over a mocked connection holding one user."""
+        self.users = {"matty": (bcrypt.hashpw(b"hunter2", bcrypt.gensalt(rounds=4)).decode(), "Matty Merritt")}
+        self.cursor = MagicMock()
+        self.cursor.__enter__.return_value = self.cursor
+        self.cursor.execute.side_effect = self._execute
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+
+        @contextmanager
+        def connect():
+            yield self.conn
+
+        self.auth = AuthService(connect, workers=2, rounds=4)
+
+    def tearDown(self):
+        self.auth.close()
+
+    def _execute(self, query, params):
+        if query == USER_LOOKUP_SQL:
+            self.cursor.fetchone.return_value = self.users.get(params[0])
+        else:
+            username, password, name = params
+            self.users[username] = (password, name)
+
+    # ------------------------------------------------------
+    # Test: authenticate
+    # ------------------------------------------------------
+    def test_authenticate(self):
+        """Test that only the right password for an existing user signs in."""
+        self.assertEqual(self.auth.authenticate("matty", "hunter2"), (True, "Matty Merritt"))
+        self.assertEqual(self.auth.authenticate("matty", "wrong"), (False, None))
+        self.assertEqual(self.auth.authenticate("nobody", "hunter2"), (False, None))
+
+    def test_lookup_fetches_one_row(self):
+        """Test that a login asks for one username instead of loading the users table."""
+        self.auth.authenticate("matty", "hunter2")
+        self.cursor.execute.assert_called_once_with(USER_LOOKUP_SQL, ("matty",))
+        self.cursor.fetchall.assert_not_called()
+
+    def test_unknown_users_are_cached(self):
+        """Test that repeated attempts for a missing username skip the database."""
+        self.auth.authenticate("nobody", "x")
+        self.auth.authenticate("nobody", "y")
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+    def test_register_clears_negative_entry(self):
+        """Test that a user can sign in straight after registering a name that was just tried."""
+        self.auth.authenticate("adrienne", "pw")
+        self.auth.register("adrienne", "pw", "Adrienne Stout")
+        self.assertEqual(self.auth.authenticate("adrienne", "pw"), (True, "Adrienne Stout"))
+
+    def test_invalid_stored_hash(self):
+        """Test that a row without a bcrypt hash fails closed."""
+        self.users["legacy"] = ("plaintext", "Legacy User")
+        self.assertEqual(self.auth.authenticate("legacy", "plaintext"), (False, None))
+
+    # ------------------------------------------------------
+    # Test: NegativeCache
+    # ------------------------------------------------------
+    def test_negative_cache_expires_and_is_bounded(self):
+        """Test that entries expire after the TTL and the oldest are dropped past the limit."""
+        now = [0.0]
+        cache = NegativeCache(ttl_s=30, max_entries=2, clock=lambda: now[0])
+        cache.add("a")
+        cache.add("b")
+        cache.add("c")
+        self.assertNotIn("a", cache)
+        self.assertIn("c", cache)
+
+        now[0] = 31
+        self.assertNotIn("c", cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from utils.columnar_store import list_partitions, message_records, messages_frame, read_table, store_exists, write_store
+from utils.queries import date_bounds_ms
+
+
+class TestColumnarStore(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small export spanning two years to a scratch store."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, "columnar")
+        self.messages = [
+            {
+                "sender_name": "Matty Merritt",
+                "timestamp_ms": 1740093564158,  # 2025-02-20
+                "photos": [{"uri": "photos/1.jpg", "creation_timestamp": 1740093564}]
+            },
+            {
+                "sender_name": "Jonah Eggleston",
+                "timestamp_ms": 1703980800000,  # 2023-12-31
+                "content": "I thought it was going to be longer tbh",
+                "reactions": [{"reaction": "â\u009d¤", "actor": "Matty Merritt"},
+                              {"reaction": "ð\u009f\u0098\u0086", "actor": "Jonah Eggleston"}]
+            },
+            {
+                "sender_name": "Jonah Eggleston",
+                "timestamp_ms": 1740100000000,  # 2025-02-21
+                "content": "no reactions here"
+            }
+        ]
+        write_store(self.messages, self.store_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    # ------------------------------------------------------
+    # Test: write_store
+    # ------------------------------------------------------
+    def test_partitions_by_year(self):
+        """Test that each UTC year gets its own partition."""
+        self.assertTrue(store_exists(self.store_dir))
+        self.assertEqual([year for year, _ in list_partitions(self.store_dir)], [2023, 2025])
+
+    def test_ids_follow_timestamp_order(self):
+        """Test that message ids are assigned in timestamp order across partitions."""
+        table = read_table(self.store_dir, "messages", ["message_id", "timestamp_ms"])
+        self.assertEqual(table.column("message_id").to_pylist(), [0, 1, 2])
+        self.assertEqual(table.column("timestamp_ms").to_pylist(), sorted(m["timestamp_ms"] for m in self.messages))
+
+    # ------------------------------------------------------
+    # Test: reading back
+    # ------------------------------------------------------
+    def test_round_trip_matches_export(self):
+        """Test that message_records gives back the export dicts."""
+        by_timestamp = sorted(self.messages, key=lambda message: message["timestamp_ms"])
+        for record, message in zip(message_records(self.store_dir), by_timestamp):
+            expected = dict(message, is_geoblocked_for_viewer=False, is_unsent_image_by_messenger_kid_parent=False)
+            self.assertEqual(record, expected)
+
+    def test_window_prunes_and_filters(self):
+        """Test that a date window reads only matching messages and their children."""
+        start_ms, end_ms = date_bounds_ms(date(2023, 12, 1), date(2023, 12, 31))
+        df = messages_frame(self.store_dir, start_ms=start_ms, end_ms=end_ms, nested=True)
+
+        self.assertEqual(df["sender_name"].tolist(), ["Jonah Eggleston"])
+        self.assertEqual(len(df["reactions"].iloc[0]), 2)
+        self.assertEqual(read_table(self.store_dir, "media", start_ms=start_ms, end_ms=end_ms).num_rows, 0)
+
+    def test_missing_store(self):
+        """Test that a store that was never built reads as empty."""
+        missing = os.path.join(self.tmp_dir, "nope")
+        self.assertFalse(store_exists(missing))
+        self.assertEqual(read_table(missing, "messages").num_rows, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+from utils.copy_loader import build_rows, copy_value, load_messages, rows_to_copy_buffer
+
+
+class TestCopyLoader(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small export with reactions and photos."""
+        self.messages = [
+            {
+                "sender_name": "Jonah Eggleston",
+                "timestamp_ms": 1740093564158,
+                "content": "I thought it was going to be longer tbh",
+                "reactions": [{"reaction": "â\u009d¤", "actor": "Matty Merritt"}]
+            },
+            {
+                "sender_name": "Matty Merritt",
+                "timestamp_ms": 1740093564158,
+                "photos": [{"uri": "photos/1.jpg", "creation_timestamp": 1740093564}]
+            }
+        ]
+
+    # ------------------------------------------------------
+    # Test: copy_value
+    # ------------------------------------------------------
+    def test_copy_value(self):
+        """Test escaping for the COPY text format."""
+        self.assertEqual(copy_value(None), "\\N")
+        self.assertEqual(copy_value(True), "t")
+        self.assertEqual(copy_value(False), "f")
+        self.assertEqual(copy_value(42), "42")
+        self.assertEqual(copy_value("a\tb\nc\\d\r"), "a\\tb\\nc\\\\d\\r")
+
+    def test_rows_to_copy_buffer(self):
+        """Test that rows are tab separated and newline terminated."""
+        buffer = rows_to_copy_buffer([(1, "hi", None), (2, "line\nbreak", True)])
+        self.assertEqual(buffer.read(), "1\thi\t\\N\n2\tline\\nbreak\tt\n")
+
+    # ------------------------------------------------------
+    # Test: build_rows
+    # ------------------------------------------------------
+    def test_build_rows_keys_children_by_position(self):
+        """Test that reactions and media point at their message's position, not its timestamp."""
+        message_rows, reaction_rows, media_rows = build_rows(self.messages)
+
+        self.assertEqual(len(message_rows), 2)
+        self.assertEqual(message_rows[1][3], None)  # Photo-only message has no content
+        self.assertEqual(message_rows[0][-3:], (9, 39, 0))  # word_count, char_length, emoji_count
+        self.assertEqual(message_rows[1][-3:], (None, None, None))
+        self.assertEqual(reaction_rows, [(0, "â\u009d¤", "Matty Merritt")])
+        self.assertEqual(media_rows, [(1, "photos/1.jpg", 1740093564)])
+
+    # ------------------------------------------------------
+    # Test: load_messages
+    # ------------------------------------------------------
+    def test_load_messages_issues_one_copy_per_table(self):
+        """Test that each staging table is filled with a single COPY."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (1740093564158,)
+        counts, earliest_ms = load_messages(cursor, self.messages)
+
+        self.assertEqual(counts, (2, 1, 1))
+        self.assertEqual(earliest_ms, 1740093564158)
+        copied_tables = [call.args[0].split()[1] for call in cursor.copy_expert.call_args_list]
+        self.assertEqual(copied_tables, ["stage_messages", "stage_reactions", "stage_media"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+import psycopg2
+from utils.copy_loader import ensure_participants, load_messages
+from utils.encoding import needs_repair, repair_column, repair_header, repair_message, repair_stored_text, repair_text
+from utils.schema import TABLES_DDL, ensure_schema
+
+# Set TEST_DATABASE_URL (see tests/test_query_plans.py) to run the load-before-repair check
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class TestEncoding(unittest.TestCase):
+
+    # ------------------------------------------------------
+    # Test: repair_text
+    # ------------------------------------------------------
+    def test_repairs_mojibake(self):
+        """Test that UTF-8 read as Latin-1 is turned back into the real characters."""
+        self.assertEqual(repair_text("â\u009d¤"), "❤")
+        self.assertEqual(repair_text("ð\u009f\u0098¡"), "😡")
+        self.assertEqual(repair_text("itâ\u0080\u0099s gonna take a day"), "it’s gonna take a day")
+
+    def test_leaves_canonical_text_alone(self):
+        """Test the fast path: ASCII, real Unicode and non-strings come back unchanged."""
+        for text in ("plain ascii", "❤ 😡", "café", "", None, 5):
+            self.assertFalse(needs_repair(text))
+            self.assertEqual(repair_text(text), text)
+        # Looks like mojibake but is not valid UTF-8 underneath
+        self.assertEqual(repair_text("Ã("), "Ã(")
+
+    def test_repair_is_idempotent(self):
+        """Test that repairing already repaired text changes nothing."""
+        once = repair_text("ð\u009f\u0098\u0086 Donâ\u0080\u0099t")
+        self.assertEqual(repair_text(once), once)
+
+    # ------------------------------------------------------
+    # Test: messages and headers
+    # ------------------------------------------------------
+    def test_repair_message_and_header(self):
+        """Test that names, content and reactions are repaired in place."""
+        message = repair_message({"sender_name": "JosÃ©", "content": "â\u009d¤", "timestamp_ms": 1,
+                                  "reactions": [{"reaction": "ð\u009f\u0092¯", "actor": "JosÃ©"}]})
+        self.assertEqual(message, {"sender_name": "José", "content": "❤", "timestamp_ms": 1,
+                                   "reactions": [{"reaction": "💯", "actor": "José"}]})
+
+        header = repair_header({"participants": [{"name": "JosÃ©"}], "title": "polycule â\u009d¤"})
+        self.assertEqual(header, {"participants": [{"name": "José"}], "title": "polycule ❤"})
+
+    # ------------------------------------------------------
+    # Test: repair_column
+    # ------------------------------------------------------
+    @patch("utils.encoding.execute_values")
+    def test_repair_column_skips_taken_names(self, mock_execute_values):
+        """Test that a participant whose repaired name already exists is not renamed."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[(1, "JosÃ©"), (2, "Ã\u0089lise")], [("José",)]]
+        self.assertEqual(repair_column(cursor, "participants", "name"), 1)
+        self.assertEqual(mock_execute_values.call_args[0][2], [(2, "Élise")])
+
+
+    # ------------------------------------------------------
+    # Test: repair_stored_text
+    # ------------------------------------------------------
+    @patch("utils.encoding.repair_column", return_value=2)
+    def test_stored_text_is_repaired_once(self, mock_repair_column):
+        """Test that loaders scan for mojibake only until the repair has been recorded."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = None
+        self.assertEqual(repair_stored_text(cursor), 6)  # Two rows in each of the three columns
+        self.assertIn("INSERT INTO encoding_repair", cursor.execute.call_args[0][0])
+
+        cursor.fetchone.return_value = (1,)
+        mock_repair_column.reset_mock()
+        self.assertEqual(repair_stored_text(cursor), 0)
+        mock_repair_column.assert_not_called()
+        self.assertEqual(repair_stored_text(cursor, force=True), 6)
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class TestLoadBeforeRepair(unittest.TestCase):
+
+    def setUp(self):
+        """A database loaded before ingest-time repair: a mojibake name, its message and reaction."""
+        self.conn = psycopg2.connect(TEST_DATABASE_URL)
+        with self.conn.cursor() as cur:
+            cur.execute("DROP SCHEMA IF EXISTS repair_test CASCADE; CREATE SCHEMA repair_test; SET search_path TO repair_test;")
+            cur.execute(TABLES_DDL)
+            cur.execute("INSERT INTO participants (name) VALUES ('JosÃ©') RETURNING id;")
+            sender_id = cur.fetchone()[0]
+            cur.execute("INSERT INTO messages (sender_id, timestamp_ms, content) VALUES (%s, 1740093564158, 'hi') RETURNING id;",
+                        (sender_id,))
+            cur.execute("INSERT INTO reactions (message_id, reaction, actor_id) VALUES (%s, %s, %s);",
+                        (cur.fetchone()[0], "â\u009d¤", sender_id))
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.rollback()
+        with self.conn.cursor() as cur:
+            cur.execute("DROP SCHEMA IF EXISTS repair_test CASCADE;")
+        self.conn.commit()
+        self.conn.close()
+
+    def test_reloading_repaired_export_adds_nothing(self):
+        """Test that the same export, now read as canonical UTF-8, matches the stored rows."""
+        message = {"sender_name": "José", "timestamp_ms": 1740093564158, "content": "hi",
+                   "reactions": [{"reaction": "❤", "actor": "José"}]}
+        with self.conn.cursor() as cur:
+            ensure_schema(cur)
+            ensure_participants(cur, ["José"])
+            (message_count, _, _), earliest_ms = load_messages(cur, [message])
+
+            cur.execute("SELECT name FROM participants;")
+            self.assertEqual(cur.fetchall(), [("José",)])
+            cur.execute("SELECT count(*) FROM messages;")
+            self.assertEqual(cur.fetchone()[0], 1)
+            cur.execute("SELECT reaction FROM reactions;")
+            self.assertEqual(cur.fetchall(), [("❤",)])
+            self.assertIsNone(earliest_ms)  # Nothing new was inserted
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from utils.graph_render import build_graph, layout_positions, render_html
+
+
+class TestGraphRender(unittest.TestCase):
+
+    def setUp(self):
+        """A small reactor → sender graph with one isolated sender."""
+        self.nodes = ("Jonah Eggleston", "Matty Merritt", "Adrienne Stout", "Kristi Durkin")
+        self.edges = (("Matty Merritt", "Jonah Eggleston", 12), ("Adrienne Stout", "Jonah Eggleston", 3))
+
+    # ------------------------------------------------------
+    # Test: layout_positions
+    # ------------------------------------------------------
+    def test_layout_is_deterministic(self):
+        """Test that the same graph always gets the same positions, so cached HTML is stable."""
+        G = build_graph(self.nodes, self.edges, directed=True)
+        self.assertEqual(layout_positions(G), layout_positions(G))
+        self.assertEqual(set(layout_positions(G)), set(self.nodes))
+
+    # ------------------------------------------------------
+    # Test: render_html
+    # ------------------------------------------------------
+    def test_render_html_is_static(self):
+        """Test that positions are baked in, physics is off and nothing is written to disk."""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                html = render_html(self.nodes, self.edges, directed=True)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+        self.assertIn('"x": ', html)
+        self.assertIn('"enabled": false', html)
+        self.assertIn("Kristi Durkin", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from utils.ingest_manifest import file_sha256, plan_files, record_file
+
+
+class TestIngestManifest(unittest.TestCase):
+
+    def setUp(self):
+        """Create two export files with identical content and one that differs."""
+        self.folder = tempfile.TemporaryDirectory()
+        self.files = []
+        for name, body in [("message_1.json", '{"messages": [1]}'),
+                           ("message_2.json", '{"messages": [1]}'),
+                           ("message_3.json", '{"messages": [2]}')]:
+            path = os.path.join(self.folder.name, name)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(body)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    # ------------------------------------------------------
+    # Test: plan_files
+    # ------------------------------------------------------
+    def test_plan_files_skips_loaded_and_duplicate_content(self):
+        """Test that files already in the manifest, or repeated in one run, are not planned."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(file_sha256(self.files[2]),)]
+
+        pending = plan_files(cursor, self.files)
+
+        self.assertEqual([file_name for file_name, _ in pending], [self.files[0]])
+
+    # ------------------------------------------------------
+    # Test: record_file
+    # ------------------------------------------------------
+    def test_record_file_stores_high_water_mark(self):
+        """Test that the newest timestamp in the file is recorded."""
+        cursor = MagicMock()
+        record_file(cursor, "message_1.json", "abc", [{"timestamp_ms": 5}, {"timestamp_ms": 9}])
+
+        params = cursor.execute.call_args[0][1]
+        self.assertEqual(params, ("abc", "message_1.json", 9, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from utils.json_to_json import iter_ndjson, process_chat_files_to_cleaned_json, process_chat_files_to_ndjson
+
+
+class TestNdjsonExport(unittest.TestCase):
+
+    def setUp(self):
+        """Two export files sharing a header, plus one with a new participant."""
+        self.tmp = tempfile.TemporaryDirectory()
+        header = {"participants": [{"name": "Mitchell Potts"}, {"name": "Bruce Kesselring"}], "title": "puppygirl hacker polycule"}
+        exports = [
+            dict(header, messages=[
+                {"sender_name": "Mitchell Potts", "content": "Oh thanks for handling that, Caroline!"},
+                {"sender_name": "Bruce Kesselring", "content": "Bruce reacted 😆 to your message"},
+            ]),
+            dict(header, messages=[{"sender_name": "Bruce Kesselring", "photos": [{"uri": "a.jpg"}]}]),
+            dict(header, participants=header["participants"] + [{"name": "Miles Neilson"}],
+                 messages=[{"sender_name": "Miles Neilson", "content": "https://example.com hi"}]),
+        ]
+        self.files = []
+        for i, export in enumerate(exports, start=1):
+            path = os.path.join(self.tmp.name, f"message_{i}.json")
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(export, file)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    # ------------------------------------------------------
+    # Test: process_chat_files_to_ndjson
+    # ------------------------------------------------------
+    def test_streams_headers_and_cleaned_messages(self):
+        """Test one header per distinct file header, and messages cleaned in order."""
+        output = process_chat_files_to_ndjson(self.files + ["missing.json"], os.path.join(self.tmp.name, "out"))
+        records = list(iter_ndjson(output))
+
+        self.assertEqual([kind for kind, _ in records], ["header", "message", "message", "header", "message"])
+        self.assertEqual(records[0][1]["title"], "puppygirl hacker polycule")
+        self.assertEqual(records[1][1]["content"], "Oh thanks for handling that Caroline")
+        self.assertEqual(len(records[3][1]["participants"]), 3)
+        self.assertEqual(records[4][1]["content"], "hi")
+
+        with open(output, encoding='utf-8') as file:
+            self.assertEqual(json.loads(file.readline())["_type"], "header")  # Headers are tagged on disk
+        self.assertNotIn("_type", records[0][1])
+
+    def test_message_with_participants_key_is_a_message(self):
+        """Test that only the explicit tag marks a header, not the keys a record happens to have."""
+        path = os.path.join(self.tmp.name, "mixed.ndjson")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({"_type": "header", "participants": []}) + "\n")
+            file.write(json.dumps({"sender_name": "Miles Neilson", "participants": "all of us"}) + "\n")
+        self.assertEqual([kind for kind, _ in iter_ndjson(path)], ["header", "message"])
+
+    def test_matches_consolidated_json(self):
+        """Test that the streamed messages are the ones the consolidated JSON keeps."""
+        out = os.path.join(self.tmp.name, "out")
+        streamed = [record for kind, record in iter_ndjson(process_chat_files_to_ndjson(self.files, out)) if kind == "message"]
+        process_chat_files_to_cleaned_json(self.files, out)
+        with open(os.path.join(out, "cleaned_json_to_json.json"), encoding='utf-8') as file:
+            self.assertEqual(streamed, json.load(file)["messages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.kpi_engine import (BruceQuotient, BruceQuotientAnthonyVariant, Metric, ReactionEmojiCounts, ReactionsGiven,
+                              UnsentCount, WordCount, accumulate, compute_kpis, write_csvs)
+
+
+class TestKpiEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Split a small export over two files."""
+        self.messages = [
+            {"sender_name": "Jonah Eggleston", "content": "I thought it was going to be longer tbh",
+             "reactions": [{"reaction": "ð\u009f\u0098¡", "actor": "Matty Merritt"},
+                           {"reaction": "😡", "actor": "Adrienne Stout"}]},
+            {"sender_name": "Jonah Eggleston", "content": "Just present it"},
+            {"sender_name": "Matty Merritt", "is_unsent_image_by_messenger_kid_parent": True,
+             "reactions": [{"reaction": "ð\u009f\u0092¯", "actor": "Jonah Eggleston"}]},
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_names = []
+        for i, chunk in enumerate([self.messages[:2], self.messages[2:]], start=1):
+            file_name = os.path.join(self.tmp_dir, f"message_{i}.json")
+            with open(file_name, "w", encoding="utf-8") as file:
+                json.dump({"messages": chunk}, file)
+            self.file_names.append(file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    # ------------------------------------------------------
+    # Test: accumulators
+    # ------------------------------------------------------
+    def test_single_pass_metrics(self):
+        """Test each metric against the numbers the old scripts produced."""
+        words, given, quotient, variant, emojis, unsent = accumulate(
+            self.messages, (WordCount, ReactionsGiven, BruceQuotient, BruceQuotientAnthonyVariant,
+                            ReactionEmojiCounts, UnsentCount))
+
+        self.assertEqual(words.words["Jonah Eggleston"], 12)
+        self.assertEqual(given.given["Jonah Eggleston"], 1)
+        self.assertEqual(dict((row["Sender Name"], row["Normalized Reactions"]) for row in quotient.rows()),
+                         {"Jonah Eggleston": 1.0, "Matty Merritt": 1.0})
+        self.assertEqual(dict((row["Sender Name"], row["Normalized Reactions"]) for row in variant.rows()),
+                         {"Jonah Eggleston": 2.0, "Matty Merritt": 1.0})
+        self.assertEqual(emojis.emojis["😡"], 2)  # Mojibake and clean forms are combined
+        self.assertEqual(emojis.emojis["💯"], 1)
+        self.assertEqual(unsent.unsent["Matty Merritt"], 1)
+
+    def test_incomplete_metric_fails_on_creation(self):
+        """Test that a metric without rows() cannot be created, rather than failing mid-pass."""
+        class AddOnly(Metric):
+            def add(self, message):
+                pass
+
+        with self.assertRaises(TypeError):
+            AddOnly()
+
+    # ------------------------------------------------------
+    # Test: compute_kpis
+    # ------------------------------------------------------
+    def test_parallel_matches_serial(self):
+        """Test that merging per-file partials across workers gives the single-pass result."""
+        serial = [list(metric.rows()) for metric in accumulate(self.messages)]
+        parallel = [list(metric.rows()) for metric in compute_kpis(self.file_names, workers=2)]
+        self.assertEqual(parallel, serial)
+
+    def test_write_csvs(self):
+        """Test that every metric lands in its own CSV with the historical headers."""
+        paths = write_csvs(compute_kpis(self.file_names, workers=1), self.tmp_dir)
+        with open(os.path.join(self.tmp_dir, "user_word_count.csv"), encoding="utf-8") as csvfile:
+            rows = list(csv.reader(csvfile))
+
+        self.assertEqual(len(paths), 7)
+        self.assertEqual(rows[0], ["User Name", "Total Word Count"])
+        self.assertEqual(rows[1], ["Jonah Eggleston", "12"])
+
+
+if __name__ == "__main__":
+    unittest.main()
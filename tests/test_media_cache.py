@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.media_cache import MediaCache, parse_range
+
+
+class StandInBucket(BaseHTTPRequestHandler):
+    """Serves in-memory files with ETags and single byte ranges, like the S3 bucket."""
+    protocol_version = "HTTP/1.1"
+    files = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get("Range"), self.headers.get("If-Range")))
+        body, etag = self.files.get(self.path, (None, None))
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        byte_range = parse_range(self.headers.get("Range"), len(body))
+        if byte_range and self.headers.get("If-Range") not in (None, etag):
+            byte_range = None  # Changed since the client's partial copy: send it whole
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+            body = body[start:end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestMediaCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the stand-in bucket on a free local port."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInBucket)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """A fresh cache directory and bucket contents."""
+        self.tmp_dir = tempfile.mkdtemp()
+        StandInBucket.requests = []
+        StandInBucket.files = {
+            "/audio.mp4": (bytes(range(256)) * 40, '"audio-v1"'),
+            "/video.mp4": (b"\x00video" * 2000, '"video-v1"'),
+            "/copy-of-audio.mp4": (bytes(range(256)) * 40, '"audio-v1"'),
+        }
+        self.cache = MediaCache(self.tmp_dir, max_bytes=1024 ** 2, chunk_size=1000)
+
+    def tearDown(self):
+        self.cache.session.close()
+        shutil.rmtree(self.tmp_dir)
+
+    # ------------------------------------------------------
+    # Test: parse_range
+    # ------------------------------------------------------
+    def test_parse_range(self):
+        """Test the single-range forms and unsatisfiable ranges."""
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-2000", 1000), (990, 999))
+        self.assertIsNone(parse_range(None, 1000))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+
+    # ------------------------------------------------------
+    # Test: fetch
+    # ------------------------------------------------------
+    def test_fetch_is_lazy_and_cached(self):
+        """Test that nothing is downloaded until asked, and only once after that."""
+        url = f"{self.base_url}/audio.mp4"
+        self.assertIsNone(self.cache.cached_path(url))
+        self.assertEqual(StandInBucket.requests, [])
+
+        for _ in range(3):
+            with self.cache.open(url) as file:
+                self.assertEqual(file.read(), StandInBucket.files["/audio.mp4"][0])
+        self.assertEqual(len(StandInBucket.requests), 1)
+
+    def test_identical_content_is_stored_once(self):
+        """Test that two URLs with the same bytes share one cached object."""
+        first = self.cache.fetch(f"{self.base_url}/audio.mp4")
+        second = self.cache.fetch(f"{self.base_url}/copy-of-audio.mp4")
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(self.cache.objects_dir)), 1)
+
+    def test_interrupted_download_resumes_with_range(self):
+        """Test that a partial download asks only for the missing bytes."""
+        url = f"{self.base_url}/video.mp4"
+        body, etag = StandInBucket.files["/video.mp4"]
+        partial = self.cache._partial_path(url)
+        with open(partial, "wb") as file:
+            file.write(body[:5000])
+        with open(partial + ".etag", "w", encoding="utf-8") as file:
+            file.write(etag)
+
+        with self.cache.open(url) as file:
+            self.assertEqual(file.read(), body)
+        self.assertEqual(StandInBucket.requests, [("/video.mp4", "bytes=5000-", etag)])
+        self.assertEqual(os.listdir(self.cache.partial_dir), [])
+
+    def test_changed_object_restarts_download(self):
+        """Test that a partial copy of an older version is thrown away, not appended to."""
+        url = f"{self.base_url}/video.mp4"
+        partial = self.cache._partial_path(url)
+        with open(partial, "wb") as file:
+            file.write(b"stale bytes")
+        with open(partial + ".etag", "w", encoding="utf-8") as file:
+            file.write('"video-v0"')
+
+        with self.cache.open(url) as file:
+            self.assertEqual(file.read(), StandInBucket.files["/video.mp4"][0])
+
+    def test_read_range(self):
+        """Test that byte ranges are served from the cached copy."""
+        url = f"{self.base_url}/audio.mp4"
+        body = StandInBucket.files["/audio.mp4"][0]
+        self.assertEqual(b"".join(self.cache.read_range(url, 100, 2599)), body[100:2600])
+        self.assertEqual(b"".join(self.cache.read_range(url, 10000)), body[10000:])
+
+    # ------------------------------------------------------
+    # Test: evict
+    # ------------------------------------------------------
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache stays under max_bytes by dropping the oldest file."""
+        self.cache.max_bytes = 15000
+        audio, video = f"{self.base_url}/audio.mp4", f"{self.base_url}/video.mp4"
+        self.cache.fetch(audio)
+        self.cache.fetch(video)
+
+        self.assertIsNone(self.cache.cached_path(audio))
+        self.assertIsNotNone(self.cache.cached_path(video))
+        self.assertLessEqual(self.cache.total_bytes(), self.cache.max_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
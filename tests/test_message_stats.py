@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from utils.message_stats import fill_pending_stats, message_stats
+
+
+class TestMessageStats(unittest.TestCase):
+
+    # ------------------------------------------------------
+    # Test: message_stats
+    # ------------------------------------------------------
+    def test_repeated_whitespace_counts_once(self):
+        """Test that runs of spaces, tabs and newlines separate words once (the old SQL counted each space)."""
+        self.assertEqual(message_stats("  see   you\tat\n\nnoon  ")[0], 4)
+        self.assertEqual(message_stats("")[:2], (0, 0))
+        self.assertEqual(message_stats("   ")[0], 0)
+
+    def test_char_length_counts_code_points(self):
+        """Test that lengths match Postgres char_length, not the UTF-8 byte count."""
+        self.assertEqual(message_stats("café ❤")[1], 6)
+
+    def test_emoji_sequences_count_once(self):
+        """Test that ZWJ sequences and skin tones are one emoji each."""
+        self.assertEqual(message_stats("lol 😂😂")[2], 2)
+        self.assertEqual(message_stats("👍🏽 👨‍👩‍👧")[2], 2)
+        self.assertEqual(message_stats("no emoji here")[2], 0)
+
+    def test_no_content(self):
+        """Test that messages without text get NULLs rather than zeros."""
+        self.assertEqual(message_stats(None), (None, None, None))
+
+    # ------------------------------------------------------
+    # Test: fill_pending_stats
+    # ------------------------------------------------------
+    def test_fill_pending_stats_updates_in_chunks(self):
+        """Test that pending rows are fetched chunk by chunk and written back with their counts."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[(1, "hi there"), (2, "😂")], [(3, "ok")]]
+
+        with patch("utils.message_stats.execute_values") as execute_values:
+            updated = fill_pending_stats(cursor, chunk_size=2)
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(execute_values.call_args_list[0].args[2], [(1, 2, 8, 0), (2, 1, 1, 1)])
+        self.assertEqual(execute_values.call_args_list[1].args[2], [(3, 1, 2, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
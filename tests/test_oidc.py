@@ -0,0 +1,170 @@
+import importlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from utils.oidc import JWKSCache, make_session, profile_from_claims, verify_id_token
+
+CLIENT_ID = "test-client"
+ISSUER = "https://accounts.example.test"
+
+
+class StandInProvider(BaseHTTPRequestHandler):
+    """Token, JWKS and userinfo endpoints of a local stand-in OAuth provider."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    provider = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.provider.record(self)
+        if self.path == "/jwks":
+            self._send_json({"keys": [self.provider.public_jwk()]})
+        elif self.path == "/userinfo":
+            self._send_json({"sub": "userinfo-sub"})
+        else:
+            self._send_json({"error": "not_found"}, 404)
+
+    def do_POST(self):
+        self.provider.record(self)
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if self.path == "/token" and form.get("code") == ["good-code"]:
+            self._send_json({"access_token": "access", "id_token": self.provider.id_token()})
+        else:
+            self._send_json({"error": "invalid_grant", "error_description": "Bad code"}, 400)
+
+
+class TestOIDC(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the stand-in provider on a free local port."""
+        cls.key_id = "key-1"
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInProvider)
+        StandInProvider.provider = cls
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        type(self).requests = []
+        self.session = make_session()
+
+    def tearDown(self):
+        self.session.close()
+
+    @classmethod
+    def record(cls, handler):
+        cls.requests.append((handler.command, handler.path, handler.client_address[1]))
+
+    @classmethod
+    def public_jwk(cls):
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(cls.private_key.public_key()))
+        return {**jwk, "kid": cls.key_id, "alg": "RS256", "use": "sig"}
+
+    @classmethod
+    def id_token(cls, **overrides):
+        now = int(time.time())
+        claims = {"iss": ISSUER, "aud": CLIENT_ID, "sub": "1234", "email": "matty@example.test",
+                  "name": "Matty Merritt", "iat": now, "exp": now + 3600, "at_hash": "x", **overrides}
+        return jwt.encode(claims, cls.private_key, algorithm="RS256", headers={"kid": cls.key_id})
+
+    # ------------------------------------------------------
+    # Test: verify_id_token
+    # ------------------------------------------------------
+    def test_verify_id_token(self):
+        """Test that a valid token yields its claims and the key set is fetched once."""
+        jwks = JWKSCache(self.session, f"{self.base_url}/jwks")
+        for _ in range(3):
+            claims = verify_id_token(self.id_token(), jwks, CLIENT_ID, [ISSUER])
+        self.assertEqual(claims["sub"], "1234")
+        self.assertEqual(profile_from_claims(claims), {"sub": "1234", "email": "matty@example.test", "name": "Matty Merritt"})
+        self.assertEqual(len(self.requests), 1)
+
+    def test_rejects_bad_tokens(self):
+        """Test that wrong audience, wrong issuer and expired tokens are refused."""
+        jwks = JWKSCache(self.session, f"{self.base_url}/jwks")
+        for bad in (self.id_token(aud="someone-else"), self.id_token(iss="https://evil.test"),
+                    self.id_token(exp=int(time.time()) - 3600)):
+            with self.assertRaises(jwt.InvalidTokenError):
+                verify_id_token(bad, jwks, CLIENT_ID, [ISSUER])
+
+    # ------------------------------------------------------
+    # Test: JWKSCache
+    # ------------------------------------------------------
+    def test_jwks_refresh(self):
+        """Test that keys are refetched after refresh_s and unknown key ids refetch at most once per interval."""
+        now = [0.0]
+        jwks = JWKSCache(self.session, f"{self.base_url}/jwks", refresh_s=100, min_refresh_s=10, clock=lambda: now[0])
+        jwks.get_key(self.key_id)
+        with self.assertRaises(jwt.InvalidTokenError):
+            jwks.get_key("rotated")
+        self.assertEqual(len(self.requests), 1)  # too soon to refetch
+
+        now[0] = 20
+        with self.assertRaises(jwt.InvalidTokenError):
+            jwks.get_key("rotated")
+        self.assertEqual(len(self.requests), 2)
+
+        now[0] = 200
+        jwks.get_key(self.key_id)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_session_keeps_connections_alive(self):
+        """Test that consecutive calls reuse one TCP connection."""
+        for _ in range(3):
+            self.session.get(f"{self.base_url}/userinfo", timeout=5).json()
+        self.assertEqual(len({port for _, _, port in self.requests}), 1)
+
+    # ------------------------------------------------------
+    # Test: auth_backend callback
+    # ------------------------------------------------------
+    def test_callback_skips_userinfo(self):
+        """Test that the callback signs the user in from the ID token without calling userinfo."""
+        env = {"CLIENT_ID": CLIENT_ID, "CLIENT_SECRET": "secret", "SECRET_KEY": "test",
+               "TOKEN_URL": f"{self.base_url}/token", "USER_INFO_URL": f"{self.base_url}/userinfo",
+               "JWKS_URL": f"{self.base_url}/jwks", "ID_TOKEN_ISSUERS": ISSUER}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env["SESSION_DB_PATH"] = os.path.join(tmp_dir, "sessions.sqlite3")
+            with patch.dict(os.environ, env):
+                import auth_backend
+                auth_backend = importlib.reload(auth_backend)
+            try:
+                self._sign_in(auth_backend.app.test_client())
+            finally:
+                auth_backend.session_store.close()
+
+    def _sign_in(self, client):
+        self.assertEqual(client.get("/api/auth/callback?code=bad-code").status_code, 400)
+        self.assertEqual(client.get("/api/auth/callback?code=good-code").status_code, 302)
+        status = client.get("/api/auth/status")
+
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.get_json()["email"], "matty@example.test")
+        self.assertNotIn("/userinfo", [path for _, path, _ in self.requests])
+
+
+if __name__ == "__main__":
+    unittest.main()
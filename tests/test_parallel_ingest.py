@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import ANY, MagicMock, patch
+from utils import parallel_ingest
+from utils.copy_loader import load_messages
+
+
+class TestParallelIngest(unittest.TestCase):
+
+    def setUp(self):
+        """An older export added after a newer one was already loaded."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.newest_loaded_ms = 1740093859989
+        self.older = os.path.join(self.tmp.name, "message_2.json")
+        with open(self.older, 'w', encoding='utf-8') as file:
+            json.dump({
+                "participants": [{"name": "Mitchell Potts"}, {"name": "Bruce Kesselring"}],
+                "messages": [
+                    {"sender_name": "Mitchell Potts", "timestamp_ms": 1609459200000, "content": "happy new year"},
+                    {"sender_name": "Bruce Kesselring", "timestamp_ms": 1609459260000, "content": "and to you"},
+                    {"sender_name": "Mitchell Potts", "timestamp_ms": 1609459320000},
+                ],
+            }, file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _database(self):
+        """A stand-in connection whose manifest already holds a file newer than every message here."""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+        cursor.fetchone.return_value = (self.newest_loaded_ms,)
+        return conn
+
+    # ------------------------------------------------------
+    # Test: ingest_files
+    # ------------------------------------------------------
+    def test_older_file_loads_in_full(self):
+        """Test that a file older than everything already loaded still stages every message."""
+        staged = []
+
+        def recording_load(cursor, messages):
+            counts, _ = load_messages(cursor, messages)
+            staged.append(counts[0])
+            # As the database would report it: every staged message here is new
+            return counts, min(message["timestamp_ms"] for message in messages)
+
+        with patch.object(parallel_ingest.psycopg2, "connect", side_effect=lambda **_: self._database()), \
+                patch.object(parallel_ingest, "ProcessPoolExecutor", ThreadPoolExecutor), \
+                patch.object(parallel_ingest, "load_messages", side_effect=recording_load), \
+                patch.object(parallel_ingest, "score_pending"), \
+                patch.object(parallel_ingest, "fill_pending_stats"), \
+                patch.object(parallel_ingest, "refresh_rollups") as refresh_rollups, \
+                patch.object(parallel_ingest, "refresh_token_index") as refresh_token_index, \
+                patch.object(parallel_ingest, "bump_data_version", return_value=2):
+            loaded = parallel_ingest.ingest_files([self.older], {}, workers=1)
+
+        self.assertEqual(loaded, 1)
+        self.assertEqual(sum(staged), 3)
+        # Rollups and token counts are recomputed from the older file's first day, not only the latest one
+        refresh_rollups.assert_called_once_with(ANY, changed_from_ms=1609459200000)
+        refresh_token_index.assert_called_once_with(ANY, changed_from_ms=1609459200000)
+
+
+if __name__ == "__main__":
+    unittest.main()
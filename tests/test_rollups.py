@@ -0,0 +1,72 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+import pandas as pd
+from utils.rollups import daily_counts, heatmap_table, refresh_window, rollup_frame
+
+
+class TestRollups(unittest.TestCase):
+
+    def setUp(self):
+        """Three messages: two in the same hour from one sender, one a day earlier without text."""
+        self.df = pd.DataFrame([
+            {"sender_name": "Jonah Eggleston", "timestamp_ms": 1740093564158,
+             "content": "I thought it was going  to be longer tbh",
+             "reactions": [{"reaction": "â\u009d¤", "actor": "Matty Merritt"}]},
+            {"sender_name": "Jonah Eggleston", "timestamp_ms": 1740093859989,
+             "content": "Just present it"},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740000000000},
+        ])
+
+    # ------------------------------------------------------
+    # Test: rollup_frame
+    # ------------------------------------------------------
+    def test_rollup_frame_aggregates_per_sender_hour(self):
+        """Test that counts, words and reactions are summed per sender/day/hour."""
+        rollups = rollup_frame(self.df)
+        jonah = rollups[rollups["sender_name"] == "Jonah Eggleston"].iloc[0]
+
+        self.assertEqual(len(rollups), 2)
+        self.assertEqual(jonah["message_count"], 2)
+        self.assertEqual(jonah["word_count"], 12)
+        self.assertEqual(jonah["reaction_count"], 1)
+        self.assertEqual(jonah["weekday"], 4)  # 2025-02-20 was a Thursday
+
+    def test_messages_without_content_are_not_text(self):
+        """Test that media-only messages count as messages but not text messages."""
+        rollups = rollup_frame(self.df)
+        matty = rollups[rollups["sender_name"] == "Matty Merritt"].iloc[0]
+
+        self.assertEqual(matty["message_count"], 1)
+        self.assertEqual(matty["text_message_count"], 0)
+        self.assertEqual(matty["word_count"], 0)
+
+    # ------------------------------------------------------
+    # Test: chart helpers
+    # ------------------------------------------------------
+    def test_heatmap_and_daily_counts(self):
+        """Test that chart helpers read straight from the rollup rows."""
+        rollups = rollup_frame(self.df)
+
+        self.assertEqual(heatmap_table(rollups).loc["Thursday"].sum(), 2)
+        self.assertEqual(daily_counts(rollups).tolist(), [1, 2])
+
+
+    # ------------------------------------------------------
+    # Test: refresh_window
+    # ------------------------------------------------------
+    def test_refresh_window_reaches_back_to_older_loads(self):
+        """Test that a load of older messages moves the refresh back to their day, and a newer one does not."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (date(2025, 2, 20),)
+
+        self.assertEqual(refresh_window(cursor, "message_rollups")[0], date(2025, 2, 20))
+        from_day, params = refresh_window(cursor, "message_rollups", changed_from_ms=1609459260000)
+        self.assertEqual(from_day, date(2021, 1, 1))
+        self.assertEqual(params["from_ms"], 1609459200000)
+        self.assertEqual(refresh_window(cursor, "message_rollups", changed_from_ms=1740093564158)[0], date(2025, 2, 20))
+        self.assertEqual(refresh_window(cursor, "message_rollups", full=True), (None, {"from_day": "-infinity", "from_ms": -2 ** 63}))
+
+
+if __name__ == "__main__":
+    unittest.main()
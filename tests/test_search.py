@@ -0,0 +1,74 @@
+import unittest
+import pandas as pd
+from utils.search import InvertedIndex, like_pattern, search_query
+
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        """A handful of messages from three senders over three days."""
+        self.df = pd.DataFrame([
+            {"sender_name": "Jonah Eggleston", "timestamp_ms": 1740093564158, "content": "pizza pizza party tonight"},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740180000000, "content": "terrible pizza and the worst party"},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740266400000, "content": "see you at the Catalina Wine Mixer"},
+            {"sender_name": "Adrienne Stout", "timestamp_ms": 1740266500000, "content": "Pizza?"},
+            {"sender_name": "Adrienne Stout", "timestamp_ms": 1740266600000, "content": None},
+        ])
+        self.index = InvertedIndex.from_frame(self.df)
+
+    # ------------------------------------------------------
+    # Test: InvertedIndex
+    # ------------------------------------------------------
+    def test_word_search_is_ranked(self):
+        """Test that every query word must match and more occurrences rank higher."""
+        results, has_more = self.index.search("pizza party")
+        self.assertEqual([result["id"] for result in results], [0, 1])
+        self.assertFalse(has_more)
+
+        results, _ = self.index.search("pizza")
+        self.assertEqual(results[0]["id"], 0)
+        self.assertEqual([result["id"] for result in results[1:]], [3, 1])  # Equal scores: newest first
+
+        self.assertEqual(self.index.search("anchovies")[0], [])
+
+    def test_substring_search(self):
+        """Test case-insensitive substring matches, newest first, including short needles."""
+        results, _ = self.index.search("wine mix", mode="substring")
+        self.assertEqual([result["content"] for result in results], ["see you at the Catalina Wine Mixer"])
+        self.assertEqual([result["id"] for result in self.index.search("?", mode="substring")[0]], [3])
+
+    def test_filters_and_pages(self):
+        """Test sender and date filters and page boundaries."""
+        results, _ = self.index.search("pizza", senders=["Matty Merritt"])
+        self.assertEqual([result["id"] for result in results], [1])
+
+        results, _ = self.index.search("pizza", start_ms=1740180000000, end_ms=1740266400000)
+        self.assertEqual([result["id"] for result in results], [1])
+
+        first, has_more = self.index.search("pizza", page=0, page_size=2)
+        second, has_more_after = self.index.search("pizza", page=1, page_size=2)
+        self.assertTrue(has_more)
+        self.assertFalse(has_more_after)
+        self.assertEqual([result["id"] for result in first + second], [0, 3, 1])
+
+    # ------------------------------------------------------
+    # Test: Postgres query builder
+    # ------------------------------------------------------
+    def test_search_query(self):
+        """Test that the right indexed predicate is used and wildcards are escaped."""
+        sql, params = search_query("pizza", "words", senders={"Matty Merritt"}, page=2, page_size=20)
+        self.assertIn("content_tsv @@ q", sql)
+        self.assertEqual((params["senders"], params["limit"], params["offset"]), (["Matty Merritt"], 21, 40))
+
+        sql, params = search_query("100%_done", "substring")
+        self.assertIn("ILIKE", sql)
+        self.assertEqual(params["query"], "%100\\%\\_done%")
+        self.assertIsNone(params["senders"])
+        self.assertEqual(like_pattern("a\\b"), "%a\\\\b%")
+
+        with self.assertRaises(ValueError):
+            search_query("pizza", "regex")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import pandas as pd
+from utils.sentiment import SentimentCache, attach_scores, cached_scores, content_hash, score_pending, score_texts
+
+
+class TestSentiment(unittest.TestCase):
+
+    def setUp(self):
+        """Use a scratch SQLite cache."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = SentimentCache(os.path.join(self.tmp_dir, "sentiment.sqlite"))
+        self.texts = ["I love this", "this is awful", "I love this", None]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    # ------------------------------------------------------
+    # Test: scoring
+    # ------------------------------------------------------
+    def test_content_hash_matches_postgres_md5(self):
+        """Test that the key is the md5 Postgres computes for the same text."""
+        self.assertEqual(content_hash("hello"), "5d41402abc4b2a76b9719d911017c592")
+
+    def test_score_texts_dedupes(self):
+        """Test that repeated texts are scored once and non-text values are skipped."""
+        scores = score_texts(self.texts, workers=1)
+        self.assertEqual(len(scores), 2)
+        self.assertGreater(scores[content_hash("I love this")][0], 0)
+        self.assertLess(scores[content_hash("this is awful")][0], 0)
+
+    def test_score_pending_uses_postgres_hash_and_stops(self):
+        """Test that scores are stored under the hash Postgres returned, and a chunk storing nothing ends the loop."""
+        cursor = MagicMock()
+        # A non-UTF-8 database: its md5 never equals the Python one, so the same text keeps coming back
+        cursor.fetchall.return_value = [("latin1-md5", "I love this")]
+
+        with patch("utils.sentiment.execute_values", side_effect=[[("latin1-md5",)], []]) as insert:
+            scored = score_pending(cursor, workers=1)
+
+        self.assertEqual(scored, 1)
+        self.assertEqual(insert.call_count, 2)
+        self.assertEqual([row[0] for row in insert.call_args_list[0].args[2]], ["latin1-md5"])
+
+    # ------------------------------------------------------
+    # Test: cache
+    # ------------------------------------------------------
+    def test_only_new_texts_are_scored(self):
+        """Test that a second run reads stored scores and scores only unseen text."""
+        cached_scores(self.texts, self.cache, workers=1)
+
+        with patch("utils.sentiment.score_texts", wraps=score_texts) as scorer:
+            scores = cached_scores(self.texts + ["what a great day"], self.cache, workers=1)
+
+        scorer.assert_called_once()
+        self.assertEqual(scorer.call_args[0][0], ["what a great day"])
+        self.assertEqual(len(scores), 3)
+
+    def test_attach_scores(self):
+        """Test that scores are joined back onto the frame, NaN where there is no text."""
+        df = attach_scores(pd.DataFrame({"content": self.texts}), cached_scores(self.texts, self.cache, workers=1))
+        self.assertEqual(df["polarity"].iloc[0], df["polarity"].iloc[2])
+        self.assertTrue(pd.isna(df["polarity"].iloc[3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
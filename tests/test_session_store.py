@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask, session
+from utils.session_store import SessionStore, StoreSessionInterface
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        """A store on a scratch SQLite file with a controllable clock."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.now = [1000.0]
+        self.store = SessionStore(os.path.join(self.tmp_dir, "sessions.sqlite3"), ttl_s=60, cache_size=2,
+                                  clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    # ------------------------------------------------------
+    # Test: SessionStore
+    # ------------------------------------------------------
+    def test_round_trip_through_disk(self):
+        """Test that sessions evicted from the LRU are read back from SQLite."""
+        for i in range(3):
+            self.store.set(f"sid{i}", {"user": {"email": f"user{i}@example.test"}})
+        self.assertNotIn("sid0", self.store._cache)
+        self.assertEqual(self.store.get("sid0")[0], {"user": {"email": "user0@example.test"}})
+        self.assertIn("sid0", self.store._cache)
+
+    def test_sessions_expire(self):
+        """Test that a session is gone ttl_s after its last write, from both tiers."""
+        self.store.set("sid", {"user": 1})
+        self.now[0] += 59
+        self.assertIsNotNone(self.store.get("sid"))
+        self.now[0] += 2
+        self.assertIsNone(self.store.get("sid"))
+
+    def test_touch_extends_expiry(self):
+        """Test that touching a session keeps it alive without rewriting it."""
+        self.store.set("sid", {"user": 1})
+        self.now[0] += 50
+        self.store.touch("sid")
+        self.now[0] += 50
+        self.assertEqual(self.store.get("sid")[0], {"user": 1})
+
+    def test_sweep_removes_expired_rows(self):
+        """Test that the sweep deletes expired rows and keeps live ones."""
+        self.store.set("old", {"user": 1})
+        self.now[0] += 30
+        self.store.set("new", {"user": 2})
+        self.now[0] += 31
+        self.assertEqual(self.store.sweep(), 1)
+        self.assertEqual(len(self.store), 1)
+
+    def test_delete(self):
+        """Test that a deleted session cannot be read from either tier."""
+        self.store.set("sid", {"user": 1})
+        self.store.delete("sid")
+        self.assertIsNone(self.store.get("sid"))
+
+    # ------------------------------------------------------
+    # Test: StoreSessionInterface
+    # ------------------------------------------------------
+    def test_flask_session_round_trip(self):
+        """Test that a Flask app keeps session data server side behind a signed id cookie."""
+        app = Flask(__name__)
+        app.secret_key = "test"
+        app.session_interface = StoreSessionInterface(self.store)
+
+        @app.route("/login")
+        def login():
+            session["user"] = {"email": "matty@example.test"}
+            return "ok"
+
+        @app.route("/status")
+        def status():
+            return session.get("user") or {}, 200
+
+        @app.route("/logout")
+        def logout():
+            session.clear()
+            return "ok"
+
+        client = app.test_client()
+        client.get("/login")
+        cookie = client.get_cookie("session")
+        self.assertNotIn("matty", cookie.value)
+        self.assertEqual(client.get("/status").get_json(), {"email": "matty@example.test"})
+
+        client.get("/logout")
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(client.get("/status").get_json(), {})
+
+    def test_forged_cookie_is_ignored(self):
+        """Test that an unsigned session id does not load the stored session."""
+        app = Flask(__name__)
+        app.secret_key = "test"
+        app.session_interface = StoreSessionInterface(self.store)
+        self.store.set("known-sid", {"user": 1})
+
+        @app.route("/status")
+        def status():
+            return {"user": session.get("user")}
+
+        client = app.test_client()
+        client.set_cookie("session", "known-sid")
+        self.assertEqual(client.get("/status").get_json(), {"user": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import stream_reader
+from utils.stream_reader import batched, has_messages, iter_messages, read_header, read_participants, write_export
+
+
+class TestStreamReader(unittest.TestCase):
+
+    def setUp(self):
+        """An export with messages in the middle, as Messenger writes them."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.export = {
+            "participants": [{"name": "Mitchell Potts"}, {"name": "Bruce Kesselring"}],
+            "messages": [
+                {"sender_name": "Mitchell Potts", "timestamp_ms": 1740093564158, "content": "itâ\u0080\u0099s",
+                 "reactions": [{"reaction": "â\u009d¤", "actor": "Bruce Kesselring"}]},
+                {"sender_name": "Bruce Kesselring", "timestamp_ms": 1740093564159, "photos": [{"uri": "a.jpg", "creation_timestamp": 1}],
+                 "share": {"link": "https://example.com"}, "score": 1.5},
+            ],
+            "title": "puppygirl hacker polycule",
+            "magic_words": [],
+            "image": {"uri": "photo.png"},
+        }
+        self.path = self._write("message_1.json", json.dumps(self.export))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def _check_reads(self):
+        self.assertEqual(list(iter_messages(self.path, repair=False)), self.export["messages"])
+        expected_header = {key: value for key, value in self.export.items() if key != "messages"}
+        self.assertEqual(read_header(self.path, repair=False), expected_header)
+        self.assertEqual(list(read_header(self.path)), list(expected_header))  # File order kept
+        self.assertEqual(read_participants(self.path), self.export["participants"])
+        self.assertTrue(has_messages(self.path))
+
+        # Repaired by default
+        repaired = list(iter_messages(self.path))
+        self.assertEqual(repaired[0]["content"], "it’s")
+        self.assertEqual(repaired[0]["reactions"][0]["reaction"], "❤")
+
+    # ------------------------------------------------------
+    # Test: reading, with and without ijson
+    # ------------------------------------------------------
+    @unittest.skipIf(stream_reader.ijson is None, "ijson not installed")
+    def test_reads_incrementally(self):
+        """Test that the event-based reader yields the same messages and header as json.load."""
+        self._check_reads()
+
+    def test_json_fallback(self):
+        """Test the json.load fallback used when ijson is missing."""
+        with patch.object(stream_reader, "ijson", None):
+            self._check_reads()
+
+    def test_errors_and_missing_messages(self):
+        """Test that bad JSON raises JSONDecodeError and a file without messages yields none."""
+        broken = self._write("broken.json", '{"participants": [], "messages": [{"content": "hi"},')
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_messages(broken))
+
+        no_messages = self._write("empty.json", '{"participants": [{"name": "Miles Neilson"}]}')
+        self.assertEqual(list(iter_messages(no_messages)), [])
+        self.assertFalse(has_messages(no_messages))
+
+    @unittest.skipIf(stream_reader.ijson is None, "ijson not installed")
+    def test_read_participants_stops_at_participants(self):
+        """Test that participants are read without parsing the messages that follow them."""
+        truncated = self._write("truncated.json", '{"participants": [{"name": "Miles Neilson"}], "messages": [{"content": ')
+        self.assertEqual(read_participants(truncated), [{"name": "Miles Neilson"}])
+        with self.assertRaises(json.JSONDecodeError):
+            read_header(truncated)
+
+    # ------------------------------------------------------
+    # Test: write_export and batched
+    # ------------------------------------------------------
+    def test_write_export_round_trip(self):
+        """Test that a streamed export reads back as the same document."""
+        out = os.path.join(self.tmp.name, "out.json")
+        write_export(out, read_header(self.path), iter_messages(self.path, repair=False))
+        with open(out, encoding='utf-8') as file:
+            self.assertEqual(json.load(file), self.export)
+
+    def test_batched(self):
+        """Test that batches cover every item in order."""
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import re
+import unittest
+from utils.text_cleaning import clean_text, clean_texts, get_cleaner
+
+WORDS = ("just present it to the class by six tomorrow thanks for handling that literally "
+         "message reacted catalina wine mixer it's Caroline! 100% 😂 ❤️").split()
+LINKS = ["https://example.com/a?b=c", "http://t.co/xyz"]
+
+
+def build_corpus(message_count, seed=42):
+    """Message texts with URLs, punctuation, emoji and reaction notices."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(message_count):
+        words = rng.choices(WORDS, k=rng.randint(1, 25))
+        if rng.random() < 0.05:
+            words.append(rng.choice(LINKS))
+        if rng.random() < 0.02:
+            words.extend(["reacted", "😆", "to", "your", "message"])
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy_clean(content):
+    """The per-rule cleaner the engine replaced (utils/json_to_json.py), kept as the reference."""
+    if re.search(r'\bto your message\b', content, flags=re.IGNORECASE):
+        return None
+    cleaned_content = re.sub(r'https?://\S+', '', content)
+    cleaned_content = re.sub(r'[^a-zA-Z\s]', '', cleaned_content)
+    cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)
+    cleaned_content = re.sub(r'\bcatalina wine mixer\b', '', cleaned_content, flags=re.IGNORECASE)
+    cleaned_content = re.sub(r'\breacted\b', '', cleaned_content, flags=re.IGNORECASE)
+    return cleaned_content.strip()
+
+
+class TestTextCleaning(unittest.TestCase):
+
+    # ------------------------------------------------------
+    # Test: profiles
+    # ------------------------------------------------------
+    def test_json_profile(self):
+        """Test the cleaned-export rules: letters and spaces only, trimmed."""
+        self.assertEqual(clean_text("It's gonna take a day", "json"), "Its gonna take a day")
+        self.assertEqual(clean_text("Oh thanks for handling that, Caroline!", "json"), "Oh thanks for handling that Caroline")
+        self.assertEqual(clean_text("", "json"), "")
+        self.assertEqual(clean_text("https://example.com", "json"), "")
+        self.assertIsNone(clean_text("This is related to your message", "json"))
+
+    def test_stop_phrases(self):
+        """Test that stop phrases go only when they are whole words once punctuation is removed."""
+        self.assertEqual(clean_text("Message me at the Catalina Wine Mixer", "json"), "me at the")
+        self.assertEqual(clean_text("the message's gone, message2", "json"), "the messages gone")
+        self.assertEqual(clean_text("messages reacted", "wordcloud"), "messages ")
+
+    def test_stop_phrase_glued_to_url(self):
+        """Test that a stop phrase right before a URL goes, as it did when URLs were removed first."""
+        self.assertEqual(clean_text("messagehttp://x.y", "json"), legacy_clean("messagehttp://x.y"))
+        self.assertEqual(clean_text("see messagehttps://a.b/c now", "json"), "see  now")
+        self.assertEqual(clean_text("reactedhttp://x.yx", "json"), "")
+        self.assertEqual(clean_text("Messagehttps://t.co/x!", "archive"), "")
+        self.assertEqual(clean_text("messagehttpfoo", "json"), "messagehttpfoo")  # Not a URL, so not a boundary
+
+    def test_archive_profile(self):
+        """Test that the archive cleaner keeps punctuation and BMP symbols but drops astral emoji."""
+        self.assertEqual(clean_text("Donâ\u0080\u0099t message me!", "archive"), "Don’t  me!")
+        self.assertEqual(clean_text("see https://t.co/x ❤ 😂!", "archive"), "see  ❤ !")
+        self.assertIsNone(clean_text("Matty reacted 😂 to your message", "archive"))
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile name is rejected."""
+        with self.assertRaises(ValueError):
+            get_cleaner("nope")
+
+    # ------------------------------------------------------
+    # Test: equivalence and parallel cleaning
+    # ------------------------------------------------------
+    def test_matches_legacy_rules(self):
+        """Test that the single pass gives the same output as the old per-rule re.sub chain."""
+        corpus = build_corpus(2000)
+        self.assertEqual(get_cleaner("json").clean_many(corpus), [legacy_clean(text) for text in corpus])
+
+    def test_parallel_matches_serial(self):
+        """Test that chunked cleaning across processes keeps order and results."""
+        corpus = build_corpus(500)
+        self.assertEqual(clean_texts(corpus, "wordcloud", workers=2, chunk_size=100), clean_texts(corpus, "wordcloud"))
+
+
+if __name__ == "__main__":
+    unittest.main()
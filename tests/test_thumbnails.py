@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+from PIL import Image
+from utils.thumbnails import ThumbnailCache, build_collage, grid_layout, list_images, load_thumbnail, thumb_size_for
+
+
+class TestThumbnails(unittest.TestCase):
+
+    def setUp(self):
+        """A scratch photo folder with a few JPEGs and a transparent PNG."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.photo_dir = os.path.join(self.tmp_dir, "photos")
+        self.cache_dir = os.path.join(self.tmp_dir, "thumbnails")
+        self.output = os.path.join(self.tmp_dir, "collage.png")
+        os.makedirs(self.photo_dir)
+        self.photos = [self._photo(f"{i}.jpg", (200, 40 * i, 90)) for i in range(1, 5)]
+        transparent = Image.new("RGBA", (300, 300), (0, 0, 0, 0))
+        self.png = os.path.join(self.photo_dir, "transparent.png")
+        transparent.save(self.png)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assertColorClose(self, actual, expected):
+        """JPEG round trips shift colours by a few levels."""
+        self.assertTrue(all(abs(a - b) < 8 for a, b in zip(actual, expected)), f"{actual} != {expected}")
+
+    def _photo(self, name, color, size=(2048, 1536)):
+        path = os.path.join(self.photo_dir, name)
+        Image.new("RGB", size, color).save(path, "JPEG")
+        return path
+
+    # ------------------------------------------------------
+    # Test: load_thumbnail
+    # ------------------------------------------------------
+    def test_load_thumbnail(self):
+        """Test that a large JPEG comes back bounded by the thumbnail size, aspect kept."""
+        self.assertEqual(load_thumbnail(self.photos[0], 256).size, (256, 192))
+
+    def test_transparency_is_flattened_onto_white(self):
+        """Test that transparent pixels become white, as the old collage did."""
+        thumb = load_thumbnail(self.png, 64)
+        self.assertEqual(thumb.mode, "RGB")
+        self.assertEqual(thumb.getpixel((0, 0)), (255, 255, 255))
+
+    # ------------------------------------------------------
+    # Test: ThumbnailCache
+    # ------------------------------------------------------
+    def test_only_new_photos_are_decoded(self):
+        """Test that a second run reuses every cached thumbnail and a new photo is the only one made."""
+        cache = ThumbnailCache(self.cache_dir)
+        _, made, _ = cache.build(self.photos, workers=2)
+        self.assertEqual(made, 4)
+
+        cache = ThumbnailCache(self.cache_dir)
+        self.assertEqual(cache.build(self.photos, workers=1)[1], 0)
+
+        new_photo = self._photo("5.jpg", (10, 10, 10))
+        self.assertEqual(cache.build(self.photos + [new_photo], workers=1)[1], 1)
+
+    def test_identical_photos_share_a_thumbnail(self):
+        """Test that the cache is keyed by content, not file name."""
+        copy = os.path.join(self.photo_dir, "copy.jpg")
+        shutil.copy(self.photos[0], copy)
+        digests, made, _ = ThumbnailCache(self.cache_dir).build([self.photos[0], copy], workers=1)
+        self.assertEqual(digests[self.photos[0]], digests[copy])
+        self.assertEqual(made, 1)
+
+    def test_unreadable_photo_is_skipped(self):
+        """Test that a corrupt file is reported and left out."""
+        broken = os.path.join(self.photo_dir, "broken.jpg")
+        with open(broken, "wb") as file:
+            file.write(b"not a jpeg")
+        digests, _, errors = ThumbnailCache(self.cache_dir).build(self.photos + [broken], workers=1)
+        self.assertNotIn(broken, digests)
+        self.assertIn(broken, errors)
+
+    # ------------------------------------------------------
+    # Test: layout
+    # ------------------------------------------------------
+    def test_grid_layout(self):
+        """Test fixed canvases, and that thousands of photos grow the canvas instead of shrinking cells."""
+        self.assertEqual(grid_layout(4, 800, 600), (2, 2, 400, 300, 600))
+        self.assertEqual(grid_layout(3, 800, 600), (2, 2, 400, 300, 600))
+        self.assertEqual(grid_layout(3, 900, 300), (3, 1, 300, 300, 300))
+        cols, rows, cell_width, cell_height, canvas_height = grid_layout(3000, 800, 600, min_cell=64)
+        self.assertEqual((cols, cell_height), (12, 64))
+        self.assertEqual(rows, 250)
+        self.assertEqual(canvas_height, 250 * 64)
+        self.assertEqual(thumb_size_for(400, 300), 512)
+        self.assertEqual(thumb_size_for(40, 30), 256)
+
+    # ------------------------------------------------------
+    # Test: build_collage
+    # ------------------------------------------------------
+    def test_collage_updates_incrementally(self):
+        """Test that adding a photo to a grid with room for it draws only that cell."""
+        stats = build_collage(self.photos, self.output, self.cache_dir, width=400, height=None, min_cell=100, workers=1)
+        self.assertEqual((stats["images"], stats["cells_pasted"]), (4, 4))
+
+        new_photo = self._photo("5.jpg", (10, 200, 10))
+        stats = build_collage(self.photos + [new_photo], self.output, self.cache_dir, width=400, height=None,
+                              min_cell=100, workers=1)
+        self.assertEqual((stats["images"], stats["thumbnails_made"], stats["cells_pasted"]), (5, 1, 1))
+
+        with Image.open(self.output) as collage:
+            self.assertEqual(collage.size, (400, 200))
+            self.assertColorClose(collage.getpixel((50, 150)), (10, 200, 10))  # new photo in the next free cell
+            self.assertColorClose(collage.getpixel((50, 50)), (200, 40, 90))  # first photo left where it was
+
+    def test_rerun_in_script_layout_draws_nothing(self):
+        """Test that a collage saved among its photos is not picked up as a photo on the next run."""
+        output = os.path.join(self.photo_dir, "collage.png")
+        cache_dir = os.path.join(self.photo_dir, ".thumbnails")
+        photos = self.photos + [self.png]
+
+        first = build_collage(list_images(self.photo_dir, exclude=[output]), output, cache_dir, workers=1)
+        self.assertEqual(first["cells_pasted"], 5)
+        self.assertNotIn(output, list_images(self.photo_dir, exclude=[output]))
+
+        # Even if a caller lists the whole folder, the collage never becomes one of its own cells
+        second = build_collage(list_images(self.photo_dir), output, cache_dir, workers=1)
+        self.assertEqual((second["images"], second["thumbnails_made"], second["cells_pasted"]), (len(photos), 0, 0))
+
+    def test_layout_change_reuses_thumbnails(self):
+        """Test that a new grid is recomposed from cached thumbnails without decoding photos again."""
+        build_collage(self.photos, self.output, self.cache_dir, width=800, height=600, workers=1)
+        stats = build_collage(self.photos[:3], self.output, self.cache_dir, width=800, height=600, workers=1)
+        self.assertEqual(stats["thumbnails_made"], 0)
+        self.assertEqual(stats["cells_pasted"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+import pandas as pd
+from wordcloud import WordCloud
+from utils.token_index import REFRESH_TOKENS_SQL, TokenIndex, polarity_bucket, tokenize, word_frequencies
+
+
+class TestTokenIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Messages over two days with positive, negative and unscored text."""
+        self.df = pd.DataFrame([
+            {"sender_name": "Jonah Eggleston", "timestamp_ms": 1740093564158,  # 2025-02-20
+             "content": "Pizza pizza party, Jonah's pizza!", "polarity": 0.8},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740180000000,  # 2025-02-21
+             "content": "terrible pizza and the worst party", "polarity": -0.9},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740180000000,
+             "content": "see you at 7 tonight", "polarity": None},
+            {"sender_name": "Matty Merritt", "timestamp_ms": 1740180000000, "content": None, "polarity": None},
+        ])
+
+    # ------------------------------------------------------
+    # Test: tokenize
+    # ------------------------------------------------------
+    def test_tokenize_matches_wordcloud(self):
+        """Test that tokens follow WordCloud's own word splitting."""
+        self.assertEqual(tokenize("Pizza pizza party, Jonah's pizza! at 7 I"), ["pizza", "pizza", "party", "jonah", "pizza", "at"])
+        self.assertEqual(polarity_bucket(0.3), 1)
+        self.assertEqual(polarity_bucket(float("nan")), 0)
+
+    def test_word_frequencies_drops_stopwords(self):
+        """Test that stopwords are filtered when reading, not when indexing."""
+        self.assertEqual(word_frequencies({"the": 9, "pizza": 3, "and": 2}), {"pizza": 3})
+
+    # ------------------------------------------------------
+    # Test: TokenIndex
+    # ------------------------------------------------------
+    def test_frequencies_merge_by_range_and_bucket(self):
+        """Test merging counts across days, a single day and a sentiment bucket."""
+        index = TokenIndex.from_frame(self.df)
+
+        self.assertEqual(index.frequencies()["pizza"], 4)
+        self.assertEqual(index.frequencies(date(2025, 2, 21), date(2025, 2, 21))["pizza"], 1)
+        self.assertEqual(index.frequencies(bucket=-1), {"terrible": 1, "pizza": 1, "worst": 1, "party": 1})
+        self.assertEqual(index.frequencies(senders={"Jonah Eggleston"}), {"pizza": 3, "party": 1, "jonah": 1})
+
+    def test_feeds_generate_from_frequencies(self):
+        """Test that the merged counts drive a word cloud directly."""
+        cloud = WordCloud(width=200, height=100).generate_from_frequencies(TokenIndex.from_frame(self.df).frequencies())
+        self.assertIn("pizza", cloud.words_)
+
+    def test_refresh_sql_escapes_pattern(self):
+        """Test that the token regex is embedded as a valid SQL literal."""
+        self.assertIn("regexp_matches(lower(msg.content), '(\\w[\\w'']+)', 'g')", REFRESH_TOKENS_SQL)
+
+
+if __name__ == "__main__":
+    unittest.main()
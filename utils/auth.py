@@ -0,0 +1,109 @@
+# utils/auth.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# Username/password sign-in. A login looks up one row by username (users.username is UNIQUE,
+# so this is an index probe, not a table load), and bcrypt runs on a small bounded thread pool.
+# The pool only limits concurrency: the pool size caps how many cores concurrent logins can
+# take. It does not take the work off the caller, which waits on the result for the whole
+# hash, since a Streamlit script run cannot continue without it. bcrypt releases the GIL while
+# hashing, so other sessions keep rendering meanwhile. Usernames that do not exist are
+# remembered for a short while so repeated attempts for them skip the database entirely.
+
+USER_LOOKUP_SQL = "SELECT password, name FROM users WHERE username = %s;"
+INSERT_USER_SQL = "INSERT INTO users (username, password, name) VALUES (%s, %s, %s);"
+
+
+class NegativeCache:
+    """A bounded set of keys that each expire ttl_s seconds after being added."""
+
+    def __init__(self, ttl_s=30.0, max_entries=10_000, clock=time.monotonic):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._clock = clock
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        with self._lock:
+            self._expires[key] = self._clock() + self.ttl_s
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.max_entries:
+                self._expires.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._expires.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= self._clock():
+                del self._expires[key]
+                return False
+            return True
+
+
+class AuthService:
+    """
+    Looks up, verifies and registers users. connect is a context manager factory yielding a
+    DB-API connection that commits on success (e.g. the app's pooled z_db.connection).
+    """
+
+    def __init__(self, connect, workers=4, rounds=12, negative_ttl_s=30.0, negative_max_entries=10_000):
+        self._connect = connect
+        self._rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.unknown_users = NegativeCache(negative_ttl_s, negative_max_entries)
+
+    def lookup(self, username):
+        """Returns (password_hash, name) for one user, or None if there is no such user."""
+        if username in self.unknown_users:
+            return None
+        with self._connect() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(USER_LOOKUP_SQL, (username,))
+                row = cursor.fetchone()
+        if row is None:
+            self.unknown_users.add(username)
+        return row
+
+    def authenticate(self, username, password):
+        """
+        Returns (True, name) if the password matches, otherwise (False, None). Blocks the
+        calling thread for the bcrypt check, which waits for a free pool worker first.
+        """
+        row = self.lookup(username)
+        if row is None:
+            return False, None
+        stored_hash, name = row
+        try:
+            matches = self._executor.submit(bcrypt.checkpw, password.encode(), stored_hash.encode()).result()
+        except ValueError:  # Not a bcrypt hash
+            logging.warning(f"⚠️ Stored password for {username!r} is not a valid bcrypt hash.")
+            return False, None
+        return (True, name) if matches else (False, None)
+
+    def hash_password(self, password):
+        """bcrypt hash of password, computed on the worker pool; the caller blocks until it is done."""
+        salt = bcrypt.gensalt(rounds=self._rounds)
+        return self._executor.submit(bcrypt.hashpw, password.encode(), salt).result().decode()
+
+    def register(self, username, password, name):
+        """Inserts a new user. Raises the driver's IntegrityError if the username is taken."""
+        hashed_password = self.hash_password(password)
+        with self._connect() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(INSERT_USER_SQL, (username, hashed_password, name))
+        self.unknown_users.discard(username)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
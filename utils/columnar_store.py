@@ -0,0 +1,229 @@
+# utils/columnar_store.py
+
+import logging
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.stream_reader import iter_messages
+
+# A columnar copy of the Messenger export. One directory per UTC year, each holding an
+# uncompressed Arrow IPC file per table, so reads are memory-mapped rather than parsed:
+#
+#   store/year=2024/messages.arrow   message_id, sender_name, timestamp_ms, content, flags
+#   store/year=2024/reactions.arrow  message_id, reaction, actor
+#   store/year=2024/media.arrow      message_id, kind, uri, creation_timestamp
+#
+# message_id is assigned in timestamp order across the whole store, and child rows live in
+# the same partition as their message.
+
+TABLES = ("messages", "reactions", "media")
+MEDIA_KINDS = ("photos", "videos", "audio_files", "gifs", "files")
+
+SCHEMAS = {
+    "messages": pa.schema([
+        ("message_id", pa.int64()),
+        ("sender_name", pa.dictionary(pa.int32(), pa.string())),
+        ("timestamp_ms", pa.int64()),
+        ("content", pa.string()),
+        ("is_geoblocked_for_viewer", pa.bool_()),
+        ("is_unsent_image_by_messenger_kid_parent", pa.bool_()),
+    ]),
+    "reactions": pa.schema([
+        ("message_id", pa.int64()),
+        ("reaction", pa.string()),
+        ("actor", pa.dictionary(pa.int32(), pa.string())),
+    ]),
+    "media": pa.schema([
+        ("message_id", pa.int64()),
+        ("kind", pa.dictionary(pa.int8(), pa.string())),
+        ("uri", pa.string()),
+        ("creation_timestamp", pa.int64()),
+    ]),
+}
+
+
+def partition_year(timestamp_ms):
+    """UTC year a message is stored under."""
+    return pd.Timestamp(timestamp_ms, unit="ms", tz="UTC").year
+
+
+def build_tables(messages):
+    """
+    Splits export messages into per-year column dicts for the three tables.
+    Messages are sorted by timestamp first; returns {year: {table: {column: values}}}.
+    """
+    partitions = {}
+    ordered = sorted(messages, key=lambda message: message["timestamp_ms"])
+
+    for message_id, message in enumerate(ordered):
+        year = partition_year(message["timestamp_ms"])
+        tables = partitions.get(year)
+        if tables is None:
+            tables = partitions[year] = {name: {field.name: [] for field in SCHEMAS[name]} for name in TABLES}
+
+        row = tables["messages"]
+        row["message_id"].append(message_id)
+        row["sender_name"].append(message.get("sender_name"))
+        row["timestamp_ms"].append(message["timestamp_ms"])
+        row["content"].append(message.get("content"))
+        row["is_geoblocked_for_viewer"].append(bool(message.get("is_geoblocked_for_viewer", False)))
+        row["is_unsent_image_by_messenger_kid_parent"].append(bool(message.get("is_unsent_image_by_messenger_kid_parent", False)))
+
+        for reaction in message.get("reactions", []):
+            tables["reactions"]["message_id"].append(message_id)
+            tables["reactions"]["reaction"].append(reaction.get("reaction"))
+            tables["reactions"]["actor"].append(reaction.get("actor"))
+
+        for kind in MEDIA_KINDS:
+            for item in message.get(kind, []):
+                tables["media"]["message_id"].append(message_id)
+                tables["media"]["kind"].append(kind)
+                tables["media"]["uri"].append(item.get("uri"))
+                tables["media"]["creation_timestamp"].append(item.get("creation_timestamp"))
+
+    return partitions
+
+
+def write_store(messages, store_dir):
+    """
+    Writes messages to a fresh columnar store. The new store is built next to the old one
+    and swapped in at the end, so readers never see a half-written store.
+    Returns the number of messages written.
+    """
+    staging_dir = store_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    for year, tables in build_tables(messages).items():
+        partition_dir = os.path.join(staging_dir, f"year={year}")
+        os.makedirs(partition_dir)
+        for name in TABLES:
+            table = pa.Table.from_pydict(tables[name], schema=SCHEMAS[name])
+            with pa.OSFile(os.path.join(partition_dir, f"{name}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(staging_dir, store_dir)
+    logging.info(f"🗄️ Wrote {len(messages)} messages to columnar store {store_dir}.")
+    return len(messages)
+
+
+def convert_exports(file_names, store_dir):
+    """
+    Reads Messenger export files and writes them to a columnar store. Files are parsed
+    incrementally, but the messages are still collected so they can be ordered by timestamp.
+    """
+    messages = []
+    for file_name in file_names:
+        messages.extend(iter_messages(file_name))
+    return write_store(messages, store_dir)
+
+
+def store_exists(store_dir):
+    """True if store_dir holds at least one partition."""
+    return bool(list_partitions(store_dir))
+
+
+def list_partitions(store_dir, start_ms=None, end_ms=None):
+    """Returns (year, path) for every partition that can hold messages in [start_ms, end_ms)."""
+    if not os.path.isdir(store_dir):
+        return []
+
+    first_year = partition_year(start_ms) if start_ms is not None else None
+    last_year = partition_year(end_ms - 1) if end_ms is not None else None
+
+    partitions = []
+    for entry in sorted(os.listdir(store_dir)):
+        if not entry.startswith("year="):
+            continue
+        year = int(entry.split("=", 1)[1])
+        if (first_year is None or year >= first_year) and (last_year is None or year <= last_year):
+            partitions.append((year, os.path.join(store_dir, entry)))
+    return partitions
+
+
+def _read_ipc(path):
+    # Memory-mapped: the buffers point straight into the page cache, nothing is copied or parsed
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_table(store_dir, name="messages", columns=None, start_ms=None, end_ms=None):
+    """
+    Reads one table from the store as a pyarrow Table, optionally limited to a half-open
+    [start_ms, end_ms) window. Only the partitions that overlap the window are opened.
+    """
+    partitions = list_partitions(store_dir, start_ms, end_ms)
+    if not partitions:
+        return SCHEMAS[name].empty_table().select(columns) if columns else SCHEMAS[name].empty_table()
+
+    tables = [_read_ipc(os.path.join(path, f"{name}.arrow")) for _, path in partitions]
+    table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+    if name == "messages":
+        if start_ms is not None:
+            table = table.filter(pc.greater_equal(table.column("timestamp_ms"), start_ms))
+        if end_ms is not None:
+            table = table.filter(pc.less(table.column("timestamp_ms"), end_ms))
+    elif start_ms is not None or end_ms is not None:
+        # Child rows carry no timestamp; keep the ones whose message falls in the window
+        window = read_table(store_dir, "messages", ["message_id"], start_ms, end_ms)
+        table = table.filter(pc.is_in(table.column("message_id"), value_set=window.column("message_id").combine_chunks()))
+
+    return table.select(columns) if columns else table
+
+
+def _nested_column(message_ids, children, fields):
+    """
+    Builds a per-message list of dicts from a child table sorted by message_id, shaped like
+    the export (None for messages without children).
+    """
+    child_ids = children.column("message_id").to_numpy()
+    starts = np.searchsorted(child_ids, message_ids, side="left")
+    ends = np.searchsorted(child_ids, message_ids, side="right")
+
+    records = children.select(list(fields)).to_pylist()
+    return [records[start:end] if end > start else None for start, end in zip(starts, ends)]
+
+
+def messages_frame(store_dir, columns=None, start_ms=None, end_ms=None, nested=False):
+    """
+    Loads messages as a DataFrame. With nested=True, reactions and media are attached as
+    list columns in the same shape as the JSON export ("reactions", "photos", ...), so code
+    written against pd.DataFrame(messages) keeps working.
+    """
+    if nested and columns and "message_id" not in columns:
+        columns = ["message_id"] + list(columns)
+    table = read_table(store_dir, "messages", columns, start_ms, end_ms)
+    df = table.to_pandas()
+    for column in df.select_dtypes("category").columns:
+        df[column] = df[column].astype(object)
+
+    if nested and len(df):
+        message_ids = df["message_id"].to_numpy()
+
+        reactions = read_table(store_dir, "reactions", start_ms=start_ms, end_ms=end_ms)
+        df["reactions"] = _nested_column(message_ids, reactions, ("reaction", "actor"))
+
+        media = read_table(store_dir, "media", start_ms=start_ms, end_ms=end_ms)
+        for kind in MEDIA_KINDS:
+            items = media.filter(pc.equal(media.column("kind").cast(pa.string()), kind))
+            if items.num_rows:
+                df[kind] = _nested_column(message_ids, items, ("uri", "creation_timestamp"))
+
+    return df
+
+
+def message_records(store_dir, start_ms=None, end_ms=None):
+    """
+    Loads messages as export-shaped dicts, for scripts written against data["messages"].
+    Keys whose value is missing are left out, as they are in the export.
+    """
+    df = messages_frame(store_dir, start_ms=start_ms, end_ms=end_ms, nested=True).drop(columns="message_id")
+    return [{key: value for key, value in record.items() if value is not None and value == value}
+            for record in df.to_dict("records")]
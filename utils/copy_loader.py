@@ -0,0 +1,213 @@
+# utils/copy_loader.py
+
+import io
+import logging
+
+from utils.message_stats import STATS_COLUMNS, message_stats
+
+# Staging tables live for the whole session and are truncated before every file,
+# so one connection can stream any number of files through them.
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS stage_messages (
+        seq BIGINT PRIMARY KEY,
+        sender_name TEXT,
+        timestamp_ms BIGINT,
+        content TEXT,
+        is_geoblocked_for_viewer BOOLEAN,
+        is_unsent_image_by_messenger_kid_parent BOOLEAN,
+        word_count INTEGER,
+        char_length INTEGER,
+        emoji_count INTEGER,
+        sender_id INTEGER,
+        message_id BIGINT,
+        is_new BOOLEAN NOT NULL DEFAULT FALSE
+    );
+    CREATE TEMP TABLE IF NOT EXISTS stage_reactions (
+        message_seq BIGINT,
+        reaction TEXT,
+        actor_name TEXT
+    );
+    CREATE TEMP TABLE IF NOT EXISTS stage_media (
+        message_seq BIGINT,
+        media_uri TEXT,
+        creation_timestamp BIGINT
+    );
+"""
+
+MESSAGE_COLUMNS = ("seq", "sender_name", "timestamp_ms", "content",
+                   "is_geoblocked_for_viewer", "is_unsent_image_by_messenger_kid_parent") + STATS_COLUMNS
+REACTION_COLUMNS = ("message_seq", "reaction", "actor_name")
+MEDIA_COLUMNS = ("message_seq", "media_uri", "creation_timestamp")
+
+# Resolves sender, actor and message IDs for everything staged, in one round trip.
+# Messages are identified by their natural key (sender_id, timestamp_ms): rows already in the
+# table keep their ID, new keys draw one from the sequence, and reactions and media are joined
+# to their message by staging position. Re-running a file inserts nothing new. The last
+# statement returns the earliest timestamp_ms the batch changed, so derived tables can be
+# refreshed from there however old the loaded messages are.
+RESOLVE_SQL = """
+    UPDATE stage_messages s
+       SET sender_id = p.id
+      FROM participants p
+     WHERE p.name = s.sender_name;
+
+    UPDATE stage_messages s
+       SET message_id = m.id
+      FROM messages m
+     WHERE m.timestamp_ms = s.timestamp_ms
+       AND m.sender_id IS NOT DISTINCT FROM s.sender_id;
+
+    WITH new_keys AS (
+        SELECT sender_id, timestamp_ms, nextval(pg_get_serial_sequence('messages', 'id')) AS id
+          FROM (SELECT DISTINCT sender_id, timestamp_ms
+                  FROM stage_messages
+                 WHERE message_id IS NULL) keys
+    )
+    UPDATE stage_messages s
+       SET message_id = k.id, is_new = TRUE
+      FROM new_keys k
+     WHERE k.timestamp_ms = s.timestamp_ms
+       AND k.sender_id IS NOT DISTINCT FROM s.sender_id;
+
+    INSERT INTO messages (id, sender_id, timestamp_ms, content,
+                          is_geoblocked_for_viewer, is_unsent_image_by_messenger_kid_parent,
+                          word_count, char_length, emoji_count)
+    SELECT DISTINCT ON (s.message_id)
+           s.message_id, s.sender_id, s.timestamp_ms, s.content,
+           s.is_geoblocked_for_viewer, s.is_unsent_image_by_messenger_kid_parent,
+           s.word_count, s.char_length, s.emoji_count
+      FROM stage_messages s
+     WHERE s.is_new
+     ORDER BY s.message_id, s.seq
+    ON CONFLICT (sender_id, timestamp_ms) DO NOTHING;
+
+    -- A concurrent loader may have won the insert for a key; point at whichever row exists
+    UPDATE stage_messages s
+       SET message_id = m.id
+      FROM messages m
+     WHERE s.is_new
+       AND m.timestamp_ms = s.timestamp_ms
+       AND m.sender_id IS NOT DISTINCT FROM s.sender_id
+       AND m.id <> s.message_id;
+
+    INSERT INTO media (message_id, media_uri, creation_timestamp)
+    SELECT DISTINCT s.message_id, m.media_uri, m.creation_timestamp
+      FROM stage_media m
+      JOIN stage_messages s ON s.seq = m.message_seq
+     WHERE NOT EXISTS (
+        SELECT 1 FROM media x
+         WHERE x.message_id = s.message_id
+           AND x.media_uri = m.media_uri
+     );
+
+    -- Last, so its result is the batch's: the earliest message inserted or given new reactions
+    WITH new_reactions AS (
+        INSERT INTO reactions (message_id, reaction, actor_id)
+        SELECT DISTINCT s.message_id, r.reaction, p.id
+          FROM stage_reactions r
+          JOIN stage_messages s ON s.seq = r.message_seq
+          LEFT JOIN participants p ON p.name = r.actor_name
+         WHERE NOT EXISTS (
+            SELECT 1 FROM reactions x
+             WHERE x.message_id = s.message_id
+               AND x.reaction = r.reaction
+               AND x.actor_id IS NOT DISTINCT FROM p.id
+         )
+         RETURNING message_id
+    )
+    SELECT min(s.timestamp_ms)
+      FROM stage_messages s
+     WHERE s.is_new
+        OR s.message_id IN (SELECT message_id FROM new_reactions);
+"""
+
+
+def copy_value(value):
+    """Formats a single value for PostgreSQL's COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+def rows_to_copy_buffer(rows):
+    """Serializes row tuples into an in-memory buffer ready for COPY FROM STDIN."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def build_rows(messages):
+    """
+    Flattens exported messages into message, reaction and media rows keyed by position.
+    Message rows carry the derived word, character and emoji counts of their content.
+    """
+    message_rows = []
+    reaction_rows = []
+    media_rows = []
+
+    for seq, message in enumerate(messages):
+        content = message.get("content")
+        message_rows.append((
+            seq, message.get("sender_name"), message["timestamp_ms"], content,
+            message.get("is_geoblocked_for_viewer", False),
+            message.get("is_unsent_image_by_messenger_kid_parent", False),
+            *message_stats(content)
+        ))
+
+        for reaction in message.get("reactions", []):
+            reaction_rows.append((seq, reaction["reaction"], reaction.get("actor")))
+
+        for photo in message.get("photos", []):
+            media_rows.append((seq, photo["uri"], photo.get("creation_timestamp")))
+
+    return message_rows, reaction_rows, media_rows
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Streams rows into a table with a single COPY FROM STDIN."""
+    if not rows:
+        return
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        rows_to_copy_buffer(rows)
+    )
+
+
+def ensure_participants(cursor, names):
+    """Inserts any missing participant names in one statement."""
+    if names:
+        cursor.execute(
+            "INSERT INTO participants (name) SELECT unnest(%s::text[]) ON CONFLICT (name) DO NOTHING;",
+            (sorted(set(names)),)
+        )
+
+
+def load_messages(cursor, messages):
+    """
+    Loads one batch of exported messages through the staging tables.
+    Returns the number of (messages, reactions, media) rows staged, and the earliest timestamp_ms
+    of a message that was inserted or gained reactions (None if the batch changed nothing).
+    """
+    message_rows, reaction_rows, media_rows = build_rows(messages)
+
+    cursor.execute(STAGING_DDL)
+    cursor.execute("TRUNCATE stage_messages, stage_reactions, stage_media;")
+
+    copy_rows(cursor, "stage_messages", MESSAGE_COLUMNS, message_rows)
+    copy_rows(cursor, "stage_reactions", REACTION_COLUMNS, reaction_rows)
+    copy_rows(cursor, "stage_media", MEDIA_COLUMNS, media_rows)
+
+    cursor.execute(RESOLVE_SQL)
+    earliest_ms = cursor.fetchone()[0]
+
+    logging.debug(f"Staged {len(message_rows)} messages, {len(reaction_rows)} reactions, {len(media_rows)} media.")
+    return (len(message_rows), len(reaction_rows), len(media_rows)), earliest_ms
@@ -0,0 +1,121 @@
+# utils/encoding.py
+
+import logging
+import re
+from psycopg2.extras import execute_values
+
+# Messenger exports store UTF-8 bytes as if each byte were a Latin-1 character, so "❤" arrives
+# as "â\x9d¤". Text is repaired once as it is read (utils/stream_reader.py), so everything
+# downstream (Postgres, the columnar store, the dashboards) sees canonical UTF-8.
+#
+# Most text is plain ASCII, so the check is str.isascii() first (a C-level scan) and only then a
+# regex for a UTF-8 lead byte followed by a continuation byte, the signature of mojibake.
+
+MOJIBAKE = re.compile("[Â-ô][\u0080-¿]")
+# Same signature for Postgres (ARE syntax), used to find rows stored before repair moved to ingest
+MOJIBAKE_SQL = "[Â-ô][\u0080-¿]"
+
+
+def needs_repair(text):
+    """True if text looks like UTF-8 that was decoded as Latin-1."""
+    return isinstance(text, str) and not text.isascii() and MOJIBAKE.search(text) is not None
+
+
+def repair_text(text):
+    """Returns text re-decoded as UTF-8 where that is possible, otherwise text unchanged."""
+    if not needs_repair(text):
+        return text
+    try:
+        return text.encode('latin1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+
+def repair_message(message):
+    """Repairs the text fields of one export message in place and returns it."""
+    for field in ("sender_name", "content"):
+        if field in message:
+            message[field] = repair_text(message[field])
+    for reaction in message.get("reactions", ()):
+        for field in ("reaction", "actor"):
+            if field in reaction:
+                reaction[field] = repair_text(reaction[field])
+    return message
+
+
+def repair_header(header):
+    """Repairs participant names and the title of an export header in place and returns it."""
+    for participant in header.get("participants") or ():
+        if "name" in participant:
+            participant["name"] = repair_text(participant["name"])
+    if "title" in header:
+        header["title"] = repair_text(header["title"])
+    return header
+
+
+# ------------------------------------------------------
+# Postgres: one-off repair of rows loaded before ingest-time repair
+# ------------------------------------------------------
+REPAIR_COLUMNS = (
+    ("messages", "content"),
+    ("reactions", "reaction"),
+    ("participants", "name"),
+)
+
+# Set once the stored text has been repaired, so loaders only scan for mojibake the first time
+REPAIR_MARKER_DDL = """
+    CREATE TABLE IF NOT EXISTS encoding_repair (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        rows_repaired INTEGER NOT NULL,
+        repaired_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+
+
+def repair_column(cursor, table, column, batch_size=5000):
+    """
+    Repairs one text column in place. Only rows matching the mojibake signature are fetched,
+    and the fixes are written back in batches. Returns the number of rows changed.
+    """
+    cursor.execute(f"SELECT id, {column} FROM {table} WHERE {column} ~ %s;", (MOJIBAKE_SQL,))
+    fixes = [(row_id, repaired) for row_id, text in cursor.fetchall() if (repaired := repair_text(text)) != text]
+
+    if table == "participants" and fixes:
+        # Names are unique; a repaired name that already exists is left for a manual merge
+        cursor.execute("SELECT name FROM participants WHERE name = ANY(%s);", ([name for _, name in fixes],))
+        taken = {row[0] for row in cursor.fetchall()}
+        for _, name in fixes:
+            if name in taken:
+                logging.warning(f"⚠️ Participant {name!r} exists in both encodings; not renaming.")
+        fixes = [(row_id, name) for row_id, name in fixes if name not in taken]
+
+    for i in range(0, len(fixes), batch_size):
+        execute_values(
+            cursor,
+            f"UPDATE {table} AS t SET {column} = v.repaired FROM (VALUES %s) AS v (id, repaired) WHERE t.id = v.id",
+            fixes[i:i + batch_size]
+        )
+    logging.info(f"🔤 Repaired {len(fixes)} {table}.{column} values.")
+    return len(fixes)
+
+
+def repair_stored_text(cursor, force=False):
+    """
+    Repairs every REPAIR_COLUMNS value stored before ingest-time repair, once per database
+    (again with force=True). Loaders call this through ensure_schema before their first load:
+    an export read as "José" next to a stored "JosÃ©" would otherwise become a second
+    participant with a second copy of every message.
+    Returns the number of rows changed (0 when the repair had already run).
+    """
+    cursor.execute(REPAIR_MARKER_DDL)
+    cursor.execute("SELECT 1 FROM encoding_repair;")
+    if cursor.fetchone() and not force:
+        return 0
+
+    repaired = sum(repair_column(cursor, table, column) for table, column in REPAIR_COLUMNS)
+    cursor.execute(
+        """INSERT INTO encoding_repair (rows_repaired) VALUES (%s)
+           ON CONFLICT (id) DO UPDATE SET rows_repaired = EXCLUDED.rows_repaired, repaired_at = now();""",
+        (repaired,)
+    )
+    return repaired
@@ -0,0 +1,40 @@
+# utils/graph_render.py
+
+import networkx as nx
+from pyvis.network import Network
+
+# Node positions are computed here once, server-side, and baked into the HTML with physics
+# turned off, so the browser draws the graph immediately instead of running a vis.js
+# stabilization pass on every load.
+
+
+def build_graph(nodes, edges, directed=False):
+    """Builds a graph from node names and (source, target, weight) edges."""
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(nodes)
+    for source, target, weight in edges:
+        G.add_edge(source, target, value=int(weight), title=f"{source} → {target}: {weight}")
+    return G
+
+
+def layout_positions(G, scale=600, seed=42):
+    """Spring layout in pixel coordinates; heavier edges pull their nodes closer. Deterministic for a given graph."""
+    if G.number_of_nodes() == 0:
+        return {}
+    positions = nx.spring_layout(G, weight="value", seed=seed, scale=scale)
+    return {node: (float(x), float(y)) for node, (x, y) in positions.items()}
+
+
+def render_html(nodes, edges, directed=False, height="600px", width="100%", **style):
+    """Returns standalone HTML for a pyvis network with precomputed, fixed node positions."""
+    G = build_graph(nodes, edges, directed=directed)
+    positions = layout_positions(G)
+
+    net = Network(height=height, width=width, directed=directed, **style)
+    net.from_nx(G)
+    for node in net.nodes:
+        node["x"], node["y"] = positions[node["id"]]
+    net.toggle_physics(False)
+
+    # generate_html keeps everything in memory; nothing is written to a shared file
+    return net.generate_html()
@@ -0,0 +1,47 @@
+# utils/ingest_manifest.py
+
+import hashlib
+
+
+def file_sha256(file_name, chunk_size=1 << 20):
+    """Hashes a file's contents without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def loaded_hashes(cursor):
+    """Returns the content hashes of every file already loaded."""
+    cursor.execute("SELECT sha256 FROM ingest_manifest;")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def plan_files(cursor, file_names):
+    """Hashes the given files and returns (file_name, sha256) pairs for those not yet loaded."""
+    seen = loaded_hashes(cursor)
+    pending = []
+    for file_name in file_names:
+        sha256 = file_sha256(file_name)
+        if sha256 not in seen:
+            pending.append((file_name, sha256))
+            seen.add(sha256)  # Identical copies within one run only load once
+    return pending
+
+
+def record_file(cursor, file_name, sha256, messages=None, high_water_ms=None, message_count=None):
+    """
+    Marks a file as loaded along with the newest timestamp it contained. Pass the messages, or
+    high_water_ms and message_count when they were streamed and counted along the way.
+    """
+    if messages is not None:
+        high_water_ms = max((message["timestamp_ms"] for message in messages), default=None)
+        message_count = len(messages)
+    cursor.execute(
+        """INSERT INTO ingest_manifest (sha256, file_path, high_water_ms, message_count)
+           VALUES (%s, %s, %s, %s)
+           ON CONFLICT (sha256) DO UPDATE
+              SET file_path = EXCLUDED.file_path, loaded_at = now();""",
+        (sha256, file_name, high_water_ms, message_count)
+    )
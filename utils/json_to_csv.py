@@ -2,44 +2,44 @@
 
 import json
 import os
-import re
 import csv
 
-def process_chat_files(file_names):
-    """Processes chat JSON files, extracts and cleans message content."""
-    raw_content_list = []
-    cleaned_content_list = []
+from utils.stream_reader import iter_messages
+from utils.text_cleaning import get_cleaner
+
+def iter_chat_content(file_names):
+    """Streams (raw, cleaned) message content out of chat JSON files, one message at a time."""
+    cleaner = get_cleaner("wordcloud")
 
     for file_name in file_names:
         try:
-            with open(file_name, 'r', encoding='utf-8') as file:
-                print(f"Processing file: {file_name}")
-                data = json.load(file)
-
-                for message in data.get("messages", []):
-                    if message.get("content"):
-                        raw_content = message["content"]
-
-                        # Discard messages that contain "to your message"
-                        if re.search(r'\bto your message\b', raw_content, flags=re.IGNORECASE):
-                            continue
-
-                        raw_content_list.append(raw_content)
+            print(f"Processing file: {file_name}")
+            for message in iter_messages(file_name):
+                if message.get("content"):
+                    raw_content = message["content"]
 
-                        # Clean the content
-                        cleaned_content = re.sub(r'https?://\S+', '', raw_content)  # Remove URLs
-                        cleaned_content = re.sub(r'[^a-zA-Z\s]', '', cleaned_content)  # Remove punctuation
-                        cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)
-                        cleaned_content = re.sub(r'\bcatalina wine mixer\b', '', cleaned_content, flags=re.IGNORECASE)
-                        cleaned_content = re.sub(r'\breacted\b', '', cleaned_content, flags=re.IGNORECASE)
+                    # Clean the content (None means a "to your message" notice, which is discarded)
+                    cleaned_content = cleaner.clean(raw_content)
+                    if cleaned_content is None:
+                        continue
 
-                        cleaned_content_list.append(cleaned_content)
+                    yield raw_content, cleaned_content
 
         except FileNotFoundError:
             print(f"File not found: {file_name}")
         except json.JSONDecodeError:
             print(f"Error reading JSON in file: {file_name}")
 
+
+def process_chat_files(file_names):
+    """Processes chat JSON files, extracts and cleans message content."""
+    raw_content_list = []
+    cleaned_content_list = []
+
+    for raw_content, cleaned_content in iter_chat_content(file_names):
+        raw_content_list.append(raw_content)
+        cleaned_content_list.append(cleaned_content)
+
     return raw_content_list, cleaned_content_list
 
 
@@ -55,8 +55,13 @@ def save_to_csv(filename, data, header):
 
 
 def export_chat_data(file_names):
-    """Main function to process chat files and save raw and cleaned content."""
-    raw_content_list, cleaned_content_list = process_chat_files(file_names)
-
-    save_to_csv('new_raw_message_content.csv', raw_content_list, 'Raw Message Content')
-    save_to_csv('new_cleaned_message_content.csv', cleaned_content_list, 'Cleaned Message Content')
\ No newline at end of file
+    """Main function to process chat files and save raw and cleaned content, row by row."""
+    with open('new_raw_message_content.csv', 'w', newline='', encoding='utf-8') as raw_file, \
+            open('new_cleaned_message_content.csv', 'w', newline='', encoding='utf-8') as cleaned_file:
+        raw_writer, cleaned_writer = csv.writer(raw_file), csv.writer(cleaned_file)
+        raw_writer.writerow(['Raw Message Content'])
+        cleaned_writer.writerow(['Cleaned Message Content'])
+        for raw_content, cleaned_content in iter_chat_content(file_names):
+            raw_writer.writerow([raw_content])
+            cleaned_writer.writerow([cleaned_content])
+    print("CSV files 'new_raw_message_content.csv' and 'new_cleaned_message_content.csv' saved successfully.")
\ No newline at end of file
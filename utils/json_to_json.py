@@ -1,24 +1,35 @@
 # utils/chat_utils.py
 
 import json
-import re
 import os
 
+from utils.stream_reader import iter_messages, read_header
+from utils.text_cleaning import clean_text
+
 
 def clean_message_content(content):
-    """Cleans the message content based on specific rules."""
-    # Discard messages that contain "to your message"
-    if re.search(r'\bto your message\b', content, flags=re.IGNORECASE):
-        return None
+    """Cleans the message content based on specific rules (see the "json" profile in utils/text_cleaning.py)."""
+    return clean_text(content, "json")
+
+
+HEADER_FIELDS = ("participants", "title", "is_still_participant", "thread_path", "magic_words", "image", "joinable_mode")
 
-    # Clean the content
-    cleaned_content = re.sub(r'https?://\S+', '', content)  # Remove URLs
-    cleaned_content = re.sub(r'[^a-zA-Z\s]', '', cleaned_content)  # Remove punctuation
-    cleaned_content = re.sub(r'\bmessage\b', '', cleaned_content, flags=re.IGNORECASE)
-    cleaned_content = re.sub(r'\bcatalina wine mixer\b', '', cleaned_content, flags=re.IGNORECASE)
-    cleaned_content = re.sub(r'\breacted\b', '', cleaned_content, flags=re.IGNORECASE)
+# NDJSON header lines carry {RECORD_TAG: HEADER_TAG}; message lines have no tag
+RECORD_TAG = "_type"
+HEADER_TAG = "header"
 
-    return cleaned_content.strip()
+
+def clean_messages(messages):
+    """Yields the messages to keep, with their content cleaned."""
+    for message in messages:
+        if "content" in message and message["content"]:
+            cleaned_content = clean_message_content(message["content"])
+            if cleaned_content is not None:
+                message["content"] = cleaned_content
+                yield message
+        else:
+            # Keep messages without content (like shared media or reactions)
+            yield message
 
 
 def process_chat_files_to_cleaned_json(file_names, output_folder):
@@ -26,6 +37,7 @@ def process_chat_files_to_cleaned_json(file_names, output_folder):
     Processes chat JSON files, cleans only `messages.content`, and saves the result as one consolidated JSON file.
     """
     os.makedirs(output_folder, exist_ok=True)  # ✅ Create the directory if it doesn’t exist
+    output_filename = os.path.join(output_folder, 'cleaned_json_to_json.json')
 
     combined_data = {
         "participants": [],
@@ -55,19 +67,7 @@ def process_chat_files_to_cleaned_json(file_names, output_folder):
                 combined_data["joinable_mode"] = data.get("joinable_mode", combined_data["joinable_mode"])
 
                 # Process messages
-                for message in data.get("messages", []):
-                    if "content" in message and message["content"]:
-                        cleaned_content = clean_message_content(message["content"])
-                        if cleaned_content is not None:
-                            message["content"] = cleaned_content
-                            combined_data["messages"].append(message)
-                    else:
-                        # Keep messages without content (like shared media or reactions)
-                        combined_data["messages"].append(message)
-                        
-                base_name = os.path.basename(file_name)
-                output_filename = os.path.join(output_folder, 'cleaned_json_to_json.json')
-                save_to_json(output_filename, data)
+                combined_data["messages"].extend(clean_messages(data.get("messages", [])))
 
         except FileNotFoundError:
             print(f"File not found: {file_name}")
@@ -78,6 +78,64 @@ def process_chat_files_to_cleaned_json(file_names, output_folder):
     save_to_json(output_filename, combined_data)
 
 
+def process_chat_files_to_ndjson(file_names, output_folder):
+    """
+    Streaming version of process_chat_files_to_cleaned_json: writes cleaned messages as
+    newline-delimited JSON while each file is parsed, one message at a time, so memory stays
+    flat however large the export is.
+
+    A header line ({"_type": "header", "participants": ..., "title": ..., ...}) comes before the
+    messages of the first file, and again before any later file whose header differs. Only
+    header lines carry the "_type" tag, which is how readers tell the two apart (see iter_ndjson).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    output_filename = os.path.join(output_folder, 'cleaned_json_to_json.ndjson')
+
+    last_header = None
+    written = 0
+    with open(output_filename, 'w', encoding='utf-8') as out:
+        for file_name in file_names:
+            try:
+                print(f"Processing file: {file_name}")
+                # The header pass also validates the file, so a bad file writes nothing
+                data = read_header(file_name)
+            except FileNotFoundError:
+                print(f"File not found: {file_name}")
+                continue
+            except json.JSONDecodeError:
+                print(f"Error reading JSON in file: {file_name}")
+                continue
+
+            header = {field: data.get(field) for field in HEADER_FIELDS}
+            header["participants"] = header["participants"] or []
+            if header != last_header:
+                out.write(json.dumps({RECORD_TAG: HEADER_TAG, **header}, ensure_ascii=True) + "\n")
+                last_header = header
+
+            for message in clean_messages(iter_messages(file_name)):
+                out.write(json.dumps(message, ensure_ascii=True) + "\n")
+                written += 1
+
+    print(f"NDJSON file '{output_filename}' saved successfully ({written} messages).")
+    return output_filename
+
+
+def iter_ndjson(filename):
+    """
+    Reads a file written by process_chat_files_to_ndjson, yielding ("header" | "message", record).
+    Header records are returned without their "_type" tag.
+    """
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if record.get(RECORD_TAG) == HEADER_TAG:
+                    del record[RECORD_TAG]
+                    yield "header", record
+                else:
+                    yield "message", record
+
+
 def save_to_json(filename, data):
     """Saves the data to a JSON file."""
     with open(filename, 'w', encoding='utf-8') as jsonfile:
@@ -85,6 +143,8 @@ def save_to_json(filename, data):
     print(f"JSON file '{filename}' saved successfully.")
 
 
-def export_chat_data(file_names, output_folder='messages/messages_dev/cleaned_messages'):
-    """Main function to process chat files and save consolidated JSON."""
+def export_chat_data(file_names, output_folder='messages/messages_dev/cleaned_messages', ndjson=False):
+    """Main function to process chat files and save consolidated JSON (or NDJSON, streamed)."""
+    if ndjson:
+        return process_chat_files_to_ndjson(file_names, output_folder)
     process_chat_files_to_cleaned_json(file_names, output_folder)
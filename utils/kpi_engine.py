@@ -0,0 +1,231 @@
+# utils/kpi_engine.py
+
+import csv
+import glob
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.columnar_store import message_records, store_exists
+from utils.encoding import repair_text
+from utils.message_stats import count_words
+from utils.stream_reader import iter_messages
+
+# Every KPI is an accumulator: add() sees each message once, merge() combines the partial
+# results of two workers, and rows() yields the CSV rows. All of them are fed from the same
+# pass over the messages, so a full KPI refresh parses each export file exactly once.
+# scripts/kpis.py refreshes every kpis/*.csv that way; the older single-metric scripts
+# (reactions.py, unsent.py, ...) ask the engine for just their metric. Files are parsed in a
+# process pool, so callers run it under an `if __name__ == "__main__":` guard.
+
+
+class Metric(ABC):
+    """Base accumulator. Subclasses keep their state in Counters so merging is just addition."""
+    output_file = None
+    fieldnames = ()
+
+    @abstractmethod
+    def add(self, message):
+        """Counts one message."""
+
+    def merge(self, other):
+        for name, value in vars(other).items():
+            getattr(self, name).update(value)
+        return self
+
+    @abstractmethod
+    def rows(self):
+        """Yields the metric's CSV rows as dicts keyed by fieldnames."""
+
+
+class WordCount(Metric):
+    """Total words sent per user (scripts/wordcount_peruser.py)."""
+    output_file = "user_word_count.csv"
+    fieldnames = ("User Name", "Total Word Count")
+
+    def __init__(self):
+        self.words = Counter()
+
+    def add(self, message):
+        self.words[message.get("sender_name", "Unknown")] += count_words(message.get("content", ""))
+
+    def rows(self):
+        for user, count in sorted(self.words.items(), key=lambda x: x[1], reverse=True):
+            yield {"User Name": user, "Total Word Count": count}
+
+
+class ReactionsReceived(Metric):
+    """Reactions received per sender (scripts/reactions.py)."""
+    output_file = "reactions_received.csv"
+    fieldnames = ("Sender Name", "Reactions Received")
+
+    def __init__(self):
+        self.received = Counter()
+
+    def add(self, message):
+        if "reactions" in message:
+            self.received[message.get("sender_name", "Unknown")] += len(message["reactions"])
+
+    def rows(self):
+        for sender, count in sorted(self.received.items(), key=lambda x: x[1], reverse=True):
+            yield {"Sender Name": sender, "Reactions Received": count}
+
+
+class ReactionsGiven(Metric):
+    """Reactions given per actor (scripts/reactionsgiven.py)."""
+    output_file = "actor_reactions_count.csv"
+    fieldnames = ("Actor Name", "Reactions Given")
+
+    def __init__(self):
+        self.given = Counter()
+
+    def add(self, message):
+        for reaction in message.get("reactions", []):
+            self.given[reaction.get("actor", "Unknown")] += 1
+
+    def rows(self):
+        for actor, count in sorted(self.given.items(), key=lambda x: x[1], reverse=True):
+            yield {"Actor Name": actor, "Reactions Given": count}
+
+
+class BruceQuotient(Metric):
+    """Reactions per message sent (scripts/reactionspermessage.py)."""
+    output_file = "bruce_quotient.csv"
+    fieldnames = ("Sender Name", "Normalized Reactions")
+
+    def __init__(self):
+        self.reactions = Counter()
+        self.messages = Counter()
+
+    def counts(self, message):
+        return True
+
+    def add(self, message):
+        if self.counts(message):
+            sender_name = message.get("sender_name", "Unknown")
+            self.messages[sender_name] += 1
+            self.reactions[sender_name] += len(message.get("reactions", []))
+
+    def rows(self):
+        normalized = [
+            {"Sender Name": sender, "Normalized Reactions": self.reactions[sender] / count}
+            for sender, count in self.messages.items() if count > 0
+        ]
+        return sorted(normalized, key=lambda x: x["Normalized Reactions"], reverse=True)
+
+
+class BruceQuotientAnthonyVariant(BruceQuotient):
+    """Reactions per message, counting only messages that got any (scripts/reactionspermessage_onlyreactions.py)."""
+    output_file = "bruce_quotient_anthony_variant.csv"
+
+    def counts(self, message):
+        return len(message.get("reactions", [])) > 0
+
+
+class ReactionEmojiCounts(Metric):
+    """How often each reaction emoji was used, any leftover mojibake folded in (scripts/angryversus100.py)."""
+    output_file = "reaction_emoji_counts.csv"
+    fieldnames = ("Reaction", "Count")
+
+    def __init__(self):
+        self.emojis = Counter()
+
+    def add(self, message):
+        for reaction in message.get("reactions", []):
+            self.emojis[repair_text(reaction.get("reaction"))] += 1
+
+    def rows(self):
+        for reaction, count in self.emojis.most_common():
+            yield {"Reaction": reaction, "Count": count}
+
+
+class UnsentCount(Metric):
+    """Messages flagged is_unsent_image_by_messenger_kid_parent, per sender (scripts/unsent.py)."""
+    output_file = "unsent_counts.csv"
+    fieldnames = ("Sender Name", "Unsent Images")
+
+    def __init__(self):
+        self.unsent = Counter()
+
+    def add(self, message):
+        if message.get("is_unsent_image_by_messenger_kid_parent", False) == True:
+            self.unsent[message.get("sender_name", "Unknown")] += 1
+
+    def rows(self):
+        for sender, count in sorted(self.unsent.items(), key=lambda x: x[1], reverse=True):
+            yield {"Sender Name": sender, "Unsent Images": count}
+
+
+DEFAULT_METRICS = (WordCount, ReactionsReceived, ReactionsGiven, BruceQuotient,
+                   BruceQuotientAnthonyVariant, ReactionEmojiCounts, UnsentCount)
+
+
+def accumulate(messages, metric_types=DEFAULT_METRICS):
+    """Feeds each message to every metric in a single pass. Returns the metric instances."""
+    metrics = [metric_type() for metric_type in metric_types]
+    for message in messages:
+        for metric in metrics:
+            metric.add(message)
+    return metrics
+
+
+def accumulate_file(file_name, metric_types=DEFAULT_METRICS):
+    """Streams one export file through the metrics; unreadable files count as empty."""
+    try:
+        return accumulate(iter_messages(file_name), metric_types)
+    except FileNotFoundError:
+        logging.error(f"❌ File not found: {file_name}")
+    except json.JSONDecodeError:
+        logging.error(f"❌ Error reading JSON in file: {file_name}")
+    return accumulate([], metric_types)
+
+
+def merge_all(partials, metric_types=DEFAULT_METRICS):
+    """Merges per-file metric lists into one list of metrics."""
+    totals = [metric_type() for metric_type in metric_types]
+    for metrics in partials:
+        for total, metric in zip(totals, metrics):
+            total.merge(metric)
+    return totals
+
+
+def compute_kpis(file_names, metric_types=DEFAULT_METRICS, workers=None):
+    """
+    Computes every metric over the export files, one file per task across a process pool.
+    Each file is parsed once no matter how many metrics are requested.
+    """
+    workers = workers or min(len(file_names), os.cpu_count() or 1) or 1
+    if workers == 1:
+        partials = [accumulate_file(file_name, metric_types) for file_name in file_names]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(accumulate_file, file_names, [metric_types] * len(file_names)))
+    return merge_all(partials, metric_types)
+
+
+def compute_from_source(folder_path, store_path=None, metric_types=DEFAULT_METRICS, workers=None):
+    """
+    Computes metrics from the columnar store when store_path has been built, otherwise from
+    the message_*.json files in folder_path.
+    """
+    if store_path and store_exists(store_path):
+        return accumulate(message_records(store_path), metric_types)
+    file_names = sorted(glob.glob(os.path.join(folder_path, "message_*.json")))
+    return compute_kpis(file_names, metric_types, workers)
+
+
+def write_csvs(metrics, output_dir):
+    """Writes each metric to output_dir/<metric.output_file>. Returns the paths written."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for metric in metrics:
+        path = os.path.join(output_dir, metric.output_file)
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=metric.fieldnames)
+            writer.writeheader()
+            writer.writerows(metric.rows())
+        paths.append(path)
+    return paths
@@ -0,0 +1,210 @@
+# utils/media_cache.py
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+import requests
+
+# A local disk cache for the merged audio/video files in the bucket. Nothing is fetched until a
+# file is actually asked for; the download is streamed to disk in chunks (never held in memory)
+# and an interrupted download resumes with an HTTP Range request. Finished files are stored
+# under their sha256, so the same bytes behind two URLs are kept once, and the least recently
+# used files are evicted once the cache grows past max_bytes. Cached files can be read back
+# whole or as byte ranges for Range-aware serving. A URL's object is assumed not to change once
+# cached (the bucket files are rebuilt under new names); evict it to pick up a new version.
+
+CHUNK_SIZE = 1024 * 1024
+
+INDEX_DDL = """
+    CREATE TABLE IF NOT EXISTS media (
+        url TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        etag TEXT,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_media_last_used ON media (last_used);
+"""
+
+RANGE_HEADER = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    Parses a single-range Range header ("bytes=0-99", "bytes=100-", "bytes=-100") against a
+    file of size bytes. Returns inclusive (start, end), or None for no/unsupported header.
+    Raises ValueError if the range cannot be satisfied.
+    """
+    match = RANGE_HEADER.match(header.strip()) if header else None
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {header!r} not satisfiable for {size} bytes")
+    return start, end
+
+
+class MediaCache:
+    """Content-addressed, size-bounded disk cache of remote media files, keyed by URL."""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3, session=None, timeout_s=30.0, chunk_size=CHUNK_SIZE):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.partial_dir = os.path.join(cache_dir, "partial")
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self.timeout_s = timeout_s
+        self.chunk_size = chunk_size
+        self._url_locks = {}
+        self._locks_lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(INDEX_DDL)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite3"))) as conn:
+            with conn:
+                yield conn
+
+    def _lock_for(self, url):
+        with self._locks_lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest)
+
+    def _partial_path(self, url):
+        return os.path.join(self.partial_dir, hashlib.sha256(url.encode()).hexdigest())
+
+    def cached_path(self, url):
+        """Path of the cached copy of url, or None if it has not been fetched."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT digest FROM media WHERE url = ?", (url,)).fetchone()
+            if row is None or not os.path.exists(self._object_path(row[0])):
+                return None
+            conn.execute("UPDATE media SET last_used = ? WHERE url = ?", (time.time(), url))
+        return self._object_path(row[0])
+
+    def _download(self, url):
+        """Streams url into its partial file, resuming from whatever is already there. Returns the etag."""
+        partial = self._partial_path(url)
+        have = os.path.getsize(partial) if os.path.exists(partial) else 0
+        headers = {}
+        if have:
+            headers["Range"] = f"bytes={have}-"
+            if os.path.exists(partial + ".etag"):
+                # Only resume if the object is unchanged; otherwise the server sends it whole
+                with open(partial + ".etag", encoding="utf-8") as file:
+                    headers["If-Range"] = file.read()
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout_s) as response:
+            if response.status_code == 416 and have:
+                # Already have every byte (the previous attempt died after the body)
+                return response.headers.get("ETag")
+            response.raise_for_status()
+            resumed = response.status_code == 206
+            if have and not resumed:
+                logging.info(f"↩️ Could not resume {url}; restarting the download.")
+            etag = response.headers.get("ETag")
+            if etag and not resumed:
+                with open(partial + ".etag", "w", encoding="utf-8") as file:
+                    file.write(etag)
+            with open(partial, "ab" if resumed else "wb") as file:
+                for chunk in response.iter_content(self.chunk_size):
+                    file.write(chunk)
+            return etag
+
+    def fetch(self, url):
+        """Returns the local path of url, downloading it first if it is not cached."""
+        path = self.cached_path(url)
+        if path is not None:
+            return path
+
+        with self._lock_for(url):
+            path = self.cached_path(url)  # Another thread may have finished it meanwhile
+            if path is not None:
+                return path
+
+            etag = self._download(url)
+            partial = self._partial_path(url)
+            digest, size = hashlib.sha256(), 0
+            with open(partial, "rb") as file:
+                while chunk := file.read(self.chunk_size):
+                    digest.update(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+
+            path = self._object_path(digest)
+            if os.path.exists(path):
+                os.remove(partial)
+            else:
+                os.replace(partial, path)
+            if os.path.exists(partial + ".etag"):
+                os.remove(partial + ".etag")
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO media (url, digest, size, etag, last_used) VALUES (?, ?, ?, ?, ?)",
+                             (url, digest, size, etag, time.time()))
+            logging.info(f"📥 Cached {url} ({size:,} bytes).")
+
+        self.evict(keep=digest)
+        return path
+
+    def open(self, url):
+        """Opens the cached copy of url for binary reading, fetching it on first use."""
+        return open(self.fetch(url), "rb")
+
+    def read_range(self, url, start=0, end=None):
+        """Yields the bytes start..end (inclusive) of url's cached copy in chunk_size pieces."""
+        with self.open(url) as file:
+            file.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = file.read(self.chunk_size if remaining is None else min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def total_bytes(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM media)").fetchone()[0]
+
+    def evict(self, keep=None):
+        """Deletes least recently used files until the cache fits in max_bytes. Returns bytes freed."""
+        freed = 0
+        with self._connect() as conn:
+            # One row per stored object, with the latest use across every URL pointing at it
+            objects = conn.execute(
+                "SELECT digest, size FROM media GROUP BY digest, size ORDER BY MAX(last_used)"
+            ).fetchall()
+            total = sum(size for _, size in objects)
+            for digest, size in objects:
+                if total <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                try:
+                    os.remove(self._object_path(digest))
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM media WHERE digest = ?", (digest,))
+                total -= size
+                freed += size
+        if freed:
+            logging.info(f"🧹 Evicted {freed:,} bytes of cached media.")
+        return freed
@@ -0,0 +1,105 @@
+# utils/message_stats.py
+
+import logging
+import emoji
+from psycopg2.extras import execute_values
+
+# Per-message numbers the dashboards aggregate (word_count, char_length, emoji_count), computed
+# once in Python as messages are loaded and stored on the messages row, so charts SUM/AVG stored
+# integers instead of re-deriving them from content on every render. Messages without text keep
+# NULLs, so AVG() is taken over text messages only.
+#
+# Words are whitespace-separated tokens (str.split, so runs of spaces, tabs and newlines count
+# once), the same rule the KPI scripts and rollup_frame use. Characters are code points, as
+# Postgres char_length() counts them. Emoji are counted with the emoji package, so a ZWJ
+# sequence or a skin-toned emoji is one emoji, not several code points.
+
+STATS_COLUMNS = ("word_count", "char_length", "emoji_count")
+
+STATS_DDL = """
+    ALTER TABLE messages ADD COLUMN IF NOT EXISTS word_count INTEGER,
+                         ADD COLUMN IF NOT EXISTS char_length INTEGER,
+                         ADD COLUMN IF NOT EXISTS emoji_count INTEGER;
+
+    -- Per-sender totals read from the index alone
+    CREATE INDEX IF NOT EXISTS idx_messages_sender_stats
+        ON messages (sender_id) INCLUDE (word_count, char_length, emoji_count);
+
+    -- Rows loaded before the columns existed (or by an older loader); empty once backfilled
+    CREATE INDEX IF NOT EXISTS idx_messages_stats_pending
+        ON messages (id) WHERE content IS NOT NULL AND word_count IS NULL;
+"""
+
+PENDING_SQL = """
+    SELECT id, content
+      FROM messages
+     WHERE content IS NOT NULL AND word_count IS NULL
+     ORDER BY id
+     LIMIT %s;
+"""
+
+# Keyset over every text message, for recomputing after content has been rewritten
+ALL_SQL = """
+    SELECT id, content
+      FROM messages
+     WHERE content IS NOT NULL AND id > %s
+     ORDER BY id
+     LIMIT %s;
+"""
+
+UPDATE_SQL = """
+    UPDATE messages AS m
+       SET word_count = v.word_count, char_length = v.char_length, emoji_count = v.emoji_count
+      FROM (VALUES %s) AS v (id, word_count, char_length, emoji_count)
+     WHERE m.id = v.id
+"""
+
+
+def count_words(text):
+    return len(text.split()) if text else 0
+
+
+def message_stats(text):
+    """Returns (word_count, char_length, emoji_count) for a message text, or Nones if it has none."""
+    if not isinstance(text, str):
+        return None, None, None
+    return count_words(text), len(text), emoji.emoji_count(text)
+
+
+def ensure_message_stats(cursor):
+    """Adds the derived columns and their indexes to messages if needed."""
+    cursor.execute(STATS_DDL)
+
+
+def _store(cursor, rows):
+    execute_values(
+        cursor, UPDATE_SQL,
+        [(row_id, *message_stats(text)) for row_id, text in rows],
+        page_size=1000
+    )
+
+
+def fill_pending_stats(cursor, chunk_size=20000, full=False):
+    """
+    Computes the derived columns for text messages that do not have them yet, chunk_size rows
+    at a time. full=True recomputes every text message (after content has been rewritten).
+    Returns the number of messages updated.
+    """
+    ensure_message_stats(cursor)
+    updated, last_id = 0, 0
+    while True:
+        if full:
+            cursor.execute(ALL_SQL, (last_id, chunk_size))
+        else:
+            cursor.execute(PENDING_SQL, (chunk_size,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        _store(cursor, rows)
+        updated += len(rows)
+        last_id = rows[-1][0]
+        if len(rows) < chunk_size:
+            break
+
+    logging.info(f"🔢 Computed word, character and emoji counts for {updated} messages.")
+    return updated
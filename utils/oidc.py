@@ -0,0 +1,95 @@
+# utils/oidc.py
+
+import logging
+import threading
+import time
+
+import jwt
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# OAuth sign-in helpers for auth_backend.py. One keep-alive requests.Session is shared by every
+# request to the provider, so the token exchange reuses an open TLS connection. The ID token
+# that comes back with it is verified locally against the provider's signing keys (JWKS), which
+# are cached and refreshed periodically, so no userinfo round trip is needed after the exchange.
+
+# Profile claims kept from the ID token; the same fields the userinfo endpoint returns
+PROFILE_CLAIMS = ("sub", "email", "email_verified", "name", "given_name", "family_name", "picture", "locale", "hd")
+
+
+def make_session(pool_maxsize=10, retries=2):
+    """A requests.Session with a keep-alive connection pool and retries on connection errors."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, connect=retries, read=0, backoff_factor=0.2, allowed_methods=None)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class JWKSCache:
+    """
+    The provider's public signing keys, fetched over session and kept for refresh_s seconds.
+    A token signed with a key id that is not cached triggers an early refetch (the provider
+    rotated its keys), at most once every min_refresh_s so bad tokens cannot hammer it.
+    """
+
+    def __init__(self, session, jwks_url, refresh_s=3600.0, min_refresh_s=60.0, timeout_s=5.0, clock=time.monotonic):
+        self.session = session
+        self.jwks_url = jwks_url
+        self.refresh_s = refresh_s
+        self.min_refresh_s = min_refresh_s
+        self.timeout_s = timeout_s
+        self._clock = clock
+        self._keys = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def _fetch(self):
+        response = self.session.get(self.jwks_url, timeout=self.timeout_s)
+        response.raise_for_status()
+        key_set = jwt.PyJWKSet.from_dict(response.json())
+        self._keys = {key.key_id: key for key in key_set.keys}
+        self._fetched_at = self._clock()
+        logging.info(f"🔑 Fetched {len(self._keys)} signing keys from {self.jwks_url}.")
+
+    def get_key(self, key_id):
+        """Returns the PyJWK for key_id, fetching the key set if it is stale or lacks that key."""
+        with self._lock:
+            now = self._clock()
+            stale = self._fetched_at is None or now - self._fetched_at >= self.refresh_s
+            missing = key_id not in self._keys
+            may_refetch = self._fetched_at is None or now - self._fetched_at >= self.min_refresh_s
+            if stale or (missing and may_refetch):
+                self._fetch()
+            key = self._keys.get(key_id)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {key_id!r}")
+        return key
+
+
+def verify_id_token(id_token, jwks, audience, issuers, leeway_s=60):
+    """
+    Checks an ID token's signature, audience, issuer and expiry against the cached keys and
+    returns its claims. Raises jwt.InvalidTokenError if any check fails.
+    """
+    header = jwt.get_unverified_header(id_token)
+    key = jwks.get_key(header.get("kid"))
+    return jwt.decode(
+        id_token,
+        key.key,
+        algorithms=[key.algorithm_name or "RS256"],
+        audience=audience,
+        issuer=list(issuers),
+        leeway=leeway_s,
+        options={"require": ["exp", "iat", "iss", "aud", "sub"]}
+    )
+
+
+def profile_from_claims(claims):
+    """The user profile stored in the session, taken from verified ID token claims."""
+    return {claim: claims[claim] for claim in PROFILE_CLAIMS if claim in claims}
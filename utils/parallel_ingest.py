@@ -0,0 +1,143 @@
+# utils/parallel_ingest.py
+
+import os
+import json
+import logging
+import psycopg2
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.copy_loader import ensure_participants, load_messages
+from utils.ingest_manifest import file_sha256, plan_files, record_file
+from utils.message_stats import fill_pending_stats
+from utils.rollups import refresh_rollups
+from utils.schema import bump_data_version, ensure_schema
+from utils.sentiment import score_pending
+from utils.stream_reader import batched, iter_messages, read_participants
+from utils.token_index import refresh_token_index
+
+# Each worker process keeps its own connection for its whole lifetime.
+_worker_conn = None
+
+# Messages staged per COPY round; bounds a worker's memory however large the export file is
+LOAD_BATCH_SIZE = 50_000
+
+
+def _init_worker(db_config):
+    """Opens the per-worker database connection."""
+    global _worker_conn
+    _worker_conn = psycopg2.connect(**db_config)
+
+
+def scan_participants(file_name):
+    """Returns the participant names listed in one export file, reading no further than its participants."""
+    try:
+        participants = read_participants(file_name)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logging.error(f"❌ Error reading {file_name}: {e}")
+        return set()
+    return {participant["name"] for participant in participants}
+
+
+def load_file(file_name, sha256):
+    """
+    Streams one export file into the database over this worker's connection, LOAD_BATCH_SIZE
+    messages at a time, in a single transaction that also records it in the ingest manifest.
+    Returns the (messages, reactions, media) rows staged and the earliest timestamp_ms changed.
+    """
+    counts = [0, 0, 0]
+    high_water_ms, message_count, earliest = None, 0, []
+    try:
+        with _worker_conn.cursor() as cursor:
+            for batch in batched(iter_messages(file_name), LOAD_BATCH_SIZE):
+                message_count += len(batch)
+                newest = max(message["timestamp_ms"] for message in batch)
+                high_water_ms = newest if high_water_ms is None else max(high_water_ms, newest)
+                batch_counts, batch_earliest = load_messages(cursor, batch)
+                for i, count in enumerate(batch_counts):
+                    counts[i] += count
+                if batch_earliest is not None:
+                    earliest.append(batch_earliest)
+            if not message_count:
+                raise ValueError("no messages")
+            record_file(cursor, file_name, sha256, high_water_ms=high_water_ms, message_count=message_count)
+        _worker_conn.commit()
+    except Exception:
+        _worker_conn.rollback()
+        raise
+    return tuple(counts), min(earliest, default=None)
+
+
+def ingest_files(file_names, db_config, workers=None, full_reload=False):
+    """
+    Loads export files in parallel. Files whose content hash is already in the ingest manifest
+    are skipped unless full_reload is set; every message of a pending file is staged, whatever
+    its age, and the natural key keeps messages already in the table from loading twice. Participants from every pending file are inserted once up front, then a
+    pool of workers parses files and COPYs them in, each on its own connection.
+    Returns the number of files that loaded successfully.
+    """
+    workers = workers or os.cpu_count() or 1
+    loaded = 0
+    # Earliest message each file inserted or changed; derived tables are refreshed from that day
+    earliest = []
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        with conn.cursor() as cursor:
+            ensure_schema(cursor)
+            if full_reload:
+                pending = [(file_name, file_sha256(file_name)) for file_name in file_names]
+            else:
+                pending = plan_files(cursor, file_names)
+        conn.commit()
+    finally:
+        conn.close()
+
+    logging.info(f"📋 {len(pending)} of {len(file_names)} files need loading.")
+    if not pending:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_config,)) as pool:
+        # Resolve every participant before any worker needs to join against them
+        names = set().union(*pool.map(scan_participants, [file_name for file_name, _ in pending]))
+        conn = psycopg2.connect(**db_config)
+        try:
+            with conn.cursor() as cursor:
+                ensure_participants(cursor, names)
+            conn.commit()
+        finally:
+            conn.close()
+        logging.info(f"✅ Resolved {len(names)} participants across {len(pending)} files.")
+
+        futures = {
+            pool.submit(load_file, file_name, sha256): file_name
+            for file_name, sha256 in pending
+        }
+        for future in as_completed(futures):
+            file_name = futures[future]
+            try:
+                (message_count, reaction_count, media_count), file_earliest = future.result()
+            except Exception as e:
+                logging.error(f"❌ Error processing {file_name}: {e}")
+                continue
+            loaded += 1
+            if file_earliest is not None:
+                earliest.append(file_earliest)
+            logging.info(f"✅ Processed file: {file_name} ({message_count} messages, {reaction_count} reactions, {media_count} media)")
+
+    if loaded:
+        conn = psycopg2.connect(**db_config)
+        try:
+            with conn.cursor() as cursor:
+                # Score new texts and backfill any message counts first so the refreshed rollups include them
+                score_pending(cursor, workers=workers)
+                fill_pending_stats(cursor)
+                changed_from_ms = min(earliest, default=None)
+                refresh_rollups(cursor, changed_from_ms=changed_from_ms)
+                refresh_token_index(cursor, changed_from_ms=changed_from_ms)
+                version = bump_data_version(cursor)
+            conn.commit()
+        finally:
+            conn.close()
+        logging.info(f"🔖 Data version is now {version}.")
+
+    return loaded
@@ -0,0 +1,64 @@
+# utils/queries.py
+
+from datetime import date, datetime, time, timedelta, timezone
+
+
+def to_epoch_ms(value):
+    """Converts a date or datetime to epoch milliseconds. Dates and naive datetimes are taken as UTC."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def date_bounds_ms(start, end):
+    """
+    Converts a date range to a half-open [start_ms, end_ms) pair of epoch milliseconds.
+    A plain date as the end covers that whole day.
+    """
+    if isinstance(end, date) and not isinstance(end, datetime):
+        end = end + timedelta(days=1)
+    return to_epoch_ms(start), to_epoch_ms(end)
+
+
+def timestamp_filter(start, end, column="messages.timestamp_ms"):
+    """
+    Builds a sargable WHERE fragment on a raw millisecond column, so the timestamp index
+    can be used instead of evaluating to_timestamp() on every row.
+    Returns (sql, params).
+    """
+    start_ms, end_ms = date_bounds_ms(start, end)
+    return f"{column} >= %s AND {column} < %s", [start_ms, end_ms]
+
+
+MESSAGE_PAGE_SQL = """
+    SELECT m.id, m.timestamp_ms, p.name AS sender_name, m.content
+      FROM messages m
+      JOIN participants p ON m.sender_id = p.id
+     WHERE m.content IS NOT NULL{keyset}
+     ORDER BY m.timestamp_ms {order}, m.id {order}
+     LIMIT %s;
+"""
+
+
+def message_page_query(anchor=None, direction="older", limit=50):
+    """
+    Builds a keyset-paginated message query on (timestamp_ms, id), so fetching any page costs
+    the same as fetching the first. anchor is the (timestamp_ms, id) to continue from, exclusive;
+    None starts at the newest message. "older" returns rows newest first, "newer" oldest first.
+    Returns (sql, params).
+    """
+    if direction not in ("older", "newer"):
+        raise ValueError(f"direction must be 'older' or 'newer', not {direction!r}")
+    keyset, params = "", []
+    if anchor is not None:
+        keyset = f" AND (m.timestamp_ms, m.id) {'<' if direction == 'older' else '>'} (%s, %s)"
+        params = [int(anchor[0]), int(anchor[1])]
+    order = "DESC" if direction == "older" else "ASC"
+    return MESSAGE_PAGE_SQL.format(keyset=keyset, order=order), params + [int(limit)]
+
+
+def date_anchor(day):
+    """Keyset anchor that makes an "older" page start with the last message sent on day (UTC)."""
+    return date_bounds_ms(day, day)[1], 0
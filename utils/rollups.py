@@ -0,0 +1,149 @@
+# utils/rollups.py
+
+import logging
+import pandas as pd
+
+# Pre-aggregated activity per sender, UTC day and hour. Weekday is ISO (1 = Monday .. 7 = Sunday).
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS message_rollups (
+        sender_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        weekday SMALLINT NOT NULL,
+        hour SMALLINT NOT NULL,
+        message_count INTEGER NOT NULL,
+        text_message_count INTEGER NOT NULL,
+        word_count BIGINT NOT NULL,
+        reaction_count BIGINT NOT NULL,
+        sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        sentiment_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, sender_id, hour)
+    );
+
+    -- Sentiment scores keyed by md5(content), filled by the sentiment scorer
+    CREATE TABLE IF NOT EXISTS message_sentiment (
+        content_hash TEXT PRIMARY KEY,
+        polarity DOUBLE PRECISION NOT NULL,
+        subjectivity DOUBLE PRECISION NOT NULL
+    );
+"""
+
+# Rebuilds every rollup row from from_day onwards. A load can insert messages of any age (an
+# export of older history, a file that failed before), so loaders pass the earliest timestamp
+# they changed and the refresh starts from that day or the last rolled-up day, whichever is
+# earlier. Word counts are the stored per-message column (utils/message_stats.py), so fill_pending_stats
+# runs before a refresh.
+REFRESH_SQL = """
+    DELETE FROM message_rollups WHERE day >= %(from_day)s;
+
+    WITH msg AS (
+        SELECT m.id, m.sender_id, m.content, m.word_count,
+               to_timestamp(m.timestamp_ms / 1000.0) AT TIME ZONE 'UTC' AS ts
+          FROM messages m
+         WHERE m.sender_id IS NOT NULL
+           AND m.timestamp_ms >= %(from_ms)s
+    ),
+    reaction_totals AS (
+        SELECT r.message_id, COUNT(*) AS n
+          FROM reactions r
+          JOIN msg ON msg.id = r.message_id
+         GROUP BY r.message_id
+    )
+    INSERT INTO message_rollups (sender_id, day, weekday, hour, message_count, text_message_count,
+                                 word_count, reaction_count, sentiment_sum, sentiment_count)
+    SELECT msg.sender_id,
+           msg.ts::date,
+           EXTRACT(ISODOW FROM msg.ts)::smallint,
+           EXTRACT(HOUR FROM msg.ts)::smallint,
+           COUNT(*),
+           COUNT(msg.content),
+           COALESCE(SUM(msg.word_count), 0),
+           COALESCE(SUM(rt.n), 0),
+           COALESCE(SUM(s.polarity), 0),
+           COUNT(s.polarity)
+      FROM msg
+      LEFT JOIN reaction_totals rt ON rt.message_id = msg.id
+      LEFT JOIN message_sentiment s ON s.content_hash = md5(msg.content)
+     GROUP BY 1, 2, 3, 4;
+"""
+
+
+def ensure_rollups(cursor):
+    """Creates the rollup and sentiment tables if needed."""
+    cursor.execute(ROLLUP_DDL)
+
+
+def utc_day(timestamp_ms):
+    """The UTC date of an epoch-millisecond timestamp."""
+    return pd.Timestamp(timestamp_ms, unit="ms", tz="UTC").date()
+
+
+def refresh_window(cursor, table, full=False, changed_from_ms=None):
+    """
+    Picks the first day of table to recompute: the last day it already holds, moved back to the
+    day of changed_from_ms (the earliest message a load inserted or changed) if that is earlier.
+    Returns (from_day, params for the refresh SQL); from_day is None for a full rebuild.
+    """
+    from_day = None
+    if not full:
+        cursor.execute(f"SELECT max(day) FROM {table};")
+        from_day = cursor.fetchone()[0]
+        if from_day is not None and changed_from_ms is not None:
+            from_day = min(from_day, utc_day(changed_from_ms))
+
+    if from_day is None:
+        return None, {"from_day": "-infinity", "from_ms": -2 ** 63}
+    from_ms = int(pd.Timestamp(from_day, tz="UTC").timestamp() * 1000)
+    return from_day, {"from_day": from_day, "from_ms": from_ms}
+
+
+def refresh_rollups(cursor, full=False, changed_from_ms=None):
+    """
+    Brings message_rollups up to date. By default only the last rolled-up day and anything
+    after it are recomputed, reaching back to the day of changed_from_ms when a load added
+    older messages; full=True rebuilds the whole table.
+    Returns the first day that was recomputed (None for a full rebuild).
+    """
+    ensure_rollups(cursor)
+
+    from_day, params = refresh_window(cursor, "message_rollups", full, changed_from_ms)
+
+    cursor.execute(REFRESH_SQL, params)
+    logging.info(f"📈 Refreshed message rollups from {from_day or 'the beginning'}.")
+    return from_day
+
+
+def rollup_frame(df):
+    """
+    Builds the same per sender/day/hour rollup in pandas for data loaded from export files.
+    Expects sender_name and timestamp_ms columns; content and reactions are optional.
+    """
+    ts = pd.to_datetime(df["timestamp_ms"], unit="ms", utc=True)
+    content = df["content"] if "content" in df else pd.Series(None, index=df.index, dtype=object)
+    reactions = df["reactions"] if "reactions" in df else pd.Series(None, index=df.index, dtype=object)
+
+    frame = pd.DataFrame({
+        "sender_name": df["sender_name"],
+        "day": ts.dt.date,
+        "weekday": ts.dt.dayofweek + 1,
+        "hour": ts.dt.hour,
+        "message_count": 1,
+        "text_message_count": content.notna().astype(int),
+        "word_count": content.where(content.map(lambda x: isinstance(x, str)), "").str.split().str.len(),
+        "reaction_count": reactions.map(lambda x: len(x) if isinstance(x, list) else 0),
+    })
+
+    return frame.groupby(["sender_name", "day", "weekday", "hour"], as_index=False).sum()
+
+
+WEEKDAY_NAMES = {1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday", 5: "Friday", 6: "Saturday", 7: "Sunday"}
+
+
+def heatmap_table(rollups, value="text_message_count"):
+    """Pivots rollup rows into a weekday x hour table for the activity heatmap."""
+    table = rollups.pivot_table(index="weekday", columns="hour", values=value, aggfunc="sum").fillna(0)
+    return table.rename(index=WEEKDAY_NAMES)
+
+
+def daily_counts(rollups, value="message_count"):
+    """Sums rollup rows per day, returning a Series indexed by date."""
+    return rollups.groupby("day")[value].sum().sort_index()
@@ -0,0 +1,139 @@
+# utils/schema.py
+
+import logging
+
+from utils.encoding import repair_stored_text
+from utils.message_stats import ensure_message_stats, fill_pending_stats
+from utils.rollups import ensure_rollups, refresh_rollups
+from utils.search import ensure_search
+from utils.sentiment import score_pending
+from utils.token_index import ensure_token_index, refresh_token_index
+
+# Base tables, for a fresh database; existing deployments already have them
+TABLES_DDL = """
+    CREATE TABLE IF NOT EXISTS participants (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        id SERIAL PRIMARY KEY,
+        sender_id INTEGER REFERENCES participants (id),
+        timestamp_ms BIGINT NOT NULL,
+        content TEXT,
+        is_geoblocked_for_viewer BOOLEAN DEFAULT FALSE,
+        is_unsent_image_by_messenger_kid_parent BOOLEAN DEFAULT FALSE
+    );
+    CREATE TABLE IF NOT EXISTS reactions (
+        id SERIAL PRIMARY KEY,
+        message_id INTEGER REFERENCES messages (id),
+        reaction TEXT,
+        actor_id INTEGER REFERENCES participants (id)
+    );
+    CREATE TABLE IF NOT EXISTS media (
+        id SERIAL PRIMARY KEY,
+        message_id INTEGER REFERENCES messages (id),
+        media_uri TEXT,
+        creation_timestamp BIGINT
+    );
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL,
+        name TEXT
+    );
+"""
+
+# Covering indexes for the dashboard access patterns. Date filters compare raw timestamp_ms
+# against millisecond bounds (see utils/queries.py), so these are usable for range scans.
+# (timestamp_ms, id) is also the keyset the chat log browser pages on.
+INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_messages_timestamp_id_cover ON messages (timestamp_ms, id) INCLUDE (sender_id);
+    DROP INDEX IF EXISTS idx_messages_timestamp_cover;
+    DROP INDEX IF EXISTS idx_messages_timestamp;
+    CREATE INDEX IF NOT EXISTS idx_reactions_message_cover ON reactions (message_id) INCLUDE (actor_id, reaction);
+    DROP INDEX IF EXISTS idx_reactions_message_id;
+    CREATE INDEX IF NOT EXISTS idx_media_message_id ON media (message_id);
+"""
+
+# One row per export file that has been loaded, keyed by its content hash
+MANIFEST_DDL = """
+    CREATE TABLE IF NOT EXISTS ingest_manifest (
+        sha256 TEXT PRIMARY KEY,
+        file_path TEXT NOT NULL,
+        high_water_ms BIGINT,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+
+# Earlier loaders re-inserted every message on each run. Keep the oldest copy of each
+# (sender_id, timestamp_ms) and drop the duplicates along with their reactions and media.
+DEDUPE_SQL = """
+    CREATE TEMP TABLE duplicate_messages ON COMMIT DROP AS
+    SELECT id FROM (
+        SELECT id, row_number() OVER (PARTITION BY sender_id, timestamp_ms ORDER BY id) AS copy_number
+          FROM messages
+    ) numbered
+    WHERE copy_number > 1;
+
+    DELETE FROM reactions WHERE message_id IN (SELECT id FROM duplicate_messages);
+    DELETE FROM media WHERE message_id IN (SELECT id FROM duplicate_messages);
+    DELETE FROM messages WHERE id IN (SELECT id FROM duplicate_messages);
+"""
+
+# A single-row counter bumped after every load; the dashboards fold it into their cache keys
+DATA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    INSERT INTO data_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+"""
+
+NATURAL_KEY_DDL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_messages_sender_timestamp
+        ON messages (sender_id, timestamp_ms) NULLS NOT DISTINCT;
+"""
+
+
+def has_index(cursor, index_name):
+    """Checks whether an index exists in the current schema."""
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL;", (index_name,))
+    return cursor.fetchone()[0]
+
+
+def ensure_schema(cursor):
+    """
+    Creates the tables, indexes, natural key and manifest the loaders and dashboards rely on,
+    and repairs any mojibake stored before ingest-time repair so new loads match stored names.
+    """
+    cursor.execute(TABLES_DDL)
+    cursor.execute(INDEX_DDL)
+    cursor.execute(MANIFEST_DDL)
+    cursor.execute(DATA_VERSION_DDL)
+    ensure_message_stats(cursor)
+    ensure_rollups(cursor)
+    ensure_token_index(cursor)
+    ensure_search(cursor)
+
+    if not has_index(cursor, "uq_messages_sender_timestamp"):
+        cursor.execute(DEDUPE_SQL)
+        cursor.execute("SELECT count(*) FROM duplicate_messages;")
+        logging.info(f"🧹 Removed {cursor.fetchone()[0]} duplicate messages before adding the natural key.")
+        cursor.execute(NATURAL_KEY_DDL)
+
+    if repair_stored_text(cursor):
+        # Repaired text hashes and counts differently: rebuild everything derived from it
+        score_pending(cursor)
+        fill_pending_stats(cursor, full=True)
+        refresh_rollups(cursor, full=True)
+        refresh_token_index(cursor, full=True)
+        bump_data_version(cursor)
+
+
+def bump_data_version(cursor):
+    """Marks the data as changed so cached dashboard queries are recomputed."""
+    cursor.execute(DATA_VERSION_DDL)
+    cursor.execute("UPDATE data_version SET version = version + 1, updated_at = now() RETURNING version;")
+    return cursor.fetchone()[0]
@@ -0,0 +1,174 @@
+# utils/search.py
+
+import heapq
+import math
+from collections import defaultdict
+
+from utils.token_index import tokenize
+
+# Message search, two ways. In Postgres a generated tsvector column with a GIN index answers
+# word queries (ranked with ts_rank_cd) and a pg_trgm GIN index answers substring queries, so
+# neither is a sequential scan. For dashboards that read the export files, InvertedIndex does
+# the same in memory. Both take sender and date filters and return one page at a time plus a
+# flag saying whether there is another.
+
+MODES = ("words", "substring")
+
+# Open-ended date filters compare against these instead of branching the SQL
+MIN_MS, MAX_MS = -2 ** 63, 2 ** 63 - 1
+
+SEARCH_DDL = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    ALTER TABLE messages ADD COLUMN IF NOT EXISTS content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED;
+    CREATE INDEX IF NOT EXISTS idx_messages_content_tsv ON messages USING GIN (content_tsv);
+    CREATE INDEX IF NOT EXISTS idx_messages_content_trgm ON messages USING GIN (content gin_trgm_ops);
+"""
+
+SEARCH_WORDS_SQL = """
+    SELECT m.id, m.timestamp_ms, p.name AS sender_name, m.content, ts_rank_cd(m.content_tsv, q) AS rank
+      FROM messages m
+      JOIN participants p ON m.sender_id = p.id
+     CROSS JOIN websearch_to_tsquery('english', %(query)s) AS q
+     WHERE m.content_tsv @@ q
+       AND (%(senders)s::text[] IS NULL OR p.name = ANY(%(senders)s::text[]))
+       AND m.timestamp_ms >= %(start_ms)s AND m.timestamp_ms < %(end_ms)s
+     ORDER BY rank DESC, m.timestamp_ms DESC, m.id DESC
+     LIMIT %(limit)s OFFSET %(offset)s;
+"""
+
+SEARCH_SUBSTRING_SQL = """
+    SELECT m.id, m.timestamp_ms, p.name AS sender_name, m.content, NULL::real AS rank
+      FROM messages m
+      JOIN participants p ON m.sender_id = p.id
+     WHERE m.content ILIKE %(query)s
+       AND (%(senders)s::text[] IS NULL OR p.name = ANY(%(senders)s::text[]))
+       AND m.timestamp_ms >= %(start_ms)s AND m.timestamp_ms < %(end_ms)s
+     ORDER BY m.timestamp_ms DESC, m.id DESC
+     LIMIT %(limit)s OFFSET %(offset)s;
+"""
+
+
+def ensure_search(cursor):
+    """Adds the tsvector column and the full-text and trigram indexes if needed."""
+    cursor.execute(SEARCH_DDL)
+
+
+def like_pattern(text):
+    """An ILIKE pattern matching text anywhere, with its wildcards escaped."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_query(query, mode="words", senders=None, start_ms=None, end_ms=None, page=0, page_size=50):
+    """
+    Builds the search SQL for one page of results. One extra row is fetched so the caller can
+    tell whether a next page exists. Returns (sql, params).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown search mode: {mode!r} (expected one of {', '.join(MODES)})")
+    params = {
+        "query": query if mode == "words" else like_pattern(query),
+        "senders": sorted(senders) if senders else None,
+        "start_ms": MIN_MS if start_ms is None else int(start_ms),
+        "end_ms": MAX_MS if end_ms is None else int(end_ms),
+        "limit": int(page_size) + 1,
+        "offset": int(page) * int(page_size),
+    }
+    return (SEARCH_WORDS_SQL if mode == "words" else SEARCH_SUBSTRING_SQL), params
+
+
+# ------------------------------------------------------
+# In memory: the same search over export files
+# ------------------------------------------------------
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class InvertedIndex:
+    """
+    Token postings ({token: {doc: term frequency}}) over a set of messages. Word queries
+    intersect postings and rank by tf-idf; substring queries intersect trigram postings, built
+    on first use, and confirm each candidate with a plain `in`.
+    """
+
+    def __init__(self):
+        self.ids, self.timestamps, self.senders, self.contents = [], [], [], []
+        self.postings = defaultdict(dict)
+        self._trigram_postings = None
+
+    @classmethod
+    def from_frame(cls, df, content="content", timestamp="timestamp_ms", sender="sender_name", id_column=None):
+        """Indexes a frame with content, epoch-ms timestamp and sender columns (ids default to the row index)."""
+        index = cls()
+        ids = df[id_column] if id_column else df.index
+        for doc_id, text, timestamp_ms, name in zip(ids, df[content], df[timestamp], df[sender]):
+            if isinstance(text, str) and text:
+                index.add(doc_id, timestamp_ms, name, text)
+        return index
+
+    def add(self, doc_id, timestamp_ms, sender, content):
+        doc = len(self.ids)
+        self.ids.append(doc_id)
+        self.timestamps.append(int(timestamp_ms))
+        self.senders.append(sender)
+        self.contents.append(content)
+        for token in tokenize(content):
+            postings = self.postings[token]
+            postings[doc] = postings.get(doc, 0) + 1
+        self._trigram_postings = None
+
+    def _keep(self, doc, senders, start_ms, end_ms):
+        if senders is not None and self.senders[doc] not in senders:
+            return False
+        if start_ms is not None and self.timestamps[doc] < start_ms:
+            return False
+        return end_ms is None or self.timestamps[doc] < end_ms
+
+    def _word_matches(self, query):
+        """{doc: tf-idf score} for documents containing every query token."""
+        tokens = set(tokenize(query))
+        if not tokens or any(token not in self.postings for token in tokens):
+            return {}
+        ordered = sorted((self.postings[token] for token in tokens), key=len)
+        docs = set(ordered[0]).intersection(*ordered[1:])
+        total = len(self.ids)
+        weights = [(postings, math.log(1 + total / len(postings))) for postings in ordered]
+        return {doc: sum(postings[doc] * idf for postings, idf in weights) for doc in docs}
+
+    def _substring_matches(self, query):
+        """{doc: None} for documents containing query, case-insensitively."""
+        needle = query.lower()
+        if len(needle) < 3:
+            candidates = range(len(self.ids))
+        else:
+            if self._trigram_postings is None:
+                self._trigram_postings = defaultdict(set)
+                for doc, text in enumerate(self.contents):
+                    for trigram in _trigrams(text.lower()):
+                        self._trigram_postings[trigram].add(doc)
+            sets = sorted((self._trigram_postings.get(trigram, set()) for trigram in _trigrams(needle)), key=len)
+            candidates = sets[0].intersection(*sets[1:])
+        return {doc: None for doc in candidates if needle in self.contents[doc].lower()}
+
+    def search(self, query, mode="words", senders=None, start_ms=None, end_ms=None, page=0, page_size=50):
+        """
+        Returns (results, has_more) for one page. Results are dicts with id, timestamp_ms,
+        sender_name, content and rank, best match first (newest first for substring searches).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown search mode: {mode!r} (expected one of {', '.join(MODES)})")
+        senders = set(senders) if senders else None
+        matches = self._word_matches(query) if mode == "words" else self._substring_matches(query)
+
+        hits = [(score, doc) for doc, score in matches.items() if self._keep(doc, senders, start_ms, end_ms)]
+
+        # Only the hits up to the end of this page are ever sorted
+        start = page * page_size
+        top = heapq.nsmallest(start + page_size, hits, key=lambda hit: (-(hit[0] or 0), -self.timestamps[hit[1]], -hit[1]))
+        results = [
+            {"id": self.ids[doc], "timestamp_ms": self.timestamps[doc], "sender_name": self.senders[doc],
+             "content": self.contents[doc], "rank": score}
+            for score, doc in top[start:]
+        ]
+        return results, len(hits) > start + page_size
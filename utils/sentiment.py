@@ -0,0 +1,172 @@
+# utils/sentiment.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from psycopg2.extras import execute_values
+from textblob import TextBlob
+
+from utils.rollups import ensure_rollups
+
+# Scores are keyed by md5 of the message text, the same key Postgres computes with md5(content),
+# so identical messages ("lol", "😂") are scored once and every later load only scores new text.
+# Postgres hashes the text in the database encoding, so texts read from Postgres are stored
+# under the md5 it returns alongside them rather than one recomputed here.
+
+BATCH_SIZE = 500
+
+
+def content_hash(text):
+    """md5 hex digest of the UTF-8 text, matching Postgres md5(content)."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def score_batch(texts):
+    """Scores a list of texts; returns [(polarity, subjectivity), ...] in the same order."""
+    scores = []
+    for text in texts:
+        sentiment = TextBlob(text).sentiment
+        scores.append((sentiment.polarity, sentiment.subjectivity))
+    return scores
+
+
+def score_texts(texts, workers=None, batch_size=BATCH_SIZE):
+    """
+    Scores distinct texts in batches across a process pool.
+    Returns {content_hash: (polarity, subjectivity)}.
+    """
+    unique = {content_hash(text): text for text in texts if isinstance(text, str)}
+    return score_keyed(unique, workers=workers, batch_size=batch_size)
+
+
+def score_keyed(texts_by_key, workers=None, batch_size=BATCH_SIZE):
+    """
+    Scores {key: text} in batches across a process pool.
+    Returns {key: (polarity, subjectivity)}.
+    """
+    hashes, pending = list(texts_by_key), list(texts_by_key.values())
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers <= 1:
+        results = [score_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(score_batch, batches))
+
+    return dict(zip(hashes, (score for batch in results for score in batch)))
+
+
+# ------------------------------------------------------
+# Postgres: message_sentiment side table (created with the rollups)
+# ------------------------------------------------------
+PENDING_SQL = """
+    SELECT DISTINCT md5(m.content), m.content
+      FROM messages m
+     WHERE m.content IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM message_sentiment s WHERE s.content_hash = md5(m.content))
+     LIMIT %s;
+"""
+
+
+def store_scores(cursor, scores):
+    """
+    Inserts {content_hash: (polarity, subjectivity)} into message_sentiment.
+    Returns the number of hashes that were not stored before.
+    """
+    inserted = execute_values(
+        cursor,
+        "INSERT INTO message_sentiment (content_hash, polarity, subjectivity) VALUES %s "
+        "ON CONFLICT (content_hash) DO NOTHING RETURNING content_hash",
+        [(key, polarity, subjectivity) for key, (polarity, subjectivity) in scores.items()],
+        page_size=1000, fetch=True
+    )
+    return len(inserted)
+
+
+def score_pending(cursor, workers=None, chunk_size=20000):
+    """
+    Scores every message text that has no stored sentiment yet, chunk_size texts at a time,
+    storing each score under the md5 Postgres computed for the text.
+    Returns the number of texts scored.
+    """
+    ensure_rollups(cursor)
+    scored = 0
+    while True:
+        cursor.execute(PENDING_SQL, (chunk_size,))
+        texts = dict(cursor.fetchall())
+        if not texts:
+            break
+        inserted = store_scores(cursor, score_keyed(texts, workers=workers))
+        if not inserted:
+            # The same texts came back even though their scores are stored; never loop on them
+            logging.warning(f"⚠️ Stopped scoring: {len(texts)} pending texts stored no new scores.")
+            break
+        scored += inserted
+        logging.info(f"🙃 Scored {scored} message texts so far.")
+    return scored
+
+
+# ------------------------------------------------------
+# SQLite: the same cache for dashboards that read export files instead of Postgres
+# ------------------------------------------------------
+class SentimentCache:
+    """A content_hash -> (polarity, subjectivity) table in a local SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS message_sentiment ("
+                         "content_hash TEXT PRIMARY KEY, polarity REAL NOT NULL, subjectivity REAL NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path)) as conn:
+            with conn:
+                yield conn
+
+    def lookup(self, hashes):
+        """Returns {content_hash: (polarity, subjectivity)} for the hashes that are cached."""
+        found = {}
+        hashes = list(hashes)
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 900):
+                chunk = hashes[i:i + 900]
+                rows = conn.execute(
+                    f"SELECT content_hash, polarity, subjectivity FROM message_sentiment "
+                    f"WHERE content_hash IN ({','.join('?' * len(chunk))})", chunk)
+                found.update((key, (polarity, subjectivity)) for key, polarity, subjectivity in rows)
+        return found
+
+    def store(self, scores):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO message_sentiment VALUES (?, ?, ?)",
+                             [(key, polarity, subjectivity) for key, (polarity, subjectivity) in scores.items()])
+
+
+def cached_scores(texts, cache, workers=None):
+    """
+    Looks texts up in a SentimentCache, scoring and storing only the misses.
+    Returns {content_hash: (polarity, subjectivity)} for every text.
+    """
+    by_hash = {content_hash(text): text for text in texts if isinstance(text, str)}
+    scores = cache.lookup(by_hash)
+    missing = [text for key, text in by_hash.items() if key not in scores]
+    if missing:
+        fresh = score_texts(missing, workers=workers)
+        cache.store(fresh)
+        scores.update(fresh)
+        logging.info(f"🙃 Scored {len(fresh)} new message texts ({len(by_hash) - len(fresh)} cached).")
+    return scores
+
+
+def attach_scores(df, scores, column="content"):
+    """Adds polarity and subjectivity columns to df from a {content_hash: scores} dict."""
+    keys = df[column].map(lambda text: content_hash(text) if isinstance(text, str) else None)
+    df["polarity"] = keys.map(lambda key: scores[key][0] if key in scores else None).astype(float)
+    df["subjectivity"] = keys.map(lambda key: scores[key][1] if key in scores else None).astype(float)
+    return df
@@ -0,0 +1,220 @@
+# utils/session_store.py
+
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+# Server-side sessions for auth_backend.py. Sessions live in one SQLite file (sid, JSON data,
+# expiry) instead of a pickle file per session, with an in-memory LRU of recently used sessions
+# in front of it, so a status check for an active user touches neither the disk nor a decoder.
+# Every session expires ttl_s after it was last written; expired rows are ignored on read and
+# deleted by a background sweep. The LRU assumes one backend process owns the file.
+
+SESSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        sid TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+"""
+
+
+class SessionStore:
+    """
+    A TTL key-value store for session dicts: an LRU of up to cache_size entries over SQLite.
+    Thread-safe; every thread gets its own SQLite connection.
+    """
+
+    def __init__(self, path, ttl_s=86400.0, cache_size=1024, clock=time.time):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.cache_size = cache_size
+        self.clock = clock
+        self._cache = OrderedDict()  # sid -> (data, expires_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._gc_thread = None
+        self._gc_stop = threading.Event()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript(SESSIONS_DDL)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def _remember(self, sid, data, expires_at):
+        with self._lock:
+            self._cache[sid] = (data, expires_at)
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, sid):
+        """Returns (data, expires_at) for a live session, or None."""
+        now = self.clock()
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is not None:
+                if entry[1] > now:
+                    self._cache.move_to_end(sid)
+                    return entry
+                del self._cache[sid]
+
+        row = self._conn().execute(
+            "SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?;", (sid, now)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = (json.loads(row[0]), row[1])
+        self._remember(sid, *entry)
+        return entry
+
+    def set(self, sid, data):
+        """Stores a session dict, expiring ttl_s from now. Returns the expiry time."""
+        expires_at = self.clock() + self.ttl_s
+        self._conn().execute(
+            "INSERT INTO sessions (sid, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (sid) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at;",
+            (sid, json.dumps(data, separators=(",", ":")), expires_at)
+        )
+        self._remember(sid, dict(data), expires_at)
+        return expires_at
+
+    def touch(self, sid):
+        """Pushes a session's expiry to ttl_s from now without rewriting its data."""
+        expires_at = self.clock() + self.ttl_s
+        self._conn().execute("UPDATE sessions SET expires_at = ? WHERE sid = ?;", (expires_at, sid))
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is not None:
+                self._cache[sid] = (entry[0], expires_at)
+        return expires_at
+
+    def delete(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?;", (sid,))
+
+    def sweep(self):
+        """Deletes every expired session. Returns the number of rows removed."""
+        now = self.clock()
+        with self._lock:
+            for sid in [sid for sid, (_, expires_at) in self._cache.items() if expires_at <= now]:
+                del self._cache[sid]
+        removed = self._conn().execute("DELETE FROM sessions WHERE expires_at <= ?;", (now,)).rowcount
+        if removed:
+            logging.info(f"🧹 Removed {removed} expired sessions.")
+        return removed
+
+    def __len__(self):
+        return self._conn().execute("SELECT count(*) FROM sessions WHERE expires_at > ?;", (self.clock(),)).fetchone()[0]
+
+    def start_gc(self, interval_s=300.0):
+        """Runs sweep() every interval_s seconds on a daemon thread until close()."""
+        if self._gc_thread is not None:
+            return
+
+        def run():
+            while not self._gc_stop.wait(interval_s):
+                try:
+                    self.sweep()
+                except sqlite3.Error as e:
+                    logging.error(f"❌ Session sweep failed: {e}")
+
+        self._gc_thread = threading.Thread(target=run, name="session-gc", daemon=True)
+        self._gc_thread.start()
+
+    def close(self):
+        self._gc_stop.set()
+        if self._gc_thread is not None:
+            self._gc_thread.join()
+            self._gc_thread = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ------------------------------------------------------
+# Flask: session interface backed by a SessionStore
+# ------------------------------------------------------
+class StoredSession(CallbackDict, SessionMixin):
+
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.modified = False
+
+
+class StoreSessionInterface(SessionInterface):
+    """
+    Keeps session data in a SessionStore; the cookie only carries a random session id, signed
+    with the app's secret key. Unchanged sessions are only re-stamped once half their TTL has
+    passed, so status checks are reads.
+    """
+
+    def __init__(self, store, salt="session-store"):
+        self.store = store
+        self.salt = salt
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        signed = request.cookies.get(self.get_cookie_name(app))
+        if signed and app.secret_key:
+            try:
+                sid = self._signer(app).unsign(signed).decode()
+            except BadSignature:
+                sid = None
+            entry = self.store.get(sid) if sid else None
+            if entry is not None:
+                return StoredSession(entry[0], sid=sid, expires_at=entry[1])
+        return StoredSession(sid=secrets.token_urlsafe(32))
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            session.expires_at = self.store.set(session.sid, dict(session))
+        elif session.expires_at is not None and session.expires_at - self.store.clock() < self.store.ttl_s / 2:
+            session.expires_at = self.store.touch(session.sid)
+        else:
+            return
+
+        response.set_cookie(
+            name, self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app)
+        )
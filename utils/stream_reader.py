@@ -0,0 +1,148 @@
+# utils/stream_reader.py
+
+import json
+from itertools import islice
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - falls back to json.load below
+    ijson = None
+
+from utils.encoding import repair_header, repair_message
+
+# Reads Messenger export files without holding the whole document in memory. With ijson the
+# "messages" array is read with ijson.items, so its C backend builds each message and hands
+# them out one at a time; every other top-level key (participants, title, thread_path, ...) is
+# the "header", read by a light scan that skips the messages without building them.
+# Without ijson the same functions fall back to json.load, so callers never need to care.
+# Text is repaired to canonical UTF-8 on the way out (utils/encoding.py) unless repair=False.
+
+MESSAGES_KEY = "messages"
+
+
+def _parse_error(file_name, error):
+    """Surfaces ijson errors as json.JSONDecodeError so existing except clauses keep working."""
+    return json.JSONDecodeError(f"{file_name}: {error}", "", 0)
+
+
+def _iter_header(file, file_name):
+    """
+    Yields (key, value) for every top-level key of an export except "messages", in file order.
+    Only header values are built; the messages array is passed over event by event. (ijson's
+    kvitems(file, "") would build the whole messages array just to throw it away.)
+    """
+    depth, key, skip, builder = 0, None, False, None
+    try:
+        for event, value in ijson.basic_parse(file, use_float=True):
+            if depth == 1 and event == "map_key":
+                key, skip = value, value == MESSAGES_KEY
+                continue
+            if event == "start_map" or event == "start_array":
+                depth += 1
+                if depth == 2 and not skip:
+                    builder = ijson.ObjectBuilder()
+            elif event == "end_map" or event == "end_array":
+                depth -= 1
+            elif depth == 1 and not skip:
+                yield key, value  # A scalar header value
+                continue
+
+            if builder is not None:
+                builder.event(event, value)
+                if depth == 1:
+                    yield key, builder.value
+                    builder = None
+    except ijson.JSONError as e:
+        raise _parse_error(file_name, e) from e
+
+
+def iter_messages(file_name, repair=True):
+    """Yields the messages of one export file one at a time."""
+    if ijson is None:
+        with open(file_name, 'r', encoding='utf-8') as file:
+            messages = json.load(file).get(MESSAGES_KEY, [])
+        for message in messages:
+            yield repair_message(message) if repair else message
+        return
+
+    with open(file_name, 'rb') as file:
+        try:
+            for message in ijson.items(file, f"{MESSAGES_KEY}.item", use_float=True):
+                yield repair_message(message) if repair else message
+        except ijson.JSONError as e:
+            raise _parse_error(file_name, e) from e
+
+
+def read_header(file_name, repair=True):
+    """Returns every top-level field of an export file except the messages."""
+    if ijson is None:
+        with open(file_name, 'r', encoding='utf-8') as file:
+            header = json.load(file)
+        header.pop(MESSAGES_KEY, None)
+    else:
+        with open(file_name, 'rb') as file:
+            header = dict(_iter_header(file, file_name))
+    return repair_header(header) if repair else header
+
+
+def read_participants(file_name, repair=True):
+    """
+    Returns the "participants" list of an export file. Messenger writes it before the messages,
+    so reading stops there instead of going through the rest of the file.
+    """
+    if ijson is None:
+        return read_header(file_name, repair=repair).get("participants", [])
+
+    with open(file_name, 'rb') as file:
+        for key, value in _iter_header(file, file_name):
+            if key == "participants":
+                return repair_header({key: value})[key] if repair else value
+    return []
+
+
+def has_messages(file_name):
+    """True if the export has a top-level "messages" key (without building any message)."""
+    if ijson is None:
+        with open(file_name, 'r', encoding='utf-8') as file:
+            return MESSAGES_KEY in json.load(file)
+
+    with open(file_name, 'rb') as file:
+        try:
+            for prefix, event, value in ijson.parse(file):
+                if prefix == "" and event == "map_key" and value == MESSAGES_KEY:
+                    return True
+        except ijson.JSONError as e:
+            raise _parse_error(file_name, e) from e
+    return False
+
+
+def batched(iterable, size):
+    """Yields lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _nested(value, indent, level):
+    """json.dumps(value) indented to sit level levels deep in a pretty-printed document."""
+    return json.dumps(value, ensure_ascii=True, indent=indent).replace("\n", "\n" + " " * (indent * level))
+
+
+def write_export(file_name, header, messages, indent=4):
+    """
+    Writes an export file from a header dict and an iterable of messages, one message at a time,
+    so a cleaned copy of a huge export never has to exist in memory. The output is the same JSON
+    json.dump(..., indent=indent) would produce, with "messages" as the last key.
+    """
+    with open(file_name, 'w', encoding='utf-8') as out:
+        out.write("{")
+        pad = " " * indent
+        for key, value in header.items():
+            if key != MESSAGES_KEY:
+                out.write(f"\n{pad}{json.dumps(key)}: {_nested(value, indent, 1)},")
+        out.write(f'\n{pad}"{MESSAGES_KEY}": [')
+        separator = "\n"
+        for message in messages:
+            out.write(f"{separator}{pad * 2}{_nested(message, indent, 2)}")
+            separator = ",\n"
+        out.write(f"\n{pad}]\n}}")
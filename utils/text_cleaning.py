@@ -0,0 +1,104 @@
+# utils/text_cleaning.py
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.encoding import repair_text
+
+# One place for the message-cleaning rules. Each profile compiles its removal rules into a single
+# alternation, so a message is cleaned in one regex pass instead of one re.sub per rule.
+
+URL = r"https?://\S+"
+NON_LETTERS = r"[^a-zA-Z\s]"
+# Characters outside the Basic Multilingual Plane (most emoji), stripped by the archive cleaner
+ASTRAL = r"[^\u0000-\uFFFF]"
+
+STOP_PHRASES = ("message", "catalina wine mixer", "reacted")
+
+# Reaction notices ("X reacted 😆 to your message") are dropped outright
+DROP_PATTERN = r"\bto your message\b"
+
+PROFILES = {
+    # Letters and whitespace only, minus stop phrases: word clouds and the content CSVs
+    "wordcloud": {"remove": [URL, NON_LETTERS], "stop_phrases": STOP_PHRASES, "letters_only": True, "repair": False, "strip": False},
+    # Same rules, trimmed: utils/json_to_json.py cleaned exports
+    "json": {"remove": [URL, NON_LETTERS], "stop_phrases": STOP_PHRASES, "letters_only": True, "repair": False, "strip": True},
+    # Keeps punctuation; only URLs, the word "message" and astral characters go: scripts/clean_content.py
+    "archive": {"remove": [URL, ASTRAL], "stop_phrases": ("message",), "repair": True, "strip": False},
+}
+
+
+class Cleaner:
+    """A compiled cleaning profile."""
+
+    def __init__(self, remove, stop_phrases=(), letters_only=False, repair=False, strip=False):
+        # URLs first so they are consumed whole; stop phrases before the character classes
+        url = remove[0]
+        alternatives = [url]
+        if stop_phrases:
+            phrases = "|".join(re.escape(phrase) for phrase in sorted(stop_phrases, key=len, reverse=True))
+            # The end of a phrase is judged as if the URLs after it were already gone, as the old
+            # chain removed them first: "messagehttp://x.y" loses "message" too
+            if letters_only:
+                # Word boundaries as they will be once non-letters are gone: "message's" becomes
+                # "messages" and must survive, "message2" becomes "message" and must not
+                alternatives.append(rf"(?i:(?<![a-zA-Z])(?:{phrases})(?!(?:{url}|[^a-zA-Z\s])*+[a-zA-Z]))")
+            else:
+                alternatives.append(rf"(?i:\b(?:{phrases})(?!(?:{url})*+\w))")
+        alternatives.extend(remove[1:])
+
+        self.pattern = re.compile("|".join(f"(?:{alternative})" for alternative in alternatives))
+        self.drop = re.compile(DROP_PATTERN, re.IGNORECASE)
+        self.repair = repair
+        self.strip = strip
+
+    def clean(self, text):
+        """Returns the cleaned text, or None if the message should be dropped."""
+        if self.repair:
+            text = repair_text(text)
+        if self.drop.search(text):
+            return None
+        cleaned = self.pattern.sub('', text)
+        return cleaned.strip() if self.strip else cleaned
+
+    def clean_many(self, texts):
+        return [self.clean(text) for text in texts]
+
+
+_cleaners = {}
+
+
+def get_cleaner(profile="wordcloud"):
+    """Returns the compiled Cleaner for a named profile (compiled once per process)."""
+    cleaner = _cleaners.get(profile)
+    if cleaner is None:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown cleaning profile: {profile!r} (expected one of {', '.join(PROFILES)})")
+        cleaner = _cleaners[profile] = Cleaner(**PROFILES[profile])
+    return cleaner
+
+
+def clean_text(text, profile="wordcloud"):
+    """Cleans one message; None means drop it."""
+    return get_cleaner(profile).clean(text)
+
+
+def _clean_chunk(args):
+    texts, profile = args
+    return get_cleaner(profile).clean_many(texts)
+
+
+def clean_texts(texts, profile="wordcloud", workers=1, chunk_size=10_000):
+    """
+    Cleans a list of messages, in order. With workers > 1 the list is split into chunks that are
+    cleaned across a process pool; below a couple of chunks that costs more than it saves.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= chunk_size:
+        return get_cleaner(profile).clean_many(texts)
+
+    chunks = [(texts[i:i + chunk_size], profile) for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [cleaned for chunk in pool.map(_clean_chunk, chunks) for cleaned in chunk]
@@ -0,0 +1,244 @@
+# utils/thumbnails.py
+
+import hashlib
+import json
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Thumbnails for the photo collage. Each photo is decoded once, at reduced size (JPEG draft
+# mode lets libjpeg decode at 1/2, 1/4 or 1/8 scale instead of the full resolution), across a
+# process pool, and the result is kept in a cache keyed by the photo's content hash and the
+# thumbnail size. Collage cells are cut from those small cached thumbnails, so a new layout never
+# touches the originals again, and a collage whose layout did not change only has the cells for
+# new photos pasted onto the previous image.
+
+THUMB_SIZE = 256
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+BACKGROUND = (255, 255, 255)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_thumbnail(path, size=THUMB_SIZE):
+    """
+    Decodes an image no larger than needed for a size x size thumbnail, flattens transparency
+    onto white and returns an RGB image whose longer side is at most size.
+    """
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", (size, size))  # Scales the decode down; never below the requested size
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGBA", img.size, BACKGROUND + (255,))
+            img = Image.alpha_composite(background, img).convert("RGB")
+        else:
+            img = img.convert("RGB")
+        img.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        return img
+
+
+def _make_thumbnail(job):
+    """Worker: writes one thumbnail into the cache. Returns (path, error)."""
+    path, thumb_path, size = job
+    try:
+        thumb = load_thumbnail(path, size)
+        tmp_path = f"{thumb_path}.{os.getpid()}.tmp"
+        thumb.save(tmp_path, "JPEG", quality=90)
+        os.replace(tmp_path, thumb_path)
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+def thumb_size_for(cell_width, cell_height):
+    """Smallest cached thumbnail size (THUMB_SIZE, doubled as needed) that covers a collage cell."""
+    size = THUMB_SIZE
+    while size < max(cell_width, cell_height):
+        size *= 2
+    return size
+
+
+class ThumbnailCache:
+    """A directory of JPEG thumbnails named <content sha256>_<size>.jpg."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "digests.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                self._digests = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._digests = {}
+
+    def digest(self, path):
+        """Content hash of path, re-read only when its size or modification time changed."""
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        cached = self._digests.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(path)
+        self._digests[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def thumb_path(self, digest, size=THUMB_SIZE):
+        return os.path.join(self.cache_dir, f"{digest}_{size}.jpg")
+
+    def save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self._digests, file)
+        os.replace(tmp_path, self.index_path)
+
+    def build(self, paths, size=THUMB_SIZE, workers=None):
+        """
+        Makes sure every photo has a cached size x size thumbnail, decoding only the ones that do not.
+        Returns ({path: digest} for usable photos, number of thumbnails made, {path: error}).
+        """
+        digests, errors = {}, {}
+        for path in paths:
+            try:
+                digests[path] = self.digest(path)
+            except OSError as e:
+                errors[path] = str(e)
+        self.save_index()
+
+        jobs, seen = [], set()
+        for path, digest in digests.items():
+            thumb_path = self.thumb_path(digest, size)
+            if digest not in seen and not os.path.exists(thumb_path):
+                jobs.append((path, thumb_path, size))
+            seen.add(digest)
+
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            results = [_make_thumbnail(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_make_thumbnail, jobs, chunksize=8))
+
+        for path, error in results:
+            if error is not None:
+                errors[path] = error
+                logging.warning(f"⚠️ Skipping {os.path.basename(path)}: {error}")
+        for path in errors:
+            digests.pop(path, None)
+        return digests, len(jobs) - sum(error is not None for _, error in results), errors
+
+
+# ------------------------------------------------------
+# Collage layout
+# ------------------------------------------------------
+def grid_layout(count, width, height=None, min_cell=None):
+    """
+    Chooses (cols, rows, cell_width, cell_height, canvas_height) for count images on a canvas
+    width pixels wide. With a fixed height the column count that gives the largest cells wins.
+    If those cells would be narrower than min_cell (thousands of photos), or no height is given,
+    cells are min_cell pixels wide and the canvas grows downwards instead.
+    """
+    if count <= 0:
+        return 0, 0, 0, 0, height or 0
+
+    if height:
+        best = None
+        for cols in range(1, count + 1):
+            rows = math.ceil(count / cols)
+            cell = min(width // cols, height // rows)
+            if best is None or cell > best[0]:
+                best = (cell, cols, rows)
+        cell, cols, rows = best
+        if not min_cell or cell >= min_cell:
+            return cols, rows, width // cols, height // rows, height
+
+    cell = min_cell or THUMB_SIZE
+    cols = max(width // cell, 1)
+    rows = math.ceil(count / cols)
+    return cols, rows, width // cols, cell, rows * cell
+
+
+def list_images(folder, exclude=()):
+    """Image files directly inside folder, leaving out the paths in exclude (e.g. the collage itself)."""
+    excluded = {os.path.abspath(path) for path in exclude}
+    return [
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.abspath(os.path.join(folder, name)) not in excluded
+    ]
+
+
+def _cell_image(thumb_path, cell_width, cell_height):
+    with Image.open(thumb_path) as thumb:
+        return ImageOps.fit(thumb.convert("RGB"), (cell_width, cell_height), Image.LANCZOS)
+
+
+def build_collage(image_paths, output_file, cache_dir, width=800, height=600, min_cell=None, workers=None):
+    """
+    Builds (or updates) a collage of image_paths at output_file. Photos already placed by the
+    previous run keep their cells; new photos are appended after them. When the layout is
+    unchanged only the new cells are pasted onto the previous collage. output_file is never
+    used as one of its own photos, even when it sits among them.
+    Returns a dict of counts: images, thumbnails_made, cells_pasted, skipped.
+    """
+    output_path = os.path.abspath(output_file)
+    image_paths = sorted(path for path in image_paths if os.path.abspath(path) != output_path)
+    _, _, cell_width, cell_height, _ = grid_layout(len(image_paths), width, height, min_cell)
+    size = thumb_size_for(cell_width, cell_height)
+
+    cache = ThumbnailCache(cache_dir)
+    digests, made, errors = cache.build(image_paths, size=size, workers=workers)
+
+    state_file = output_file + ".json"
+    try:
+        with open(state_file, "r", encoding="utf-8") as file:
+            previous = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {"order": [], "layout": None}
+
+    # Keep the previous placement for photos that are still here, then add the new ones
+    current = set(digests.values())
+    kept = [digest for digest in previous["order"] if digest in current]
+    placed = set(kept)
+    order = kept + [digest for digest in dict.fromkeys(digests.values()) if digest not in placed]
+
+    cols, rows, cell_width, cell_height, canvas_height = layout = grid_layout(len(order), width, height, min_cell)
+
+    # Same grid and every earlier photo still in its cell: only the new cells need drawing
+    previous_grid = previous["layout"] and (previous["layout"][0], *previous["layout"][2:4])
+    incremental = (
+        kept == previous["order"]
+        and previous_grid == (cols, cell_width, cell_height)
+        and os.path.exists(output_file)
+    )
+    if incremental:
+        with Image.open(output_file) as old:
+            collage = Image.new("RGB", (width, canvas_height), BACKGROUND)
+            collage.paste(old.convert("RGB"), (0, 0))
+        start = len(kept)
+    else:
+        collage = Image.new("RGB", (width, canvas_height), BACKGROUND)
+        start = 0
+
+    for index in range(start, len(order)):
+        x = (index % cols) * cell_width
+        y = (index // cols) * cell_height
+        collage.paste(_cell_image(cache.thumb_path(order[index], size), cell_width, cell_height), (x, y))
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    collage.save(output_file)
+    with open(state_file, "w", encoding="utf-8") as file:
+        json.dump({"order": order, "layout": list(layout)}, file)
+
+    return {"images": len(order), "thumbnails_made": made, "cells_pasted": len(order) - start,
+            "skipped": len(errors), "layout": layout}
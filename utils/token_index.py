@@ -0,0 +1,161 @@
+# utils/token_index.py
+
+import logging
+import re
+from collections import Counter, defaultdict
+import pandas as pd
+from wordcloud import STOPWORDS
+
+from utils.rollups import refresh_window
+
+# Word counts per sender, UTC day and sentiment bucket, so a word cloud for any date range is a
+# sum over a few thousand rows rather than a re-tokenization of every message. Tokens follow
+# WordCloud.generate(): \w[\w']+ lowercased, a trailing 's dropped, numbers skipped. Stopwords
+# stay in the index and are filtered when reading.
+
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+# Same pattern for Postgres regexp_matches (ARE syntax)
+TOKEN_PATTERN_SQL = r"\w[\w']+"
+
+BUCKETS = {"negative": -1, "neutral": 0, "positive": 1}
+
+
+def tokenize(text):
+    """Splits text into word cloud tokens."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if token and not token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+def polarity_bucket(polarity):
+    """-1, 0 or 1 for a polarity score; unscored messages count as neutral."""
+    if polarity is None or polarity != polarity:
+        return 0
+    return (polarity > 0) - (polarity < 0)
+
+
+def word_frequencies(counts, stopwords=STOPWORDS, max_words=2000):
+    """Drops stopwords and keeps the max_words most frequent tokens, ready for WordCloud.generate_from_frequencies."""
+    stopwords = {word.lower() for word in stopwords}
+    kept = Counter({token: count for token, count in counts.items() if token not in stopwords})
+    return dict(kept.most_common(max_words))
+
+
+# ------------------------------------------------------
+# Postgres: token_counts table, refreshed alongside the rollups
+# ------------------------------------------------------
+TOKEN_DDL = """
+    CREATE TABLE IF NOT EXISTS token_counts (
+        day DATE NOT NULL,
+        sender_id INTEGER NOT NULL,
+        bucket SMALLINT NOT NULL,
+        token TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, sender_id, bucket, token)
+    );
+"""
+
+REFRESH_TOKENS_SQL = f"""
+    DELETE FROM token_counts WHERE day >= %(from_day)s;
+
+    WITH msg AS (
+        SELECT m.sender_id,
+               (to_timestamp(m.timestamp_ms / 1000.0) AT TIME ZONE 'UTC')::date AS day,
+               COALESCE(sign(s.polarity), 0)::smallint AS bucket,
+               m.content
+          FROM messages m
+          LEFT JOIN message_sentiment s ON s.content_hash = md5(m.content)
+         WHERE m.sender_id IS NOT NULL
+           AND m.content IS NOT NULL
+           AND m.timestamp_ms >= %(from_ms)s
+    ),
+    tokens AS (
+        SELECT msg.sender_id, msg.day, msg.bucket,
+               regexp_replace(match[1], '''s$', '') AS token
+          FROM msg, regexp_matches(lower(msg.content), '({TOKEN_PATTERN_SQL.replace("'", "''")})', 'g') AS match
+    )
+    INSERT INTO token_counts (day, sender_id, bucket, token, count)
+    SELECT day, sender_id, bucket, token, COUNT(*)
+      FROM tokens
+     WHERE token <> '' AND token !~ '^[0-9]+$'
+     GROUP BY 1, 2, 3, 4;
+"""
+
+FREQUENCIES_SQL = """
+    SELECT token, SUM(count) AS count
+      FROM token_counts
+     WHERE day BETWEEN %(start)s AND %(end)s
+       AND (%(bucket)s::smallint IS NULL OR bucket = %(bucket)s::smallint)
+       AND token <> ALL(%(stopwords)s)
+     GROUP BY token
+     ORDER BY count DESC
+     LIMIT %(max_words)s;
+"""
+
+
+def ensure_token_index(cursor):
+    """Creates the token_counts table if needed."""
+    cursor.execute(TOKEN_DDL)
+
+
+def refresh_token_index(cursor, full=False, changed_from_ms=None):
+    """
+    Brings token_counts up to date, recomputing only the last indexed day onwards (or from the
+    day of changed_from_ms, if a load added older messages) unless full=True. Run after
+    sentiment scoring, since buckets come from message_sentiment.
+    """
+    ensure_token_index(cursor)
+
+    from_day, params = refresh_window(cursor, "token_counts", full, changed_from_ms)
+
+    cursor.execute(REFRESH_TOKENS_SQL, params)
+    logging.info(f"🔤 Refreshed token counts from {from_day or 'the beginning'}.")
+    return from_day
+
+
+def frequencies_params(start_date, end_date, bucket=None, stopwords=STOPWORDS, max_words=2000):
+    """Query parameters for FREQUENCIES_SQL; bucket is None (all), -1, 0 or 1."""
+    return {
+        "start": start_date, "end": end_date, "bucket": bucket,
+        "stopwords": sorted(word.lower() for word in stopwords), "max_words": max_words,
+    }
+
+
+# ------------------------------------------------------
+# In memory: the same index for code that reads export files
+# ------------------------------------------------------
+class TokenIndex:
+    """Token counts keyed by (sender, day, bucket), built in one pass over a message DataFrame."""
+
+    def __init__(self):
+        self.counts = defaultdict(Counter)
+
+    @classmethod
+    def from_frame(cls, df, content="content", timestamp="timestamp_ms", sender="sender_name", polarity="polarity"):
+        """Indexes a frame with content, epoch-ms timestamp, sender and (optional) polarity columns."""
+        index = cls()
+        days = pd.to_datetime(df[timestamp], unit="ms", utc=True).dt.date
+        polarities = df[polarity] if polarity in df else [None] * len(df)
+        for text, day, name, score in zip(df[content], days, df[sender], polarities):
+            if isinstance(text, str):
+                index.counts[(name, day, polarity_bucket(score))].update(tokenize(text))
+        return index
+
+    def frequencies(self, start_date=None, end_date=None, bucket=None, senders=None, stopwords=STOPWORDS, max_words=2000):
+        """Merges counts for a date range, optional sentiment bucket and optional set of senders."""
+        merged = Counter()
+        for (name, day, key_bucket), counts in self.counts.items():
+            if start_date is not None and day < start_date:
+                continue
+            if end_date is not None and day > end_date:
+                continue
+            if bucket is not None and key_bucket != bucket:
+                continue
+            if senders is not None and name not in senders:
+                continue
+            merged.update(counts)
+        return word_frequencies(merged, stopwords, max_words)